@@ -0,0 +1,310 @@
+# benchmark.py
+# Pruebas de rendimiento del motor de turnos y del dibujado de la Guerra de Píxeles.
+#
+# Escenarios fijos (misma semilla en cada ejecución):
+#   dos_jugadores_inicio   2 jugadores con la colocación inicial (tablero casi vacío)
+#   ocho_jugadores_medio   8 jugadores tras TURNOS_MEDIO_JUEGO turnos del motor por lotes
+#   tablero_saturado       2 jugadores con ~2600 fichas, como el final de
+#                          resultados_guerra_pixeles.txt pero sin ganador todavía
+#
+# Por escenario se mide, con cada motor:
+#   turnos_s           turnos por segundo
+#   kb_turno           memoria asignada por turno (pico de tracemalloc)
+#   bloques_turno      bloques que siguen asignados al acabar el turno (diferencia
+#                      entre instantáneas de tracemalloc)
+# (la memoria, en una pasada aparte que no cuenta para el tiempo) y, del motor
+# por lotes, veces_secuencial: cuántas veces más turnos por segundo da que el
+# secuencial sobre los mismos turnos (en tablero_saturado, más de 10). Del
+# dibujado se mide el tiempo de un fotograma fuera de pantalla (driver de vídeo
+# "dummy" de SDL): en frío (sin trozos guardados, como el primero o tras cambiar
+# el zoom), completo (tras invalidar, con los trozos guardados), incremental
+# (tras un turno) y en modo píxel (tras un turno, coste fijo por fotograma).
+#
+# Los resultados se comparan con un archivo base; una métrica más de un
+# --tolerancia peor que la base (--tolerancia-dibujado para los fotogramas)
+# cuenta como regresión y el programa sale con 1. Cada medida es la mediana de
+# varias repeticiones. La base solo vale para la máquina en la que se guardó:
+# en otra, vuelva a crearla con --guardar-base antes de comparar.
+#
+# Uso:
+#   python benchmark.py                  # medir y comparar con benchmark_base.json
+#   python benchmark.py --guardar-base   # medir y guardar como nueva base
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import juego_fichas as jf
+from tablero import VACIO, TIPO_VACIO, PESADA, PERFECTA
+
+ARCHIVO_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_base.json")
+SEMILLA = 1234
+TURNOS_MEDIO_JUEGO = 15         # con 8 jugadores el tablero se llena hacia el turno 30
+CELDAS_LIBRES_SATURADO = 25     # 2625 celdas - 25 libres = 2600 fichas
+TOLERANCIA = 0.25               # el ruido de la mediana de turnos ronda el 10 %
+TOLERANCIA_DIBUJADO = 0.40      # los fotogramas (unos pocos ms) varían hasta un 30 %
+MARGEN_BLOQUES = 10             # listas y diccionarios crecen a saltos: unos pocos bloques son ruido
+
+# Turnos medidos por repetición, los mismos con los dos motores: el coste del
+# turno cambia a lo largo de la partida y la comparación solo vale sobre el mismo tramo
+TURNOS_MEDIDOS = {"secuencial": 50, "lote": 50}
+TURNOS_MEMORIA = 10
+REPETICIONES = 9
+FOTOGRAMAS = 40
+
+# Sentido de cada métrica: +1 = más es mejor, -1 = menos es mejor
+SENTIDO = {"turnos_s": 1, "veces_secuencial": 1, "kb_turno": -1, "bloques_turno": -1, "ms_fotograma_frio": -1, "ms_fotograma_completo": -1,
+           "ms_fotograma_incremental": -1, "ms_fotograma_pixeles": -1}
+
+
+# --- ESCENARIOS ---
+# Cada escenario devuelve (colores de los jugadores, propietario, tipo, inactividad)
+# como matrices planas; el gestor de cada medición se crea a partir de ese estado.
+
+def _estado(gestor):
+    t = gestor.tablero
+    return gestor.player_colors_base, t._prop.copy(), t._tipo.copy(), t._inact.copy()
+
+
+def escenario_dos_jugadores_inicio():
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:2], jf.PROBABILIDAD_COMBATE_BASE, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None, semilla=SEMILLA)
+    gestor.colocar_fichas_iniciales()
+    return _estado(gestor)
+
+
+def escenario_ocho_jugadores_medio():
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:8], jf.PROBABILIDAD_COMBATE_BASE, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None, motor="lote", semilla=SEMILLA)
+    gestor.colocar_fichas_iniciales()
+    for _ in range(TURNOS_MEDIO_JUEGO):
+        if gestor.procesar_turno():
+            break
+    return _estado(gestor)
+
+
+def escenario_tablero_saturado():
+    """Dos territorios separados por una frontera irregular, casi sin celdas libres."""
+    aleatorio = random.Random(SEMILLA)
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:2], jf.PROBABILIDAD_COMBATE_BASE, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None, semilla=SEMILLA)
+    t = gestor.tablero
+    frontera = t.columnas // 2
+    for f in range(t.filas):
+        frontera = min(max(frontera + aleatorio.choice((-1, 0, 1)), 10), t.columnas - 10)
+        t.propietario[f, :frontera] = 0
+        t.propietario[f, frontera:] = 1
+    t._tipo[:] = PESADA
+    # Fichas perfectas humanas en el interior de su territorio, hasta el límite
+    interior = np.flatnonzero(t._prop == 0)
+    perfectas = aleatorio.sample(interior.tolist(), min(gestor.max_perfectas, interior.size // 2))
+    t._tipo[perfectas] = PERFECTA
+    libres = aleatorio.sample(range(t._prop.size), CELDAS_LIBRES_SATURADO)
+    t._prop[libres] = VACIO
+    t._tipo[libres] = TIPO_VACIO
+    return _estado(gestor)
+
+
+ESCENARIOS = {
+    "dos_jugadores_inicio": escenario_dos_jugadores_inicio,
+    "ocho_jugadores_medio": escenario_ocho_jugadores_medio,
+    "tablero_saturado": escenario_tablero_saturado,
+}
+
+
+def crear_gestor(estado, motor):
+    colores, prop, tipo, inact = estado
+    gestor = jf.GestorJuego(colores, jf.PROBABILIDAD_COMBATE_BASE, colores[0], tiempo_limite=None, motor=motor, semilla=SEMILLA)
+    t = gestor.tablero
+    t._prop[:] = prop
+    t._tipo[:] = tipo
+    t._inact[:] = inact
+    t.reconstruir_indices()
+    return gestor
+
+
+# --- MEDICIONES ---
+
+def medir_turnos(estado, motor):
+    """Mediana de la tasa de turnos por segundo de varias repeticiones."""
+    tasas = []
+    for _ in range(REPETICIONES):
+        gestor = crear_gestor(estado, motor)
+        turnos = 0
+        inicio = time.perf_counter()
+        while turnos < TURNOS_MEDIDOS[motor]:
+            turnos += 1
+            if gestor.procesar_turno():
+                break
+        tasas.append(turnos / (time.perf_counter() - inicio))
+    return statistics.median(tasas)
+
+
+def _foto_memoria():
+    """Instantánea de tracemalloc sin los bloques del propio tracemalloc."""
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+
+def medir_memoria(estado, motor):
+    """
+    Medianas por turno de los KB asignados (pico sobre lo ya ocupado) y de los
+    bloques que quedan asignados al acabar el turno (diferencia entre las
+    instantáneas de antes y de después, sumando las líneas que crecen).
+    """
+    gestor = crear_gestor(estado, motor)
+    gestor.procesar_turno() # Cachés y estructuras perezosas fuera de la medición
+    kb, bloques = [], []
+    tracemalloc.start()
+    for _ in range(TURNOS_MEMORIA):
+        foto = _foto_memoria()
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+        gestor.procesar_turno()
+        kb.append((tracemalloc.get_traced_memory()[1] - antes) / 1024)
+        diferencias = _foto_memoria().compare_to(foto, "lineno")
+        bloques.append(sum(d.count_diff for d in diferencias if d.count_diff > 0))
+        del foto, diferencias
+    tracemalloc.stop()
+    return statistics.median(kb), statistics.median(bloques)
+
+
+def medir_fotogramas(estado):
+    """
+    Mediana en ms de un fotograma en frío, de uno completo, de uno incremental
+    y de uno en modo píxel tras un turno.
+    """
+    gestor = crear_gestor(estado, "lote")
+    jf.gestor = gestor
+    botones = jf.crear_botones_velocidad()
+    renderizador = jf.RenderizadorInterfaz(gestor)
+    renderizador.dibujar(1, False, botones)
+
+    frios, completos, incrementales = [], [], []
+    for _ in range(FOTOGRAMAS):
+        # En frío: también se descartan los trozos del tablero ya dibujados
+        renderizador.invalidar()
+        renderizador.trozos.clear()
+        inicio = time.perf_counter()
+        renderizador.dibujar(1, False, botones)
+        frios.append(time.perf_counter() - inicio)
+
+        renderizador.invalidar()
+        inicio = time.perf_counter()
+        renderizador.dibujar(1, False, botones)
+        completos.append(time.perf_counter() - inicio)
+
+        gestor.procesar_turno()
+        inicio = time.perf_counter()
+        renderizador.dibujar(1, False, botones)
+        incrementales.append(time.perf_counter() - inicio)
+
+    renderizador.pixeles = True
+    renderizador.dibujar(1, False, botones)
+    pixeles = []
+    for _ in range(FOTOGRAMAS):
+        gestor.procesar_turno()
+        inicio = time.perf_counter()
+        renderizador.dibujar(1, False, botones)
+        pixeles.append(time.perf_counter() - inicio)
+    return tuple(statistics.median(tiempos) * 1000 for tiempos in (frios, completos, incrementales, pixeles))
+
+
+def ejecutar(escenarios):
+    resultados = {}
+    for nombre in escenarios:
+        estado = ESCENARIOS[nombre]()
+        print(f"{nombre}: {int(np.count_nonzero(estado[1] != VACIO))} fichas, {len(estado[0])} jugadores", file=sys.stderr)
+        for motor in TURNOS_MEDIDOS:
+            kb, bloques = medir_memoria(estado, motor)
+            resultados[f"{nombre}/{motor}"] = {
+                "turnos_s": round(medir_turnos(estado, motor), 2),
+                "kb_turno": round(kb, 1),
+                "bloques_turno": int(bloques),
+            }
+        resultados[f"{nombre}/lote"]["veces_secuencial"] = round(
+            resultados[f"{nombre}/lote"]["turnos_s"] / resultados[f"{nombre}/secuencial"]["turnos_s"], 2)
+        frio, completo, incremental, pixeles = medir_fotogramas(estado)
+        resultados[f"{nombre}/dibujado"] = {
+            "ms_fotograma_frio": round(frio, 3),
+            "ms_fotograma_completo": round(completo, 3),
+            "ms_fotograma_incremental": round(incremental, 3),
+            "ms_fotograma_pixeles": round(pixeles, 3),
+        }
+    return resultados
+
+
+# --- COMPARACIÓN CON LA BASE ---
+
+def comparar(resultados, base, tolerancia, tolerancia_dibujado):
+    """Imprime cada métrica frente a la base y devuelve la lista de regresiones."""
+    regresiones = []
+    print(f"\n{'Medida':<55} {'Actual':>11} {'Base':>11} {'Cambio':>8}")
+    for clave, metricas in resultados.items():
+        for metrica, valor in metricas.items():
+            anterior = base.get(clave, {}).get(metrica)
+            nombre = f"{clave}/{metrica}"
+            if anterior is None:
+                print(f"{nombre:<55} {valor:>11} {'-':>11}")
+                continue
+            cambio = (valor - anterior) / anterior if anterior else 0.0
+            # Empeora si baja lo que debe subir o sube lo que debe bajar
+            admitido = tolerancia_dibujado if metrica.startswith("ms_fotograma") else tolerancia
+            empeora = cambio * SENTIDO[metrica] < -admitido
+            if metrica == "bloques_turno":
+                empeora = empeora and valor - anterior > MARGEN_BLOQUES
+            if empeora:
+                regresiones.append(nombre)
+            print(f"{nombre:<55} {valor:>11} {anterior:>11} {cambio:>+8.1%}{'  << REGRESIÓN' if empeora else ''}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de la Guerra de Píxeles.")
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--base", default=ARCHIVO_BASE, help="archivo JSON con la base de comparación")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar los resultados como nueva base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="empeoramiento relativo admitido (0.25 = 25%%)")
+    parser.add_argument("--tolerancia-dibujado", type=float, default=TOLERANCIA_DIBUJADO,
+                        help="empeoramiento relativo admitido en los fotogramas")
+    args = parser.parse_args(argv)
+
+    jf.inicializar_pygame()
+    resultados = ejecutar(args.escenarios)
+
+    base = {}
+    if os.path.exists(args.base):
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f).get("resultados", {})
+    regresiones = comparar(resultados, base, args.tolerancia, args.tolerancia_dibujado)
+
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump({
+                "nota": "Medidas de una sola máquina: en otra, cree su propia base con --guardar-base",
+                "python": platform.python_version(),
+                "maquina": platform.machine(),
+                "sistema": platform.platform(),
+                "resultados": {**base, **resultados},
+            }, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nBase guardada en {args.base}")
+    elif not base:
+        print("\nSin base de comparación: ejecute con --guardar-base para crearla")
+    elif regresiones:
+        print(f"\n{len(regresiones)} regresiones (tolerancia {args.tolerancia:.0%}, "
+              f"{args.tolerancia_dibujado:.0%} en los fotogramas)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# camara.py
+# Cámara del tablero de la Guerra de Píxeles: qué parte del tablero se ve y a qué zoom.
+#
+# La vista es un rectángulo de ancho x alto píxeles de pantalla. La posición
+# (x, y) es la esquina superior izquierda de la vista en píxeles del tablero al
+# zoom actual, donde cada celda mide `celda` píxeles. El dibujo recorre el
+# tablero por trozos de TAMANO_TROZO x TAMANO_TROZO celdas y solo visita los
+# trozos que caen dentro de la vista.
+
+from tablero import TAMANO_TROZO
+
+NIVELES_ZOOM = (1, 2, 5, 10, 20, 40)     # píxeles por celda (por debajo de 5, modo píxel)
+
+
+class Camara:
+    def __init__(self, ancho, alto, filas, columnas, celda=20):
+        self.ancho = ancho
+        self.alto = alto
+        self.filas = filas
+        self.columnas = columnas
+        self.celda = celda
+        self.x = 0
+        self.y = 0
+
+    @property
+    def estado(self):
+        """Posición y zoom: si no cambian, la vista compuesta sigue valiendo."""
+        return self.x, self.y, self.celda
+
+    def _limitar(self):
+        # Sin salirse del tablero; si el tablero cabe entero, pegado a la esquina
+        self.x = min(max(self.x, 0), max(0, self.columnas * self.celda - self.ancho))
+        self.y = min(max(self.y, 0), max(0, self.filas * self.celda - self.alto))
+
+    def desplazar(self, dx, dy):
+        """Mueve la vista dx, dy píxeles de pantalla."""
+        self.x += int(dx)
+        self.y += int(dy)
+        self._limitar()
+
+    def acercar(self, pasos, ancla=None):
+        """
+        Sube (pasos > 0) o baja el zoom por NIVELES_ZOOM manteniendo fijo el punto
+        del tablero bajo `ancla` (posición en la vista; por defecto, el centro).
+        """
+        nivel = NIVELES_ZOOM.index(self.celda) if self.celda in NIVELES_ZOOM else NIVELES_ZOOM.index(20)
+        nueva = NIVELES_ZOOM[min(max(nivel + pasos, 0), len(NIVELES_ZOOM) - 1)]
+        if nueva == self.celda:
+            return
+        ax, ay = ancla if ancla is not None else (self.ancho // 2, self.alto // 2)
+        escala = nueva / self.celda
+        self.x = round((self.x + ax) * escala - ax)
+        self.y = round((self.y + ay) * escala - ay)
+        self.celda = nueva
+        self._limitar()
+
+    def centrar_en(self, fila, columna):
+        self.x = round((columna + 0.5) * self.celda - self.ancho / 2)
+        self.y = round((fila + 0.5) * self.celda - self.alto / 2)
+        self._limitar()
+
+    def celda_en(self, px, py):
+        """(fila, columna) bajo un punto de la vista, o None si cae fuera del tablero."""
+        fila, columna = (self.y + py) // self.celda, (self.x + px) // self.celda
+        if 0 <= fila < self.filas and 0 <= columna < self.columnas:
+            return fila, columna
+        return None
+
+    def rango_celdas(self):
+        """Celdas visibles: (fila inicial, fila final, columna inicial, columna final), finales excluidas."""
+        return (
+            self.y // self.celda,
+            min(self.filas, -(-(self.y + self.alto) // self.celda)),
+            self.x // self.celda,
+            min(self.columnas, -(-(self.x + self.ancho) // self.celda)),
+        )
+
+    def trozos_visibles(self):
+        """Lista de (fila, columna) de trozo que se ven, por filas."""
+        f0, f1, c0, c1 = self.rango_celdas()
+        return [
+            (tf, tc)
+            for tf in range(f0 // TAMANO_TROZO, -(-f1 // TAMANO_TROZO))
+            for tc in range(c0 // TAMANO_TROZO, -(-c1 // TAMANO_TROZO))
+        ]
+
+    def origen_trozo(self, tf, tc):
+        """Posición en la vista de la esquina superior izquierda del trozo."""
+        lado = TAMANO_TROZO * self.celda
+        return tc * lado - self.x, tf * lado - self.y
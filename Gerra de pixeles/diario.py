@@ -0,0 +1,171 @@
+# diario.py
+# Diario binario de partida de la Guerra de Píxeles.
+#
+# Formato (little-endian):
+#   cabecera   "GPXD", versión (uint16), longitud (uint32) y configuración en JSON
+#              (semilla, jugadores, motor, tamaño del tablero...)
+#   por turno  número de turno (uint32), número de eventos (uint32) y los eventos
+#
+# Cada evento es un cambio de celda respecto al turno anterior: celda, clase,
+# propietario y tipo nuevos (7 bytes). El turno 0 es la colocación inicial.
+# Los eventos se obtienen comparando las matrices del tablero al final de cada
+# turno, así que valen para cualquier motor; un movimiento aparece como una
+# BAJA en la celda de origen y un ALTA en la de destino.
+#
+# Al reproducir no se vuelven a aplicar las reglas: se aplican los cambios de
+# celda, con fotogramas clave cada pocos turnos para saltar a cualquier turno.
+
+import json
+import struct
+
+import numpy as np
+
+from tablero import VACIO, TIPO_VACIO
+
+MAGIA = b"GPXD"
+VERSION = 1
+CABECERA = struct.Struct("<4sHI")
+REGISTRO_TURNO = struct.Struct("<II")
+
+# Clases de evento
+ALTA = 0            # ficha nueva en una celda vacía (multiplicación o destino de un movimiento)
+BAJA = 1            # la celda queda vacía (origen de un movimiento)
+CONVERSION = 2      # la ficha cambia de propietario (combate)
+CAMBIO_TIPO = 3     # la ficha cambia de tipo (ascenso, propagación, reemplazo táctico)
+NOMBRES_EVENTO = ("alta", "baja", "conversion", "cambio_tipo")
+
+EVENTO = np.dtype([('celda', '<u4'), ('clase', 'u1'), ('propietario', 'i1'), ('tipo', 'i1')])
+
+
+class DiarioPartida:
+    """Escritor del diario: registrar_turno() al final de cada turno."""
+
+    def __init__(self, ruta, configuracion):
+        self.ruta = ruta
+        self._archivo = open(ruta, "wb")
+        datos = json.dumps(configuracion, ensure_ascii=False).encode("utf-8")
+        self._archivo.write(CABECERA.pack(MAGIA, VERSION, len(datos)))
+        self._archivo.write(datos)
+        self._prop = None
+        self._tipo = None
+
+    def registrar_turno(self, turno, tablero):
+        prop, tipo = tablero._prop, tablero._tipo
+        if self._prop is None:
+            self._prop = np.full_like(prop, VACIO)
+            self._tipo = np.full_like(tipo, TIPO_VACIO)
+
+        celdas = np.flatnonzero((prop != self._prop) | (tipo != self._tipo))
+        antes, despues = self._prop[celdas], prop[celdas]
+        eventos = np.empty(celdas.size, dtype=EVENTO)
+        eventos['celda'] = celdas
+        eventos['propietario'] = despues
+        eventos['tipo'] = tipo[celdas]
+        eventos['clase'] = np.select(
+            [antes == VACIO, despues == VACIO, antes != despues],
+            [ALTA, BAJA, CONVERSION],
+            CAMBIO_TIPO,
+        )
+
+        self._archivo.write(REGISTRO_TURNO.pack(turno, celdas.size))
+        self._archivo.write(eventos.tobytes())
+        self._prop[celdas] = despues
+        self._tipo[celdas] = tipo[celdas]
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+
+
+class ReproduccionPartida:
+    """Lector del diario: estado del tablero en cualquier turno registrado."""
+
+    INTERVALO_CLAVE = 64    # turnos entre fotogramas clave
+
+    def __init__(self, ruta):
+        with open(ruta, "rb") as f:
+            datos = f.read()
+
+        magia, version, longitud = CABECERA.unpack_from(datos, 0)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{ruta} no es un diario de partida válido")
+        desplazamiento = CABECERA.size
+        self.configuracion = json.loads(datos[desplazamiento:desplazamiento + longitud].decode("utf-8"))
+        desplazamiento += longitud
+
+        # Eventos de cada turno (vistas sobre los datos leídos). Un diario cortado
+        # (partida interrumpida) se lee hasta el último turno completo.
+        self.turnos = []
+        self.eventos = []
+        while desplazamiento + REGISTRO_TURNO.size <= len(datos):
+            turno, n = REGISTRO_TURNO.unpack_from(datos, desplazamiento)
+            desplazamiento += REGISTRO_TURNO.size
+            if desplazamiento + n * EVENTO.itemsize > len(datos):
+                break
+            self.turnos.append(turno)
+            self.eventos.append(np.frombuffer(datos, dtype=EVENTO, count=n, offset=desplazamiento))
+            desplazamiento += n * EVENTO.itemsize
+        if not self.turnos:
+            raise ValueError(f"{ruta} no contiene ningún turno")
+
+        # Fotogramas clave: estado tras los turnos 0, INTERVALO_CLAVE, 2 * INTERVALO_CLAVE...
+        num_celdas = self.configuracion['filas'] * self.configuracion['columnas']
+        prop = np.full(num_celdas, VACIO, dtype=np.int8)
+        tipo = np.full(num_celdas, TIPO_VACIO, dtype=np.int8)
+        self._claves = []
+        for k, eventos in enumerate(self.eventos):
+            self._aplicar(prop, tipo, eventos)
+            if k % self.INTERVALO_CLAVE == 0:
+                self._claves.append((prop.copy(), tipo.copy()))
+
+    @property
+    def primer_turno(self):
+        return self.turnos[0]
+
+    @property
+    def ultimo_turno(self):
+        return self.turnos[-1]
+
+    @staticmethod
+    def _aplicar(prop, tipo, eventos):
+        celdas = eventos['celda']
+        prop[celdas] = eventos['propietario']
+        tipo[celdas] = eventos['tipo']
+
+    def estado(self, turno):
+        """Matrices planas (propietario, tipo) al final del turno indicado."""
+        k = min(max(turno, self.primer_turno), self.ultimo_turno) - self.primer_turno
+        base = k - k % self.INTERVALO_CLAVE
+        prop, tipo = (plano.copy() for plano in self._claves[base // self.INTERVALO_CLAVE])
+        for eventos in self.eventos[base + 1:k + 1]:
+            self._aplicar(prop, tipo, eventos)
+        return prop, tipo
+
+    def recorrer(self, paso=1):
+        """
+        Recorre los turnos en orden aplicando sus cambios, uno de cada `paso` (y
+        siempre el último): (turno, propietario, tipo) con matrices planas que se
+        reutilizan de un turno al siguiente.
+        """
+        num_celdas = self.configuracion['filas'] * self.configuracion['columnas']
+        prop = np.full(num_celdas, VACIO, dtype=np.int8)
+        tipo = np.full(num_celdas, TIPO_VACIO, dtype=np.int8)
+        ultimo = len(self.turnos) - 1
+        for k, eventos in enumerate(self.eventos):
+            self._aplicar(prop, tipo, eventos)
+            if k % paso == 0 or k == ultimo:
+                yield self.turnos[k], prop, tipo
+
+    def cargar_en(self, tablero, turno):
+        """Pone el tablero en el estado del turno indicado (con contadores y frontera)."""
+        prop, tipo = self.estado(turno)
+        tablero._prop[:] = prop
+        tablero._tipo[:] = tipo
+        tablero._inact[:] = 0
+        tablero.reconstruir_indices()
+
+    def resumen_eventos(self, turno):
+        """Número de eventos de cada clase en el turno indicado."""
+        k = min(max(turno, self.primer_turno), self.ultimo_turno) - self.primer_turno
+        conteo = np.bincount(self.eventos[k]['clase'], minlength=len(NOMBRES_EVENTO))
+        return dict(zip(NOMBRES_EVENTO, conteo.tolist()))
@@ -0,0 +1,119 @@
+# eventos.py
+# Registro de eventos de la Guerra de Píxeles.
+#
+# Las reglas no escriben texto: cada acción se anota como un evento compacto,
+# la tupla (turno, código, jugador, otro, a, b, c, d), en un anillo con los
+# últimos eventos. "otro" es el segundo jugador implicado (-1 si no hay) y a-d
+# los datos del evento (tipos, puntuaciones, contadores...). El texto con
+# nombres y emoji solo se forma para las filas que se dibujan (texto_evento),
+# así que un turno con miles de combates no formatea miles de cadenas.
+#
+# Para analizar una partida, el registro puede además guardar todos los eventos
+# en un archivo binario de registros EVENTO (little-endian, sin cabecera):
+#   np.fromfile(ruta, dtype=eventos.EVENTO)
+
+from collections import deque
+
+import numpy as np
+
+from tablero import NOMBRES_TIPO
+
+EVENTO = np.dtype([
+    ('turno', '<u4'), ('codigo', 'u1'), ('jugador', 'i1'), ('otro', 'i1'),
+    ('a', '<i4'), ('b', '<i4'), ('c', '<i4'), ('d', '<i4'),
+])
+
+# Códigos de evento (datos a-d entre paréntesis)
+SEPARADOR = 0           # línea de separación entre turnos
+INICIO_TURNO = 1        # (total de fichas)
+PROPAGACION = 2         # perfecta propaga a una aliada (tipo anterior)
+PROPAGACION_LOTE = 3    # propagación del motor por lotes (fichas propagadas)
+COMBATE_EMPATE = 4      # (puntuación propia, puntuación rival)
+COMBATE_VICTORIA = 5    # jugador tiñe a otro (tipo resultante)
+REEMPLAZO = 6           # perfecta intercambia su celda con una aliada (tipo de la aliada)
+TOMA_POSICION = 7       # perfecta tiñe a un rival tras el reemplazo
+BRECHA_VICTORIA = 8     # perfecta gana a otra perfecta en la brecha
+BRECHA_EMPATE = 9       # perfecta no gana a otra perfecta en la brecha
+MULTIPLICACION = 10     # (tipo de la ficha, rama de motor_lote.RAMA_*, fichas creadas)
+ABRE_BRECHA = 11        # perfecta humana se mueve junto a un rival
+AVANCE_PERFECTA = 12    # perfecta humana se mueve sin brecha
+MOVIMIENTO = 13         # movimiento del resto de fichas móviles
+ASCENSO_FUERTE = 14     # ligera humana asciende a pesada por inactividad
+ASCENSO_PERFECTA = 15   # pesada humana asciende a perfecta por inactividad
+RESUMEN_LOTE = 16       # (combates, reemplazos, multiplicaciones, movimientos)
+NOMBRES_CODIGO = (
+    "separador", "inicio_turno", "propagacion", "propagacion_lote", "combate_empate",
+    "combate_victoria", "reemplazo", "toma_posicion", "brecha_victoria", "brecha_empate",
+    "multiplicacion", "abre_brecha", "avance_perfecta", "movimiento",
+    "ascenso_fuerte", "ascenso_perfecta", "resumen_lote",
+)
+
+# Texto de cada rama de multiplicación (mismo orden que motor_lote.RAMA_*); {e} es el emoji de perfecta
+TEXTOS_RAMA = (
+    "x3 Rápidas", "x1 Fuerte", "x2 Fuertes", "x4 Rápidas", "x2 Fuertes + 1 {e}",
+    "x4 Rápidas + 1 {e}", "x3 (1F, 2R)", "x3 Fuertes", "x1 {e}, x1 Fuerte, x1 Rápida",
+)
+
+
+def _inicial(tipo):
+    return NOMBRES_TIPO[tipo][0].upper()
+
+
+# Texto de cada código: función (nombre, emoji, turno, jugador, otro, a, b, c, d) -> str.
+# nombre(j, con_emoji=False) es el nombre para mostrar del jugador j.
+PLANTILLAS = {
+    SEPARADOR: lambda n, e, t, j, o, a, b, c, d: "=" * 40,
+    INICIO_TURNO: lambda n, e, t, j, o, a, b, c, d: f"TURNO {t} - Total fichas: {a}",
+    PROPAGACION: lambda n, e, t, j, o, a, b, c, d: f"👑 {n(j, True)} propaga a {NOMBRES_TIPO[a].upper()}!",
+    PROPAGACION_LOTE: lambda n, e, t, j, o, a, b, c, d: f"👑 {n(j, True)} propaga a {a} fichas!",
+    COMBATE_EMPATE: lambda n, e, t, j, o, a, b, c, d: f"⚔️ {n(j)} vs {n(o)} -> EMPATE ({a}/{b})",
+    COMBATE_VICTORIA: lambda n, e, t, j, o, a, b, c, d: f"⚔️ {n(j)} GANA y tiñe a {n(o)} en {_inicial(a)}",
+    REEMPLAZO: lambda n, e, t, j, o, a, b, c, d: f"🔄 {n(j)} PERFECTA hace Reemplazo Táctico con aliada {_inicial(a)}!",
+    TOMA_POSICION: lambda n, e, t, j, o, a, b, c, d: f"💥 {n(j)} PERFECTA TOMA POSICIÓN y tiñe a {n(o)}!",
+    BRECHA_VICTORIA: lambda n, e, t, j, o, a, b, c, d: f"⚔️ {n(j)} GANA (PERF vs PERF) en Brecha! {n(o)} teñido a FUERTE.",
+    BRECHA_EMPATE: lambda n, e, t, j, o, a, b, c, d: f"⚔️ {n(j)} EMPATE (PERF vs PERF) en Brecha.",
+    MULTIPLICACION: lambda n, e, t, j, o, a, b, c, d: f"➕ {n(j)} se multiplica ({_inicial(a)} -> {TEXTOS_RAMA[b].format(e=e)}, {c} creadas)",
+    ABRE_BRECHA: lambda n, e, t, j, o, a, b, c, d: f"➡️ {n(j)} PERFECTA Abre Brecha!",
+    AVANCE_PERFECTA: lambda n, e, t, j, o, a, b, c, d: f"↗️ {n(j)} PERFECTA Avanza",
+    MOVIMIENTO: lambda n, e, t, j, o, a, b, c, d: f"↗️ {n(j)} RÁPIDA/PERFECTA IA se mueve",
+    ASCENSO_FUERTE: lambda n, e, t, j, o, a, b, c, d: f"⭐ {n(j)} Rápida ASCIENDE a Fuerte por inactividad!",
+    ASCENSO_PERFECTA: lambda n, e, t, j, o, a, b, c, d: f"{e} {n(j)} Fuerte ASCIENDE a PERFECTA por inactividad!",
+    RESUMEN_LOTE: lambda n, e, t, j, o, a, b, c, d: f"⚔️ {a} combates | 🔄 {b} reemplazos | ➕ {c} multiplicaciones | ↗️ {d} movimientos",
+}
+
+
+def texto_evento(evento, nombre, emoji):
+    """Texto para mostrar de un evento del anillo. Los textos libres (str) se devuelven tal cual."""
+    if isinstance(evento, str):
+        return evento
+    turno, codigo = evento[0], evento[1]
+    return f"[{turno:03d}] {PLANTILLAS[codigo](nombre, emoji, turno, *evento[2:])}"
+
+
+class RegistroEventos:
+    def __init__(self, capacidad):
+        self.recientes = deque(maxlen=capacidad)   # anillo de eventos (o textos libres)
+        self._archivo = None
+        self._pendientes = []
+
+    def anotar(self, turno, codigo, jugador=-1, otro=-1, a=0, b=0, c=0, d=0):
+        evento = (turno, codigo, jugador, otro, a, b, c, d)
+        self.recientes.append(evento)
+        if self._archivo is not None:
+            self._pendientes.append(evento)
+
+    def abrir(self, ruta):
+        """Empieza a guardar todos los eventos (no solo los recientes) en un archivo."""
+        self._archivo = open(ruta, "wb")
+
+    def volcar(self):
+        """Escribe en el archivo los eventos pendientes (al final de cada turno)."""
+        if self._pendientes:
+            np.array(self._pendientes, dtype=EVENTO).tofile(self._archivo)
+            self._pendientes.clear()
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self.volcar()
+            self._archivo.close()
+            self._archivo = None
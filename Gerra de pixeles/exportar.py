@@ -0,0 +1,172 @@
+# exportar.py
+# Exportación de partidas de la Guerra de Píxeles a GIF animado o a secuencia PNG.
+#
+# Los fotogramas llegan como matrices (alto, ancho) de índices de una paleta
+# (uint8) y se codifican directamente, sin superficies de pygame ni ventana:
+#   GIF   GIF89a con paleta global y repetición infinita. Cada fotograma guarda
+#         solo el rectángulo que cambió respecto al anterior (sin borrar el resto),
+#         así que los turnos tranquilos ocupan y cuestan poco.
+#   PNG   un archivo PNG de paleta por fotograma (fotograma_00000.png, ...).
+# La compresión LZW del GIF es la única parte que recorre píxel a píxel; el
+# empaquetado de bits, los recortes y el escalado son operaciones de NumPy.
+
+import os
+import struct
+import zlib
+
+import numpy as np
+
+MAX_CODIGOS_LZW = 4096          # códigos de 12 bits como máximo (norma GIF)
+BYTES_SUBBLOQUE = 255
+
+
+def _bits_paleta(colores):
+    """Bits por índice de una paleta de ese número de colores (la tabla GIF mide 2**bits)."""
+    return max(2, int(colores - 1).bit_length())
+
+
+def _lzw(indices, bits_minimos):
+    """Comprime los índices (uint8) con el LZW de GIF. Devuelve los bytes empaquetados."""
+    limpiar = 1 << bits_minimos
+    fin = limpiar + 1
+    codigos = [limpiar]
+    anchos = [bits_minimos + 1]
+
+    tabla = {}
+    siguiente = fin + 1
+    ancho = bits_minimos + 1
+    pixeles = indices.tolist()
+    actual = pixeles[0]
+    for pixel in pixeles[1:]:
+        clave = actual << 8 | pixel
+        codigo = tabla.get(clave)
+        if codigo is not None:
+            actual = codigo
+            continue
+        codigos.append(actual)
+        anchos.append(ancho)
+        if siguiente < MAX_CODIGOS_LZW:
+            tabla[clave] = siguiente
+            if siguiente == 1 << ancho:
+                ancho += 1
+            siguiente += 1
+        else:
+            # Tabla llena: se vacía y se empieza de nuevo
+            codigos.append(limpiar)
+            anchos.append(ancho)
+            tabla.clear()
+            siguiente = fin + 1
+            ancho = bits_minimos + 1
+        actual = pixel
+    codigos.extend((actual, fin))
+    anchos.extend((ancho, ancho))
+
+    # Cada código ocupa sus `ancho` bits menos significativos, del primero al último
+    codigos = np.array(codigos, dtype=np.uint16)
+    anchos = np.array(anchos, dtype=np.uint8)
+    posiciones = np.arange(12, dtype=np.uint16)
+    bits = ((codigos[:, None] >> posiciones) & 1).astype(np.uint8)
+    return np.packbits(bits[posiciones[None, :] < anchos[:, None]], bitorder='little').tobytes()
+
+
+class EscritorGif:
+    """GIF animado: agregar() con cada fotograma y cerrar() al terminar."""
+
+    def __init__(self, ruta, ancho, alto, paleta, retardo_ms):
+        self.ruta = ruta
+        self.ancho = ancho
+        self.alto = alto
+        self.fotogramas = 0
+        self._bits = _bits_paleta(len(paleta))
+        self._retardo = max(1, round(retardo_ms / 10))      # centésimas de segundo
+        self._anterior = None
+
+        tabla = np.zeros((1 << self._bits, 3), dtype=np.uint8)
+        tabla[:len(paleta)] = paleta
+        self._archivo = open(ruta, "wb")
+        self._archivo.write(b"GIF89a")
+        self._archivo.write(struct.pack("<HHBBB", ancho, alto, 0xF0 | (self._bits - 1), 0, 0))
+        self._archivo.write(tabla.tobytes())
+        # Extensión NETSCAPE2.0: repetir sin fin
+        self._archivo.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def agregar(self, indices):
+        """Añade un fotograma (alto, ancho) de índices de la paleta."""
+        if self._anterior is None:
+            f0, f1, c0, c1 = 0, self.alto, 0, self.ancho
+        else:
+            cambios = indices != self._anterior
+            filas = np.flatnonzero(cambios.any(axis=1))
+            if filas.size:
+                columnas = np.flatnonzero(cambios[filas[0]:filas[-1] + 1].any(axis=0))
+                f0, f1, c0, c1 = filas[0], filas[-1] + 1, columnas[0], columnas[-1] + 1
+            else:
+                # Sin cambios: un píxel repetido mantiene el ritmo de la animación
+                f0, f1, c0, c1 = 0, 1, 0, 1
+        self._anterior = indices.copy()
+        recorte = np.ascontiguousarray(indices[f0:f1, c0:c1])
+
+        escribir = self._archivo.write
+        # Control gráfico: sin borrar el fotograma anterior (disposición 1) y el retardo
+        escribir(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 1 << 2, self._retardo, 0, 0))
+        escribir(struct.pack("<BHHHHB", 0x2C, int(c0), int(f0), int(c1 - c0), int(f1 - f0), 0))
+        escribir(bytes((self._bits,)))
+        datos = _lzw(recorte.reshape(-1), self._bits)
+        for inicio in range(0, len(datos), BYTES_SUBBLOQUE):
+            bloque = datos[inicio:inicio + BYTES_SUBBLOQUE]
+            escribir(bytes((len(bloque),)))
+            escribir(bloque)
+        escribir(b"\x00")
+        self.fotogramas += 1
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.write(b"\x3b")
+            self._archivo.close()
+
+
+def _fragmento_png(tipo, datos):
+    return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+
+class EscritorPng:
+    """Secuencia de PNG de paleta en un directorio (se crea si no existe)."""
+
+    def __init__(self, directorio, ancho, alto, paleta):
+        self.ruta = directorio
+        self.ancho = ancho
+        self.alto = alto
+        self.fotogramas = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._cabecera = (
+            b"\x89PNG\r\n\x1a\n"
+            + _fragmento_png(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 8, 3, 0, 0, 0))
+            + _fragmento_png(b"PLTE", np.asarray(paleta, dtype=np.uint8).tobytes())
+        )
+        self._filas = np.zeros((alto, ancho + 1), dtype=np.uint8)   # byte de filtro 0 + fila
+
+    def agregar(self, indices):
+        self._filas[:, 1:] = indices
+        ruta = os.path.join(self.ruta, f"fotograma_{self.fotogramas:05d}.png")
+        with open(ruta, "wb") as f:
+            f.write(self._cabecera)
+            f.write(_fragmento_png(b"IDAT", zlib.compress(self._filas.tobytes(), 6)))
+            f.write(_fragmento_png(b"IEND", b""))
+        self.fotogramas += 1
+
+    def cerrar(self):
+        pass
+
+
+def crear_escritor(ruta, ancho, alto, paleta, retardo_ms):
+    """EscritorGif si la ruta termina en .gif; si no, EscritorPng en ese directorio."""
+    if ruta.lower().endswith(".gif"):
+        return EscritorGif(ruta, ancho, alto, paleta, retardo_ms)
+    return EscritorPng(ruta, ancho, alto, paleta)
+
+
+def escalar(indices, escala):
+    """Cada celda como un cuadrado de escala x escala píxeles."""
+    if escala == 1:
+        return indices
+    return np.repeat(np.repeat(indices, escala, axis=0), escala, axis=1)
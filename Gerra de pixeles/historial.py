@@ -0,0 +1,118 @@
+# historial.py
+# Historial de propietarios de la Guerra de Píxeles, en un archivo mapeado en memoria.
+#
+# Formato (little-endian):
+#   cabecera   "GPXH", versión (uint16), longitud (uint32) y configuración en JSON,
+#              rellenada con espacios hasta un múltiplo de ALINEACION bytes
+#   por turno  número de turno (uint32) y, por celda, propietario + 1 (uint8, 0 = vacía)
+#
+# A diferencia del diario (cambios de celda), cada turno guarda la cuadrícula
+# entera: todos los registros miden lo mismo y el archivo se abre con np.memmap
+# como una matriz (turnos, celdas) sin leerlo entero. Los análisis recorren esa
+# matriz por bloques de unos BYTES_BLOQUE bytes, así que la memoria usada no
+# crece con la duración de la partida.
+
+import json
+import struct
+
+import numpy as np
+
+MAGIA = b"GPXH"
+VERSION = 1
+CABECERA = struct.Struct("<4sHI")
+ALINEACION = 64
+BYTES_BLOQUE = 16 * 1024 * 1024
+
+
+def tipo_registro(num_celdas):
+    return np.dtype([('turno', '<u4'), ('propietario', 'u1', num_celdas)])
+
+
+class HistorialPropietarios:
+    """Escritor del historial: registrar_turno() al final de cada turno."""
+
+    def __init__(self, ruta, configuracion):
+        self.ruta = ruta
+        self._archivo = open(ruta, "wb")
+        datos = json.dumps(configuracion, ensure_ascii=False).encode("utf-8")
+        datos += b" " * (-(CABECERA.size + len(datos)) % ALINEACION)
+        self._archivo.write(CABECERA.pack(MAGIA, VERSION, len(datos)))
+        self._archivo.write(datos)
+        self._registro = np.zeros(1, dtype=tipo_registro(configuracion['filas'] * configuracion['columnas']))
+
+    def registrar_turno(self, turno, tablero):
+        self._registro['turno'] = turno
+        np.add(tablero._prop, 1, out=self._registro['propietario'][0], casting='unsafe')
+        self._archivo.write(self._registro.tobytes())
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.close()
+
+
+class AnalisisHistorial:
+    """Lector del historial: territorio, celdas disputadas y longitud del frente."""
+
+    def __init__(self, ruta):
+        with open(ruta, "rb") as f:
+            magia, version, longitud = CABECERA.unpack(f.read(CABECERA.size))
+            if magia != MAGIA or version != VERSION:
+                raise ValueError(f"{ruta} no es un historial de propietarios válido")
+            self.configuracion = json.loads(f.read(longitud).decode("utf-8"))
+            f.seek(0, 2)
+            tamano = f.tell()
+        self.filas = self.configuracion['filas']
+        self.columnas = self.configuracion['columnas']
+        self.num_jugadores = len(self.configuracion['player_colors_base'])
+
+        # Un historial cortado (partida interrumpida) se lee hasta el último turno completo
+        tipo = tipo_registro(self.filas * self.columnas)
+        inicio = CABECERA.size + longitud
+        num_turnos = (tamano - inicio) // tipo.itemsize
+        if num_turnos == 0:
+            raise ValueError(f"{ruta} no contiene ningún turno")
+        self.registros = np.memmap(ruta, dtype=tipo, mode="r", offset=inicio, shape=(num_turnos,))
+        self.turnos = np.array(self.registros['turno'])
+
+    def __len__(self):
+        return len(self.turnos)
+
+    def _bloques(self):
+        """Recorre los turnos por bloques: (índice del primero, matriz (turnos, celdas) uint8)."""
+        por_bloque = max(1, BYTES_BLOQUE // self.registros.dtype.itemsize)
+        for inicio in range(0, len(self), por_bloque):
+            yield inicio, np.asarray(self.registros['propietario'][inicio:inicio + por_bloque])
+
+    def analizar(self):
+        """
+        Recorre el historial una vez y devuelve un diccionario con:
+          territorio  (turnos, jugadores) celdas de cada jugador en cada turno
+          disputa     (filas, columnas) veces que cada celda pasó de un jugador a otro
+          frente      (turnos,) pares de celdas vecinas de jugadores distintos
+        """
+        territorio = np.zeros((len(self), self.num_jugadores), dtype=np.int32)
+        disputa = np.zeros(self.filas * self.columnas, dtype=np.int32)
+        frente = np.zeros(len(self), dtype=np.int32)
+        anterior = None
+        for inicio, bloque in self._bloques():
+            fin = inicio + len(bloque)
+            for jugador in range(self.num_jugadores):
+                territorio[inicio:fin, jugador] = np.count_nonzero(bloque == jugador + 1, axis=1)
+
+            # Conquistas: la celda tenía dueño y ahora tiene otro (los movimientos pasan por vacía)
+            if anterior is None:
+                previos, actuales = bloque[:-1], bloque[1:]
+            else:
+                previos, actuales = np.concatenate((anterior[None], bloque[:-1])), bloque
+            disputa += np.count_nonzero((previos != actuales) & (previos != 0) & (actuales != 0), axis=0)
+            anterior = bloque[-1]
+
+            celdas = bloque.reshape(len(bloque), self.filas, self.columnas)
+            for a, b in ((celdas[:, :, 1:], celdas[:, :, :-1]), (celdas[:, 1:], celdas[:, :-1])):
+                frente[inicio:fin] += np.count_nonzero((a != b) & (a != 0) & (b != 0), axis=(1, 2))
+
+        return {
+            'territorio': territorio,
+            'disputa': disputa.reshape(self.filas, self.columnas),
+            'frente': frente,
+        }
@@ -1,7 +1,41 @@
 import pygame
 import random
-from collections import deque
+import copy
+from collections import OrderedDict
+import heapq
 import time
+import sys
+import os
+import argparse
+import json
+import numpy as np
+
+from tablero import (
+    Tablero, VACIO, LIGERA, PESADA, PERFECTA, NOMBRES_TIPO, CODIGOS_TIPO,
+    DADOS_COMBATE, PUEDE_MOVER, TAMANO_TROZO
+)
+from camara import Camara
+from motor_lote import (
+    MotorLote, TIPOS_RAMA, GENERADAS_RAMA,
+    RAMA_LIGERA_X3, RAMA_LIGERA_X1, RAMA_HUMANA_X2, RAMA_HUMANA_X4, RAMA_HUMANA_X2_PERF,
+    RAMA_HUMANA_X4_PERF, RAMA_IA_MIXTA, RAMA_IA_X3, RAMA_PERFECTA
+)
+from eventos import (
+    RegistroEventos, texto_evento, EVENTO, NOMBRES_CODIGO,
+    SEPARADOR, INICIO_TURNO, PROPAGACION, COMBATE_EMPATE, COMBATE_VICTORIA, REEMPLAZO,
+    TOMA_POSICION, BRECHA_VICTORIA, BRECHA_EMPATE, MULTIPLICACION, ABRE_BRECHA,
+    AVANCE_PERFECTA, MOVIMIENTO, ASCENSO_FUERTE, ASCENSO_PERFECTA
+)
+from simulacion_paralela import SimulacionEnSegundoPlano, CLAVES_ESTADISTICAS
+from diario import DiarioPartida, ReproduccionPartida, NOMBRES_EVENTO
+from historial import HistorialPropietarios, AnalisisHistorial
+from influencia import MapaInfluencia
+from exportar import crear_escritor, escalar
+from resultados import RegistroResultados, VICTORIA, EMPATE, SIN_GANADOR
+from perfilador import (
+    PerfiladorTurnos, NOMBRES_FASE, NUM_FASES,
+    FASE_PROPAGACION, FASE_COMBATE, FASE_REEMPLAZO, FASE_ACCION, FASE_INACTIVIDAD
+)
 
 # --- 1. CONSTANTES DE JUEGO MEJORADAS ESTÉTICAMENTE ---
 
@@ -9,10 +43,17 @@ import time
 ANCHO_PANTALLA = 1500
 ALTO_PANTALLA = 700
 
-# Tamaño de celda: 20 de ancho
+# Tamaño de celda: 20 de ancho (con zoom 1:1)
 TAMANO_CELDA = 20
+
+# Tamaño del tablero por defecto; no depende de la ventana (la cámara recorre
+# tableros de hasta MAX_LADO_TABLERO x MAX_LADO_TABLERO celdas)
 FILAS = ALTO_PANTALLA // TAMANO_CELDA
 COLUMNAS = ANCHO_PANTALLA // TAMANO_CELDA
+MAX_LADO_TABLERO = 1000
+TAMANOS_TABLERO = ["75x35", "150x80", "300x200", "600x400", "1000x1000"]  # columnas x filas (menú)
+CELDAS_MOTOR_LOTE = 20000       # tableros mayores se juegan con el motor por lotes en la ventana
+PASO_CAMARA = 15                # píxeles por fotograma al mover la cámara con las flechas
 
 # --- PALETA DE COLORES MEJORADA ---
 NEGRO_FONDO = (20, 20, 30)          # Fondo del menú y del HUD
@@ -47,8 +88,35 @@ COLOR_PALETTE_BASE = [
 # Configuración de juego (Se mantiene la funcionalidad)
 BASE_TIEMPO_ENTRE_TURNOS = 1000  
 MAX_MENSAJES = 5
+
+# Velocidades especiales: turbo (turnos seguidos, sin esperas) y hasta el final
+# (se juega sin dibujar y solo se muestra el tablero final)
+VELOCIDAD_TURBO = "max"
+VELOCIDAD_HASTA_FIN = "fin"
+PAUSA_TABLERO_FINAL_MS = 1500   # tiempo que se muestra el tablero final antes del resumen
 LIMITE_TIEMPO_SEGUNDOS = 5 * 60 
 PROBABILIDAD_COMBATE_BASE = 0.5 
+ARCHIVO_PERFIL_CSV = "perfil_turnos_guerra_pixeles.csv" # Junto a resultados_guerra_pixeles.txt
+ARCHIVO_DIARIO = "partida_guerra_pixeles.gpxd"          # Diario binario de la última partida
+ARCHIVO_RESULTADOS = "resultados_guerra_pixeles.jsonl"  # Una fila por partida terminada (se acumulan)
+ARCHIVO_EVENTOS = "eventos_guerra_pixeles.gpxe"         # Todos los eventos de la partida (ver eventos.py)
+ARCHIVO_PARTIDA = "partida_guerra_pixeles.npz"          # Partida guardada para continuarla (tecla G)
+ARCHIVO_HISTORIAL = "historial_guerra_pixeles.gpxh"     # Propietario de cada celda en cada turno (ver historial.py)
+# Archivos de fuente ya encontrados (arranque rápido), en la caché del usuario y no donde se lanza el juego
+DIRECTORIO_CACHE = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "guerra_pixeles")
+ARCHIVO_FUENTES = os.path.join(DIRECTORIO_CACHE, "fuentes.json")
+ARCHIVO_ANIMACION = "partida_guerra_pixeles.gif"        # Time-lapse de un diario (--exportar; sin .gif, PNG en un directorio)
+ESCALA_ANIMACION = 4            # Píxeles por lado de cada celda en la animación
+RETARDO_ANIMACION_MS = 50       # Duración de cada fotograma del GIF
+VERSION_PARTIDA = 1
+
+# Motores de reglas disponibles: "secuencial" (ficha a ficha) o "lote" (vectorial)
+MOTORES = ("secuencial", "lote")
+# Destino de movimientos y fichas nuevas: "aleatoria" (celda libre al azar) o
+# "influencia" (la de mejor puntuación en los mapas de influencia.py)
+IAS = ("aleatoria", "influencia")
 
 # Ancho del Panel de la Interfaz
 ANCHO_PANEL_DERECHO = 300 
@@ -72,25 +140,117 @@ for i, base_color in enumerate(COLOR_PALETTE_BASE):
 
 # --- 2. INICIALIZACIÓN DE PYGAME Y FUENTES ---
 
-pygame.init()
-PANTALLA = pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA))
-pygame.display.set_caption("Guerra de Píxeles Táctico")
-RELOJ = pygame.time.Clock()
-
-# FUENTES MEJORADAS (mayor tamaño, más impacto)
-FUENTE_TITULO_GRANDE = pygame.font.SysFont('Consolas', 40, bold=True)
-FUENTE_TITULO = pygame.font.SysFont('Consolas', 24, bold=True)
-FUENTE_PRINCIPAL = pygame.font.SysFont('Consolas', 16)
-FUENTE_CRONOMETRO = pygame.font.SysFont('Consolas', 36, bold=True)
-FUENTE_GANADOR = pygame.font.SysFont('Consolas', 60, bold=True) 
-FUENTE_ESTADISTICAS = pygame.font.SysFont('Consolas', 20, bold=True)
-FUENTE_SMALL = pygame.font.SysFont('Consolas', 12)
-
-# Fuente especial para emojis más pequeños
-try:
-    FUENTE_EMOJI = pygame.font.SysFont('Segoe UI Symbol', 18) 
-except:
-    FUENTE_EMOJI = pygame.font.SysFont('Arial', 18) 
+# La ventana y las fuentes se crean en inicializar_pygame() y no al importar
+# el módulo, para que el motor de turnos pueda ejecutarse sin pantalla.
+PANTALLA = None
+RELOJ = None
+FUENTE_TITULO_GRANDE = None
+FUENTE_TITULO = None
+FUENTE_PRINCIPAL = None
+FUENTE_CRONOMETRO = None
+FUENTE_GANADOR = None
+FUENTE_ESTADISTICAS = None
+FUENTE_SMALL = None
+FUENTE_EMOJI = None
+ATLAS_FICHAS = None
+
+# FUENTES MEJORADAS (mayor tamaño, más impacto): global -> (nombre, tamaño, negrita)
+FUENTES = {
+    'FUENTE_TITULO_GRANDE': ('Consolas', 40, True),
+    'FUENTE_TITULO': ('Consolas', 24, True),
+    'FUENTE_PRINCIPAL': ('Consolas', 16, False),
+    'FUENTE_CRONOMETRO': ('Consolas', 36, True),
+    'FUENTE_GANADOR': ('Consolas', 60, True),
+    'FUENTE_ESTADISTICAS': ('Consolas', 20, True),
+    'FUENTE_SMALL': ('Consolas', 12, False),
+    'FUENTE_EMOJI': ('Segoe UI Symbol', 18, False),   # Fuente especial para emojis más pequeños
+}
+
+def _resolver_fuente(nombre, negrita):
+    """Archivo que elige SysFont (None = fuente por defecto de pygame) y si simula la negrita."""
+    return pygame.font.SysFont(nombre, 0, negrita, constructor=lambda ruta, tamano, simular_negrita, simular_cursiva: (ruta, simular_negrita))
+
+def cargar_fuentes(ruta_cache=ARCHIVO_FUENTES):
+    """
+    Crea las fuentes de FUENTES. La primera búsqueda de SysFont recorre todas las
+    fuentes del sistema (en Linux, fc-list), lo que puede costar cerca de un
+    segundo; por eso los archivos elegidos se guardan en `ruta_cache` y los
+    arranques siguientes los abren directamente. Si SysFont no encuentra la
+    fuente (usa la de pygame), no se guarda: se vuelve a buscar al arrancar.
+    """
+    try:
+        with open(ruta_cache, encoding="utf-8") as f:
+            resueltas = json.load(f)
+    except (OSError, ValueError):
+        resueltas = {}
+
+    cambios = False
+    fuentes = {}
+    for nombre_global, (nombre, tamano, negrita) in FUENTES.items():
+        clave = f"{nombre}|{'negrita' if negrita else 'normal'}"
+        ruta, simular_negrita = resueltas.get(clave, (None, None))
+        # Fuente sin resolver o cuyo archivo ya no existe: buscarla en el sistema
+        if ruta is None or not os.path.exists(ruta):
+            cambios |= resueltas.pop(clave, None) is not None
+            ruta, simular_negrita = _resolver_fuente(nombre, negrita)
+            if ruta is not None:
+                resueltas[clave] = [ruta, simular_negrita]
+                cambios = True
+        fuente = pygame.font.Font(ruta, tamano)
+        if simular_negrita:
+            fuente.set_bold(True)
+        fuentes[nombre_global] = fuente
+
+    if cambios:
+        try:
+            os.makedirs(os.path.dirname(ruta_cache) or ".", exist_ok=True)
+            with open(ruta_cache, "w", encoding="utf-8") as f:
+                json.dump(resueltas, f, indent=2, ensure_ascii=False)
+        except OSError:
+            pass # Sin caché: el próximo arranque vuelve a buscar
+    return fuentes
+
+def inicializar_pygame():
+    """Abre la ventana del juego y carga las fuentes (el atlas de fichas se crea al dibujar la primera)."""
+    global PANTALLA, RELOJ
+
+    # Solo vídeo y fuentes: el juego no tiene sonido y abrir el audio retrasa el arranque
+    pygame.display.init()
+    pygame.font.init()
+    PANTALLA = pygame.display.set_mode((ANCHO_PANTALLA, ALTO_PANTALLA))
+    pygame.display.set_caption("Guerra de Píxeles Táctico")
+    RELOJ = pygame.time.Clock()
+    globals().update(cargar_fuentes())
+
+def atlas_fichas():
+    """Sprites de todas las combinaciones de ficha, renderizados una sola vez (el menú no los necesita)."""
+    global ATLAS_FICHAS
+    if ATLAS_FICHAS is None:
+        ATLAS_FICHAS = AtlasFichas()
+    return ATLAS_FICHAS
+
+
+# Textos ya renderizados, del usado hace más tiempo al más reciente. Contadores,
+# cronómetro, mensajes y botones repiten casi siempre el mismo texto de un
+# fotograma a otro, así que el texto que no cambia solo cuesta un blit.
+MAX_TEXTOS_CACHE = 512
+_textos_renderizados = OrderedDict()
+
+def renderizar_texto(fuente, texto, color, fondo=None):
+    """
+    fuente.render(texto, True, color, fondo) a través de la caché LRU de textos.
+    La superficie devuelta es compartida: se puede dibujar, no modificar.
+    """
+    clave = (fuente, texto, color, fondo)
+    superficie = _textos_renderizados.get(clave)
+    if superficie is not None:
+        _textos_renderizados.move_to_end(clave)
+        return superficie
+    superficie = fuente.render(texto, True, color, fondo)
+    _textos_renderizados[clave] = superficie
+    if len(_textos_renderizados) > MAX_TEXTOS_CACHE:
+        _textos_renderizados.popitem(last=False)
+    return superficie
 
 
 # --- 3. CLASES FICHA, BUTTON Y DROPDOWN ---
@@ -124,7 +284,7 @@ class Button:
             
         # Color de texto (Contraste)
         text_color = NEGRO if sum(button_color) > 380 else BLANCO
-        text_surf = self.font.render(self.text, True, text_color)
+        text_surf = renderizar_texto(self.font, self.text, text_color)
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -154,11 +314,11 @@ class Dropdown:
         pygame.draw.rect(surface, AMARILLO_NEON, self.main_rect, 2, border_radius=5)
         
         # Texto de la etiqueta
-        label_surf = self.font_label.render(f"{self.main_text}:", True, BLANCO)
+        label_surf = renderizar_texto(self.font_label, f"{self.main_text}:", BLANCO)
         surface.blit(label_surf, (self.main_rect.x + 5, self.main_rect.y + 5))
         
         # Emoji seleccionado
-        emoji_surf = self.font_option.render(self.selected_option, True, COLOR_PERFECTA_INDICATOR)
+        emoji_surf = renderizar_texto(self.font_option, self.selected_option, COLOR_PERFECTA_INDICATOR)
         emoji_rect = emoji_surf.get_rect(midright=(self.main_rect.right - 10, self.main_rect.centery))
         surface.blit(emoji_surf, emoji_rect)
 
@@ -180,7 +340,7 @@ class Dropdown:
                 color = AMARILLO_NEON if option == self.selected_option else self.color_open
                 pygame.draw.rect(dropdown_surf, color, option_rect_local, 1)
                 
-                text_surf = self.font_option.render(option, True, BLANCO)
+                text_surf = renderizar_texto(self.font_option, option, BLANCO)
                 text_rect = text_surf.get_rect(center=option_rect_local.center)
                 dropdown_surf.blit(text_surf, text_rect)
                 
@@ -202,6 +362,9 @@ class Dropdown:
         return False
 
 class Ficha:
+    # Sin __dict__ por instancia: el estado real vive en las matrices del tablero
+    __slots__ = ("color_base", "fila", "columna", "ha_actuado", "realizo_accion", "tipo", "es_actuando", "turnos_inactivos")
+
     def __init__(self, color_base, fila, columna, tipo="ligera"):
         self.color_base = color_base 
         self.fila = fila
@@ -211,117 +374,45 @@ class Ficha:
         self.tipo = tipo 
         self.es_actuando = False
         self.turnos_inactivos = 0
-        
-        if self.tipo == "pesada": 
-            self.dados_combate = 5 
-            self.puede_mover = False 
-        elif self.tipo == "ligera": 
-            self.dados_combate = 3 
-            self.puede_mover = True
-        else: # PERFECTA
-            self.dados_combate = 5 
-            self.puede_mover = True 
+
+    # Dados y movilidad salen del tipo (tablas de tablero.py), no se guardan
+    @property
+    def dados_combate(self):
+        return DADOS_COMBATE[CODIGOS_TIPO[self.tipo]]
+
+    @property
+    def puede_mover(self):
+        return PUEDE_MOVER[CODIGOS_TIPO[self.tipo]]
             
     def dibujar(self, pantalla):
-        centro_x = self.columna * TAMANO_CELDA + TAMANO_CELDA // 2
-        centro_y = self.fila * TAMANO_CELDA + TAMANO_CELDA // 2
-        radio = TAMANO_CELDA // 2 - 2 
-        
-        if self.tipo in COLOR_TONOS[self.color_base]:
-            color_real = COLOR_TONOS[self.color_base][self.tipo]
+        """Dibuja la ficha copiando su sprite del atlas precalculado."""
+        if self.color_base == gestor.human_color_base:
+            emoji = gestor.perfecta_emoji
+            turnos_inactivos = self.turnos_inactivos
         else:
-            color_real = oscurecer_color(self.color_base, 0.5) 
-
-        # 1. Dibujar el círculo principal
-        pygame.draw.circle(pantalla, color_real, (centro_x, centro_y), radio)
-        
-        # 2. Indicador de Acción (Brillo alrededor)
-        if self.es_actuando:
-            pygame.draw.circle(pantalla, AMARILLO_NEON, (centro_x, centro_y), radio + 3, 2)
-            
-        # 3. Indicador de Tipo de Ficha (Forma/Borde)
-        if self.tipo == "pesada":
-            # Cuadrado alrededor para 'Fuerte/Pesada'
-            rect_pesada = pygame.Rect(centro_x - radio + 1, centro_y - radio + 1, (radio - 1) * 2, (radio - 1) * 2)
-            pygame.draw.rect(pantalla, oscurecer_color(color_real, 0.5), rect_pesada, 1)
-
-        elif self.tipo == "ligera":
-             # Círculo sencillo para 'Rápida/Ligera'
-             pygame.draw.circle(pantalla, NEGRO, (centro_x, centro_y), radio, 1)
-
-        # 4. Indicador para Ficha Perfecta (Emoji)
-        if self.tipo == "perfecta":
-            # Usar emoji personalizado para la ficha perfecta humana
-            if self.color_base == gestor.human_color_base:
-                text_surf = FUENTE_EMOJI.render(gestor.perfecta_emoji, True, COLOR_PERFECTA_INDICATOR)
-            else:
-                # Usar un emoji genérico para IA Perfecta
-                text_surf = FUENTE_EMOJI.render("👑", True, COLOR_PERFECTA_INDICATOR)
-                
-            text_rect = text_surf.get_rect(center=(centro_x, centro_y))
-            pantalla.blit(text_surf, text_rect)
-        
-        # 5. Indicador de inactividad (solo humano)
-        if self.color_base == gestor.human_color_base and self.turnos_inactivos > 0:
-            if self.tipo == "ligera" and self.turnos_inactivos < 3:
-                 text = FUENTE_SMALL.render(f"{self.turnos_inactivos}", True, BLANCO)
-                 PANTALLA.blit(text, (centro_x + radio, centro_y - radio))
-            elif self.tipo == "pesada" and self.turnos_inactivos < 5:
-                 text = FUENTE_SMALL.render(f"{self.turnos_inactivos}", True, BLANCO)
-                 PANTALLA.blit(text, (centro_x + radio, centro_y - radio))
-        
-        # Borde final
-        pygame.draw.circle(pantalla, NEGRO, (centro_x, centro_y), radio, 1)
-
+            emoji = "👑"
+            turnos_inactivos = 0
+        sprite, (dx, dy) = atlas_fichas().sprite(self.color_base, self.tipo, emoji, self.es_actuando, turnos_inactivos)
+        pantalla.blit(sprite, (self.columna * TAMANO_CELDA + dx, self.fila * TAMANO_CELDA + dy))
 
     def mover(self, nueva_fila, nueva_columna):
         self.fila = nueva_fila
         self.columna = nueva_columna
 
-    def obtener_vecinos_libres(self, posiciones_ocupadas):
-        vecinos = []
-        for r, c in self._obtener_vecinos_adyacentes():
-            if (r, c) not in posiciones_ocupadas:
-                vecinos.append((r, c))
-        return vecinos
-
-    def _obtener_vecinos_adyacentes(self):
-        vecinos = []
-        for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            r, c = self.fila + dr, self.columna + dc
-            if 0 <= r < FILAS and 0 <= c < COLUMNAS:
-                vecinos.append((r, c))
-        return vecinos
-
-    def obtener_oponentes_adyacentes(self, fichas_dict, color_oponente_base):
-        oponentes = []
-        for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            pos = (self.fila + dr, self.columna + dc)
-            if pos in fichas_dict and fichas_dict[pos].color_base != self.color_base:
-                oponentes.append(fichas_dict[pos])
-        return oponentes
-    
-    # **********************************************
-    # LÓGICA DE DETECCIÓN DE ENEMIGOS ADYACENTES (BRECHA)
-    # **********************************************
-    def es_posicion_brecha(self, r, c, fichas_dict):
-        """Comprueba si la posición (r, c) es adyacente a un enemigo."""
-        for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            pos = (r + dr, c + dc)
-            if pos in fichas_dict and fichas_dict[pos].color_base != self.color_base:
-                return True
-        return False
-
 
 # --- 4. GESTOR DE JUEGO (Mantiene la lógica) ---
 
 class GestorJuego:
-    def __init__(self, player_colors_base, probabilidad_combate, human_color_base=None, human_name="Comandante", perfecta_emoji="⭐"):
-        self.fichas = []
-        self.mensajes = deque(maxlen=MAX_MENSAJES)
+    def __init__(self, player_colors_base, probabilidad_combate, human_color_base=None, human_name="Comandante", perfecta_emoji="⭐", tiempo_limite=LIMITE_TIEMPO_SEGUNDOS, motor="secuencial", semilla=None, max_perfectas=MAX_FICHAS_PERFECTAS, filas=FILAS, columnas=COLUMNAS, ia="aleatoria"):
+        if not (2 <= filas <= MAX_LADO_TABLERO and 2 <= columnas <= MAX_LADO_TABLERO):
+            raise ValueError(f"Tablero de {columnas}x{filas} fuera de los límites (2 a {MAX_LADO_TABLERO} por lado)")
+        self.tablero = Tablero(filas, columnas, len(player_colors_base))
+        # Eventos del turno: se anotan como tuplas y solo se formatean al dibujarlos
+        self.eventos = RegistroEventos(MAX_MENSAJES)
+        self.mensajes = self.eventos.recientes
         self.turno_actual = 0
         self.tiempo_inicio = time.time()
-        self.tiempo_limite = LIMITE_TIEMPO_SEGUNDOS
+        self.tiempo_limite = tiempo_limite # None = sin límite de tiempo real
         self.player_colors_base = player_colors_base 
         self.probabilidad_combate = probabilidad_combate 
         
@@ -330,7 +421,67 @@ class GestorJuego:
         self.human_color_base = human_color_base
         self.human_name = human_name
         self.perfecta_emoji = perfecta_emoji
-        self.fichas_perfectas_count = 0
+        self.max_perfectas = max_perfectas # Límite de fichas perfectas humanas
+
+        # Índice del jugador humano dentro de player_colors_base (None si no juega)
+        self.jugador_humano = player_colors_base.index(human_color_base) if human_color_base in player_colors_base else None
+
+        # Generador propio: con la misma semilla la partida es reproducible
+        self.semilla = semilla
+        self.aleatorio = random.Random(semilla)
+
+        # Motor por lotes opcional (None = motor secuencial de procesar_turno)
+        self.motor = motor
+        self.motor_lote = MotorLote(self, max_perfectas, semilla) if motor == "lote" else None
+
+        # Mapas de influencia (None = destinos al azar); ambos motores los recalculan en cada turno
+        self.ia = ia
+        self.influencia = MapaInfluencia(self.tablero) if ia == "influencia" else None
+
+        # Objetos Ficha reutilizables de la vista self.fichas
+        self._reserva_fichas = []
+
+        # Perfilador de fases, diario e historial de propietarios opcionales (None = desactivados)
+        self.perfilador = None
+        self.diario = None
+        self.historial = None
+
+    @property
+    def fichas_perfectas_count(self):
+        """Fichas perfectas humanas en el tablero (leído del contador incremental)."""
+        if self.jugador_humano is None:
+            return 0
+        return self.tablero.conteos[self.jugador_humano][PERFECTA]
+
+    @property
+    def fichas(self):
+        """
+        Fichas del tablero como objetos Ficha (copias de solo lectura para dibujar).
+        Los objetos salen de una reserva que se reutiliza en cada llamada, así que
+        la lista solo vale hasta la siguiente.
+        """
+        t = self.tablero
+        celdas = np.flatnonzero(t._prop != VACIO)
+        reserva = self._reserva_fichas
+        while len(reserva) < celdas.size:
+            reserva.append(Ficha(None, 0, 0))
+        fichas = reserva[:celdas.size]
+
+        filas, columnas = np.divmod(celdas, t.columnas)
+        datos = zip(
+            fichas, t._prop[celdas].tolist(), t._tipo[celdas].tolist(), filas.tolist(), columnas.tolist(),
+            t._inact[celdas].tolist(), t._actuado[celdas].tolist(), t._accion[celdas].tolist(),
+        )
+        colores = self.player_colors_base
+        for ficha, jugador, tipo, fila, columna, inactividad, actuado, accion in datos:
+            ficha.color_base = colores[jugador]
+            ficha.tipo = NOMBRES_TIPO[tipo]
+            ficha.fila = fila
+            ficha.columna = columna
+            ficha.turnos_inactivos = inactividad
+            ficha.ha_actuado = actuado
+            ficha.realizo_accion = accion
+        return fichas
     
     def obtener_nombre_jugador(self, color_base, use_emoji=False):
         """Devuelve el nombre del jugador (nombre_humano o P[N] para IA)."""
@@ -343,29 +494,184 @@ class GestorJuego:
             return "???"
             
     def agregar_ficha(self, ficha):
-        self.fichas.append(ficha)
+        i = self.tablero.indice(ficha.fila, ficha.columna)
+        jugador = self.player_colors_base.index(ficha.color_base)
+        self.tablero.colocar(i, jugador, CODIGOS_TIPO[ficha.tipo], ficha.turnos_inactivos)
+
+    def colocar_fichas_iniciales(self):
+        """Coloca una ficha Fuerte y una Rápida por jugador en posiciones dispersas."""
+        filas, columnas = self.tablero.filas, self.tablero.columnas
+        initial_positions = [
+            (0, 0), (filas - 1, columnas - 1), (filas - 1, 0), (0, columnas - 1),                          
+            (filas // 2, 0), (filas // 2, columnas - 1), (0, columnas // 2), (filas - 1, columnas // 2)                  
+        ]
+        
+        for i, color_base in enumerate(self.player_colors_base):
+            r, c = initial_positions[i]
+            ficha_tipo_1 = "pesada" 
+            ficha_tipo_2 = "ligera" 
+            
+            self.agregar_ficha(Ficha(color_base, r, c, tipo=ficha_tipo_1))
+            
+            r2, c2 = r + 1, c
+            if 0 <= r2 < filas and 0 <= c2 < columnas and (r2, c2) != (r, c):
+                 self.agregar_ficha(Ficha(color_base, r2, c2, tipo=ficha_tipo_2))
     
+    def configuracion(self):
+        """Parámetros de la partida, para el diario y para reconstruir el gestor."""
+        return {
+            'player_colors_base': [list(color) for color in self.player_colors_base],
+            'probabilidad_combate': self.probabilidad_combate,
+            'human_color_base': list(self.human_color_base) if self.human_color_base else None,
+            'human_name': self.human_name,
+            'perfecta_emoji': self.perfecta_emoji,
+            'tiempo_limite': self.tiempo_limite,
+            'motor': self.motor,
+            'semilla': self.semilla,
+            'max_perfectas': self.max_perfectas,
+            'filas': self.tablero.filas,
+            'columnas': self.tablero.columnas,
+            'ia': self.ia,
+        }
+
+    @classmethod
+    def desde_configuracion(cls, configuracion, **cambios):
+        """Crea un gestor (sin fichas) con los parámetros guardados por configuracion()."""
+        parametros = {
+            'player_colors_base': [tuple(color) for color in configuracion['player_colors_base']],
+            'probabilidad_combate': configuracion['probabilidad_combate'],
+            'human_color_base': tuple(configuracion['human_color_base']) if configuracion['human_color_base'] else None,
+            'human_name': configuracion['human_name'],
+            'perfecta_emoji': configuracion['perfecta_emoji'],
+            'tiempo_limite': configuracion['tiempo_limite'],
+            'motor': configuracion['motor'],
+            'semilla': configuracion['semilla'],
+            'max_perfectas': configuracion['max_perfectas'],
+            'filas': configuracion.get('filas', FILAS),
+            'columnas': configuracion.get('columnas', COLUMNAS),
+            'ia': configuracion.get('ia', "aleatoria"),
+        }
+        parametros.update(cambios)
+        return cls(**parametros)
+
+    def iniciar_diario(self, ruta):
+        """Empieza a registrar la partida en un diario binario (con el tablero actual como turno 0)."""
+        self.diario = DiarioPartida(ruta, self.configuracion())
+        self.diario.registrar_turno(self.turno_actual, self.tablero)
+
+    def cerrar_diario(self):
+        if self.diario is not None:
+            self.diario.cerrar()
+            self.diario = None
+
+    def iniciar_historial(self, ruta):
+        """Empieza a registrar el propietario de cada celda en cada turno (ver historial.py)."""
+        self.historial = HistorialPropietarios(ruta, self.configuracion())
+        self.historial.registrar_turno(self.turno_actual, self.tablero)
+
+    def cerrar_historial(self):
+        if self.historial is not None:
+            self.historial.cerrar()
+            self.historial = None
+
+    def iniciar_eventos(self, ruta):
+        """Guarda todos los eventos de la partida en un archivo binario (ver eventos.py)."""
+        self.eventos.abrir(ruta)
+
+    def cerrar_eventos(self):
+        self.eventos.cerrar()
+
+    def guardar_partida(self, ruta=ARCHIVO_PARTIDA):
+        """
+        Guarda el estado completo de la partida en un .npz comprimido: matrices del
+        tablero, estadísticas, turno, tiempo transcurrido, estado de los generadores
+        aleatorios y eventos recientes. Los contadores e índices del tablero no se
+        guardan: se recalculan al cargar.
+        """
+        t = self.tablero
+        version_aleatorio, estado_aleatorio, gauss = self.aleatorio.getstate()
+        recientes = [evento for evento in self.mensajes if not isinstance(evento, str)]
+        with open(ruta, "wb") as archivo:
+            np.savez_compressed(
+                archivo,
+                version=VERSION_PARTIDA,
+                configuracion=json.dumps(self.configuracion(), ensure_ascii=False),
+                turno=self.turno_actual,
+                segundos=time.time() - self.tiempo_inicio,
+                propietario=t.propietario, tipo=t.tipo, inactividad=t.inactividad,
+                ha_actuado=t.ha_actuado, realizo_accion=t.realizo_accion, nueva=t.nueva,
+                estadisticas=np.array([[self.estadisticas[color][clave] for clave in CLAVES_ESTADISTICAS] for color in self.player_colors_base], dtype=np.int64),
+                aleatorio=np.array(estado_aleatorio, dtype=np.uint32),
+                aleatorio_version=version_aleatorio,
+                aleatorio_gauss=np.nan if gauss is None else gauss,
+                rng_lote=json.dumps(self.motor_lote.rng.bit_generator.state) if self.motor_lote is not None else "",
+                eventos=np.array(recientes, dtype=EVENTO),
+            )
+
+    @classmethod
+    def cargar_partida(cls, ruta=ARCHIVO_PARTIDA, **cambios):
+        """Crea un gestor con la partida guardada por guardar_partida, lista para seguir jugando."""
+        with np.load(ruta) as datos:
+            if int(datos['version']) != VERSION_PARTIDA:
+                raise ValueError(f"{ruta}: versión de partida guardada {int(datos['version'])} no soportada")
+            gestor = cls.desde_configuracion(json.loads(str(datos['configuracion'])), **cambios)
+            t = gestor.tablero
+            for nombre in ('propietario', 'tipo', 'inactividad', 'ha_actuado', 'realizo_accion', 'nueva'):
+                getattr(t, nombre)[:] = datos[nombre]
+            t.reconstruir_indices()
+            t.territorios.reconstruir()
+
+            gestor.turno_actual = int(datos['turno'])
+            gestor.tiempo_inicio = time.time() - float(datos['segundos'])
+            for color, valores in zip(gestor.player_colors_base, datos['estadisticas'].tolist()):
+                gestor.estadisticas[color].update(zip(CLAVES_ESTADISTICAS, valores))
+
+            gauss = float(datos['aleatorio_gauss'])
+            gestor.aleatorio.setstate((int(datos['aleatorio_version']), tuple(datos['aleatorio'].tolist()), None if np.isnan(gauss) else gauss))
+            if gestor.motor_lote is not None and str(datos['rng_lote']):
+                gestor.motor_lote.rng.bit_generator.state = json.loads(str(datos['rng_lote']))
+            gestor.mensajes.extend(tuple(evento) for evento in datos['eventos'].tolist())
+        return gestor
+
     def agregar_mensaje(self, mensaje):
+        """Añade un texto libre a los mensajes (las reglas anotan eventos con self.eventos.anotar)."""
         if isinstance(mensaje, tuple): 
             nombre_color = self.obtener_nombre_jugador(mensaje)
             self.mensajes.append(f"[{self.turno_actual:03d}] {nombre_color}")
         else:
             self.mensajes.append(f"[{self.turno_actual:03d}] {mensaje}")
 
-    def obtener_posiciones_ocupadas(self):
-        return {(f.fila, f.columna): f for f in self.fichas}
-    
+    def nombre_jugador(self, jugador, use_emoji=False):
+        return self.obtener_nombre_jugador(self.player_colors_base[jugador], use_emoji)
+
+    def textos_mensajes(self):
+        """Texto de los mensajes recientes: solo aquí se formatean los eventos."""
+        return [texto_evento(evento, self.nombre_jugador, self.perfecta_emoji) for evento in self.mensajes]
+
     def contar_fichas(self):
-        contadores = {color: {'total': 0, 'perfectas': 0} for color in self.player_colors_base}
-        for ficha in self.fichas:
-            if ficha.color_base in contadores:
-                contadores[ficha.color_base]['total'] += 1
-                if ficha.tipo == "perfecta":
-                    contadores[ficha.color_base]['perfectas'] += 1
+        """Contadores por jugador leídos de los contadores incrementales del tablero (O(jugadores))."""
+        contadores = {}
+        for color, conteo in zip(self.player_colors_base, self.tablero.conteos):
+            contadores[color] = {
+                'total': conteo[0],
+                'ligeras': conteo[LIGERA],
+                'pesadas': conteo[PESADA],
+                'perfectas': conteo[PERFECTA]
+            }
         return contadores
     
+    def tiempo_agotado(self):
+        if self.tiempo_limite is None:
+            return False
+        return time.time() - self.tiempo_inicio >= self.tiempo_limite
+
+    def tiempo_restante(self):
+        """Segundos de partida que quedan (None = sin límite de tiempo real)."""
+        if self.tiempo_limite is None:
+            return None
+        return max(0, self.tiempo_limite - (time.time() - self.tiempo_inicio))
+
     def verificar_victoria(self):
-        tiempo_transcurrido = time.time() - self.tiempo_inicio
         contadores = self.contar_fichas()
         
         bandos_activos = [color for color, data in contadores.items() if data['total'] > 0]
@@ -375,7 +681,7 @@ class GestorJuego:
         elif len(bandos_activos) == 0:
             return AMARILLO_NEON
             
-        if tiempo_transcurrido >= self.tiempo_limite:
+        if self.tiempo_agotado():
             if not bandos_activos: return AMARILLO_NEON
             
             max_fichas = max(data['total'] for data in contadores.values())
@@ -390,6 +696,10 @@ class GestorJuego:
 
     def obtener_estadisticas_finales(self, ganador_color_base):
         contadores = self.contar_fichas()
+
+        # Islas exactas (sin esperar a la reconstrucción periódica)
+        territorios = self.tablero.territorios
+        territorios.reconstruir()
         
         nombre_ganador = "JUEGO EN CURSO"
         if ganador_color_base:
@@ -404,10 +714,52 @@ class GestorJuego:
             'ganador_nombre': nombre_ganador,
             'contadores': contadores,
             'estadisticas': self.estadisticas,
-            'fichas_perfectas_count': self.fichas_perfectas_count
+            'fichas_perfectas_count': self.fichas_perfectas_count,
+            'territorios': {
+                color: {'islas': islas, 'mayor': mayor}
+                for color, islas, mayor in zip(self.player_colors_base, territorios.islas, territorios.mayor)
+            }
         }
         return resumen
 
+    def resultado_partida(self, ganador_color_base, segundos=None):
+        """Resultado de la partida como fila plana para resultados.RegistroResultados."""
+        if ganador_color_base is None:
+            resultado, ganador_jugador, ganador_nombre = SIN_GANADOR, None, None
+        elif ganador_color_base == AMARILLO_NEON:
+            resultado, ganador_jugador, ganador_nombre = EMPATE, None, None
+        else:
+            resultado = VICTORIA
+            ganador_jugador = self.player_colors_base.index(ganador_color_base) + 1
+            ganador_nombre = self.obtener_nombre_jugador(ganador_color_base)
+
+        fila = {
+            'semilla': self.semilla,
+            'motor': self.motor,
+            'oponentes': len(self.player_colors_base) - 1,
+            'probabilidad_combate': self.probabilidad_combate,
+            'max_perfectas': self.max_perfectas,
+            'turnos': self.turno_actual,
+            'segundos': None if segundos is None else round(segundos, 3),
+            'resultado': resultado,
+            'ganador_jugador': ganador_jugador,
+            'ganador_nombre': ganador_nombre,
+        }
+        contadores = self.contar_fichas()
+        for k, color_base in enumerate(self.player_colors_base, 1):
+            fila[f"j{k}_nombre"] = self.obtener_nombre_jugador(color_base)
+            fila.update({f"j{k}_{clave}": valor for clave, valor in contadores[color_base].items()})
+            fila.update({f"j{k}_{clave}": valor for clave, valor in self.estadisticas[color_base].items()})
+        return fila
+
+    def registrar_resultado(self, ganador_color_base, ruta=ARCHIVO_RESULTADOS):
+        """Añade el resultado de la partida al registro acumulado de partidas."""
+        try:
+            with RegistroResultados(ruta) as registro:
+                registro.escribir(self.resultado_partida(ganador_color_base, time.time() - self.tiempo_inicio))
+        except IOError:
+            print(f"ERROR: No se pudo escribir en {ruta}.")
+
     # (La función de guardar TXT se deja intacta por ser lógica de salida de datos)
     def guardar_resultados_txt(self, resumen):
         output = []
@@ -416,6 +768,7 @@ class GestorJuego:
         output.append("=" * 60)
         output.append(f"RESULTADO FINAL: {resumen['ganador_nombre']}")
         output.append(f"PROBABILIDAD COMBATE BASE: {self.probabilidad_combate}") 
+        output.append(f"SEMILLA: {self.semilla}")
         output.append("-" * 60)
         
         for i, color_base in enumerate(self.player_colors_base):
@@ -431,6 +784,9 @@ class GestorJuego:
             output.append(f"    - Multiplicaciones: {stats.get('multiplicaciones', 0)}")
             output.append(f"    - Movimientos: {stats.get('movimientos', 0)}")
             output.append(f"    - Victorias en Combate: {stats.get('victorias_combate', 0)}")
+            if 'territorios' in resumen:
+                territorio = resumen['territorios'][color_base]
+                output.append(f"  > Territorios: {territorio['islas']} islas (la mayor, {territorio['mayor']} fichas)")
             output.append("-" * 20)
 
         try:
@@ -442,378 +798,608 @@ class GestorJuego:
             print("ERROR: No se pudo escribir el archivo TXT.")
             
     def tirar_dados(self, num_dados=3):
-        return sum(random.randint(1, 6) for _ in range(num_dados))
+        return sum(self.aleatorio.randint(1, 6) for _ in range(num_dados))
     
-    # (El procesar_turno se deja intacto ya que es la lógica del juego)
+    # El procesar_turno mantiene las reglas del juego; solo cambia el soporte
+    # (índices del tablero en lugar de objetos Ficha y diccionarios de posiciones)
     def procesar_turno(self):
+        if self.motor_lote is not None:
+            return self._registrar_turno(self.motor_lote.procesar_turno())
+
         self.turno_actual += 1
-        self.agregar_mensaje("=" * 40)
-        self.agregar_mensaje(f"TURNO {self.turno_actual} - Total fichas: {len(self.fichas)}")
-        
-        for ficha in self.fichas:
-            ficha.ha_actuado = False
-            ficha.es_actuando = False 
-            ficha.realizo_accion = False 
-        
-        fichas_dict = self.obtener_posiciones_ocupadas()
-        nuevas_fichas = []
-        
-        random.shuffle(self.fichas) 
-        
-        # 2. PROPAGACIÓN DE PERFECCIÓN 
-        fichas_dict = self.obtener_posiciones_ocupadas() 
-        fichas_propagadas = set() 
-        
-        for ficha in list(self.fichas):
-            if ficha.color_base != self.human_color_base or ficha.tipo != "perfecta" or ficha in fichas_propagadas:
+        t = self.tablero
+        turno = self.turno_actual
+        anotar = self.eventos.anotar
+        anotar(turno, SEPARADOR)
+        anotar(turno, INICIO_TURNO, a=t.total_fichas())
+
+        t.iniciar_turno()
+        prop, tipo, actuado, accion = t._prop, t._tipo, t._actuado, t._accion
+        humano = self.jugador_humano
+        aleatorio = self.aleatorio
+        perf = self.perfilador
+        if perf is not None:
+            perf.iniciar_turno(self.turno_actual)
+
+        if humano is not None:
+            perfectas_humanas = sorted(t.perfectas[humano])
+        else:
+            perfectas_humanas = []
+        aleatorio.shuffle(perfectas_humanas)
+
+        # 2. PROPAGACIÓN DE PERFECCIÓN
+        celdas_propagadas = set()
+
+        for i in perfectas_humanas:
+            if i in celdas_propagadas:
                 continue
 
-            if self.fichas_perfectas_count >= MAX_FICHAS_PERFECTAS:
-                 break 
+            if self.fichas_perfectas_count >= self.max_perfectas:
+                 break
+
+            vecinos_adyacentes = list(t.vecinos[i])
+            aleatorio.shuffle(vecinos_adyacentes)
+
+            for v in vecinos_adyacentes:
+                if prop[v] == humano and (tipo[v] == LIGERA or tipo[v] == PESADA):
+
+                    anotar(turno, PROPAGACION, humano, a=tipo[v])
+                    t.cambiar_tipo(v, PERFECTA)
+                    t._inact[v] = 0
+                    celdas_propagadas.add(v)
+                    break
+
+        if perf is not None:
+            perf.marcar(FASE_PROPAGACION, len(celdas_propagadas))
+
+        # Mapas de influencia con el tablero al empezar las acciones
+        influencia = self.influencia
+        if influencia is not None:
+            influencia.actualizar()
+            if perf is not None:
+                perf.marcar(FASE_ACCION, 0)
 
-            vecinos_adyacentes_pos = ficha._obtener_vecinos_adyacentes()
-            random.shuffle(vecinos_adyacentes_pos) 
-            
-            for r, c in vecinos_adyacentes_pos:
-                pos = (r, c)
-                if pos in fichas_dict:
-                    vecina = fichas_dict[pos]
-                    
-                    if vecina.color_base == self.human_color_base and vecina.tipo in ["ligera", "pesada"]:
-                        
-                        tipo_anterior = vecina.tipo
-                        vecina.tipo = "perfecta"
-                        vecina.dados_combate = 5
-                        vecina.puede_mover = True 
-                        vecina.turnos_inactivos = 0 
-                        self.fichas_perfectas_count += 1
-                        fichas_propagadas.add(vecina)
-                        
-                        nombre_humano = self.obtener_nombre_jugador(self.human_color_base, use_emoji=True)
-                        self.agregar_mensaje(f"👑 {nombre_humano} propaga a {tipo_anterior.upper()}!")
-                        break 
-        
         # 3. Bucle principal de acción de fichas
-        for ficha in list(self.fichas):
-            if ficha.ha_actuado or ficha.color_base not in self.player_colors_base: 
+        # Solo pueden actuar las fichas de la frontera activa (vecino vacío o
+        # enemigo) y las perfectas humanas (reemplazo táctico). El orden aleatorio
+        # se obtiene dando a cada ficha una clave uniforme y procesándolas de menor
+        # a mayor, lo que equivale a barajar todas las fichas. Las fichas interiores
+        # reciben su clave de forma perezosa: si entran en la frontera con una clave
+        # ya superada, su turno "pasó" cuando no podían hacer nada.
+        # Una ficha que aún no ha actuado sigue en su celda inicial, así que las
+        # claves se asignan por celda.
+        claves = {}
+        def clave(c):
+            k = claves.get(c)
+            if k is None:
+                k = claves[c] = aleatorio.random()
+            return k
+
+        def elegir_destino(jugador, candidatas):
+            if influencia is None:
+                return aleatorio.choice(candidatas)
+            return influencia.mejores(jugador, candidatas, 1, aleatorio)[0]
+
+        # Claves en orden de celda: el orden de un set depende de su historia y
+        # una partida cargada (ver cargar_partida) debe seguir igual que la original.
+        # Las perfectas humanas se toman tras la propagación: las que acaban de
+        # ascender también pueden hacer el reemplazo táctico en este turno.
+        programadas = t.frontera.union(t.perfectas[humano]) if humano is not None else set(t.frontera)
+        cola = [(clave(c), c) for c in sorted(programadas)]
+        heapq.heapify(cola)
+        t.entradas_frontera.clear()
+        tau = 0.0
+
+        while True:
+            if t.entradas_frontera:
+                for c in t.entradas_frontera:
+                    if c in programadas or prop[c] == VACIO or actuado[c]:
+                        continue
+                    k = clave(c)
+                    if k > tau:
+                        heapq.heappush(cola, (k, c))
+                        programadas.add(c)
+                t.entradas_frontera.clear()
+
+            if not cola:
+                break
+            tau, i = heapq.heappop(cola)
+
+            if prop[i] == VACIO or actuado[i]:
                 continue
-            
-            ficha.es_actuando = True 
-            nombre_propio = self.obtener_nombre_jugador(ficha.color_base)
-            
+            if perf is not None:
+                perf.reanudar()
+
+            jugador = prop[i]
+            color_propio = self.player_colors_base[jugador]
+
             # 3.1. COMBATE (prioridad máxima)
-            oponentes = ficha.obtener_oponentes_adyacentes(fichas_dict, None) 
-            
+            oponentes = t.oponentes_adyacentes(i)
+
             if oponentes:
-                oponente = random.choice(oponentes)
+                o = aleatorio.choice(oponentes)
 
-                is_ficha_perfecta = (ficha.tipo == "perfecta")
-                is_oponente_perfecta = (oponente.tipo == "perfecta")
+                is_ficha_perfecta = (tipo[i] == PERFECTA)
+                is_oponente_perfecta = (tipo[o] == PERFECTA)
 
                 if is_ficha_perfecta and not is_oponente_perfecta:
-                    puntuacion_propia = 9999 
+                    puntuacion_propia = 9999
                     puntuacion_oponente = 0
                 elif is_oponente_perfecta and not is_ficha_perfecta:
                     puntuacion_propia = 0
-                    puntuacion_oponente = 9999 
+                    puntuacion_oponente = 9999
                 else:
-                    puntuacion_propia = self.tirar_dados(ficha.dados_combate)
-                    puntuacion_oponente = self.tirar_dados(oponente.dados_combate)
-                
-                nombre_oponente = self.obtener_nombre_jugador(oponente.color_base)
-                
+                    puntuacion_propia = self.tirar_dados(DADOS_COMBATE[tipo[i]])
+                    puntuacion_oponente = self.tirar_dados(DADOS_COMBATE[tipo[o]])
+
                 if puntuacion_propia > puntuacion_oponente:
-                    color_ganador_base = ficha.color_base
-                    tipo_ganador = "pesada" if ficha.tipo == "perfecta" else ficha.tipo 
-                    ficha_perdedora = oponente
-                    
-                    ficha.realizo_accion = True 
-                    ficha_perdedora.realizo_accion = True 
-                
+                    jugador_ganador = jugador
+                    tipo_ganador = PESADA if tipo[i] == PERFECTA else tipo[i]
+                    perdedora = o
+
                 elif puntuacion_oponente > puntuacion_propia:
-                    color_ganador_base = oponente.color_base
-                    tipo_ganador = "pesada" if oponente.tipo == "perfecta" else oponente.tipo
-                    ficha_perdedora = ficha
-                    
-                    oponente.realizo_accion = True 
-                    ficha_perdedora.realizo_accion = True 
-                
+                    jugador_ganador = prop[o]
+                    tipo_ganador = PESADA if tipo[o] == PERFECTA else tipo[o]
+                    perdedora = i
+
                 else: # Empate
-                    self.agregar_mensaje(f"⚔️ {nombre_propio} vs {nombre_oponente} -> EMPATE ({puntuacion_propia}/{puntuacion_oponente})")
-                    ficha.ha_actuado = True
-                    oponente.ha_actuado = True
-                    ficha.es_actuando = False 
-                    oponente.es_actuando = False 
+                    anotar(turno, COMBATE_EMPATE, jugador, prop[o], puntuacion_propia, puntuacion_oponente)
+                    actuado[i] = True
+                    actuado[o] = True
+                    if perf is not None:
+                        perf.marcar(FASE_COMBATE)
                     continue
-                
-                if ficha_perdedora.tipo == "perfecta" and ficha_perdedora.color_base == self.human_color_base:
-                     self.fichas_perfectas_count -= 1 
 
-                ficha_perdedora.color_base = color_ganador_base
-                ficha_perdedora.tipo = tipo_ganador
-                self.estadisticas[color_ganador_base]['victorias_combate'] += 1 
-                
-                nombre_ganador = self.obtener_nombre_jugador(color_ganador_base)
-                nombre_perdedor = self.obtener_nombre_jugador(ficha_perdedora.color_base)
-                self.agregar_mensaje(f"⚔️ {nombre_ganador} GANA y tiñe a {nombre_perdedor} en {tipo_ganador[0].upper()}")
-
-                ficha.ha_actuado = True
-                oponente.ha_actuado = True
-                ficha.es_actuando = False
-                oponente.es_actuando = False
+                accion[i] = True
+                accion[o] = True
+
+                anotar(turno, COMBATE_VICTORIA, jugador_ganador, prop[perdedora], tipo_ganador)
+                t.convertir(perdedora, jugador_ganador, tipo_ganador)
+                self.estadisticas[self.player_colors_base[jugador_ganador]]['victorias_combate'] += 1
+
+                actuado[i] = True
+                actuado[o] = True
+                if perf is not None:
+                    perf.marcar(FASE_COMBATE)
                 continue
-            
+
             # 3.2. REEMPLAZO TÁCTICO Y ASALTO INMEDIATO (SOLO Ficha Perfecta Humana)
-            if ficha.tipo == "perfecta" and ficha.color_base == self.human_color_base:
-                vecinos_adyacentes_pos = ficha._obtener_vecinos_adyacentes()
-                aliados_adyacentes = []
-                
-                for r, c in vecinos_adyacentes_pos:
-                    pos = (r, c)
-                    if pos in fichas_dict:
-                        aliada = fichas_dict[pos]
-                        if aliada.color_base == ficha.color_base and aliada.tipo in ["ligera", "pesada"] and not aliada.ha_actuado:
-                            aliados_adyacentes.append(aliada)
-                
+            if tipo[i] == PERFECTA and jugador == humano:
+                aliados_adyacentes = [
+                    v for v in t.vecinos[i]
+                    if prop[v] == jugador and (tipo[v] == LIGERA or tipo[v] == PESADA)
+                    and not actuado[v] and clave(v) > tau
+                ]
+
                 if aliados_adyacentes:
-                    aliada_a_reemplazar = random.choice(aliados_adyacentes)
-                    
-                    pos_perfecta_vieja = (ficha.fila, ficha.columna)
-                    pos_perfecta_nueva = (aliada_a_reemplazar.fila, aliada_a_reemplazar.columna)
-                    
-                    ficha.mover(pos_perfecta_nueva[0], pos_perfecta_nueva[1])
-                    aliada_a_reemplazar.mover(pos_perfecta_vieja[0], pos_perfecta_vieja[1])
-                    
-                    fichas_dict[pos_perfecta_nueva] = ficha
-                    fichas_dict[pos_perfecta_vieja] = aliada_a_reemplazar
-                    
-                    ficha.realizo_accion = True
-                    ficha.ha_actuado = True
-                    aliada_a_reemplazar.ha_actuado = True 
-                    
-                    self.estadisticas[ficha.color_base]['movimientos'] += 1 
-                    self.agregar_mensaje(f"🔄 {nombre_propio} PERFECTA hace Reemplazo Táctico con aliada {aliada_a_reemplazar.tipo[0].upper()}!")
+                    pos_nueva = aleatorio.choice(aliados_adyacentes)
+
+                    # La perfecta pasa a pos_nueva y la aliada a la celda i
+                    t.intercambiar(i, pos_nueva)
+
+                    accion[pos_nueva] = True
+                    actuado[pos_nueva] = True
+                    actuado[i] = True
+
+                    self.estadisticas[color_propio]['movimientos'] += 1
+                    anotar(turno, REEMPLAZO, jugador, a=tipo[i])
+
+                    oponentes_nuevos = t.oponentes_adyacentes(pos_nueva)
 
-                    oponentes_nuevos = ficha.obtener_oponentes_adyacentes(fichas_dict, None) 
-                    
                     if oponentes_nuevos:
-                        oponente_atacado = random.choice(oponentes_nuevos)
-                        nombre_oponente_atacado = self.obtener_nombre_jugador(oponente_atacado.color_base)
-                        
-                        if oponente_atacado.tipo != "perfecta":
-                            ficha_perdedora = oponente_atacado
-                            color_ganador_base = ficha.color_base
-                            tipo_ganador = "pesada" 
-
-                            ficha_perdedora.color_base = color_ganador_base
-                            ficha_perdedora.tipo = tipo_ganador
-                            self.estadisticas[color_ganador_base]['victorias_combate'] += 1 
-                            
-                            nombre_ganador = self.obtener_nombre_jugador(color_ganador_base)
-                            self.agregar_mensaje(f"💥 {nombre_ganador} PERFECTA TOMA POSICIÓN y tiñe a {nombre_oponente_atacado}!")
-
-                            oponente_atacado.ha_actuado = True 
-                        
+                        oa = aleatorio.choice(oponentes_nuevos)
+                        atacado = prop[oa]
+
+                        if tipo[oa] != PERFECTA:
+                            t.convertir(oa, jugador, PESADA)
+                            self.estadisticas[color_propio]['victorias_combate'] += 1
+
+                            anotar(turno, TOMA_POSICION, jugador, atacado)
+
+                            actuado[oa] = True
+
                         else:
-                             puntuacion_propia = self.tirar_dados(ficha.dados_combate)
-                             puntuacion_oponente = self.tirar_dados(oponente_atacado.dados_combate)
-                             
+                             puntuacion_propia = self.tirar_dados(DADOS_COMBATE[tipo[pos_nueva]])
+                             puntuacion_oponente = self.tirar_dados(DADOS_COMBATE[tipo[oa]])
+
                              if puntuacion_propia > puntuacion_oponente:
-                                 ficha_perdedora = oponente_atacado
-                                 color_ganador_base = ficha.color_base
-                                 tipo_ganador = "pesada"
-                                 
-                                 if ficha_perdedora.tipo == "perfecta" and ficha_perdedora.color_base == self.human_color_base:
-                                     self.fichas_perfectas_count -= 1 
-                                     
-                                 ficha_perdedora.color_base = color_ganador_base
-                                 ficha_perdedora.tipo = tipo_ganador
-                                 self.estadisticas[color_ganador_base]['victorias_combate'] += 1
-                                 self.agregar_mensaje(f"⚔️ {nombre_propio} GANA (PERF vs PERF) en Brecha! {nombre_oponente_atacado} teñido a FUERTE.")
+                                 t.convertir(oa, jugador, PESADA)
+                                 self.estadisticas[color_propio]['victorias_combate'] += 1
+                                 anotar(turno, BRECHA_VICTORIA, jugador, atacado)
                              else:
-                                self.agregar_mensaje(f"⚔️ {nombre_propio} EMPATE (PERF vs PERF) en Brecha.")
-                                oponente_atacado.ha_actuado = True
-                    
-                    ficha.es_actuando = False
-                    continue 
+                                anotar(turno, BRECHA_EMPATE, jugador)
+                                actuado[oa] = True
+
+                    if perf is not None:
+                        perf.marcar(FASE_REEMPLAZO)
+                    continue
+
 
-            
             # 3.3. ACCIÓN ESTÁNDAR (Mover o Multiplicar)
-            vecinos_libres = ficha.obtener_vecinos_libres(set(fichas_dict.keys()))
-            
+            vecinos_libres = t.vecinos_libres(i)
+
             if not vecinos_libres:
-                ficha.ha_actuado = True
-                ficha.es_actuando = False
+                actuado[i] = True
+                if perf is not None:
+                    perf.marcar(FASE_ACCION)
                 continue
-            
-            conteo_propio = self.contar_fichas().get(ficha.color_base, {}).get('total', 0)
-            max_fichas_total = COLUMNAS * FILAS 
+
+            # Sin las fichas creadas en este turno, como en las reglas originales
+            conteo_propio = t.conteos[jugador][0] - t.creadas[jugador]
+            max_fichas_total = t.filas * t.columnas
             probabilidad_multiplicar_frente = self.probabilidad_combate + (conteo_propio / max_fichas_total)
-            
-            
-            if not ficha.puede_mover:
-                 accion = "multiplicar"
+
+            tipo_ficha = tipo[i]
+
+            if not PUEDE_MOVER[tipo_ficha]:
+                 accion_elegida = "multiplicar"
             else:
-                 accion = "mover" if random.random() < probabilidad_multiplicar_frente else "multiplicar"
+                 accion_elegida = "mover" if aleatorio.random() < probabilidad_multiplicar_frente else "multiplicar"
+
+            if accion_elegida == "multiplicar":
+
+                # Rama de multiplicación: qué tipos se generan (ver motor_lote.TIPOS_RAMA)
+                is_human_unit = (jugador == humano)
+
+                if tipo_ficha == LIGERA:
+                    if aleatorio.random() < 0.5:
+                        rama = RAMA_LIGERA_X3
+                    else:
+                        rama = RAMA_LIGERA_X1
+
+                elif tipo_ficha == PESADA:
 
-            if accion == "multiplicar":
-                
-                tipos_generados = []
-                accion_msg = ""
-                is_human_unit = (ficha.color_base == self.human_color_base)
-                
-                if ficha.tipo == "ligera": 
-                    if random.random() < 0.5: 
-                        tipos_generados = ["ligera"] * 3
-                        accion_msg = "x3 Rápidas"
-                    else: 
-                        tipos_generados = ["pesada"] * 1
-                        accion_msg = "x1 Fuerte"
-                
-                elif ficha.tipo == "pesada": 
-                    
                     if is_human_unit:
-                        if random.random() < 0.5: 
-                            tipos_generados = ["pesada"] * 2
-                            accion_msg = "x2 Fuertes"
-                        else: 
-                            tipos_generados = ["ligera"] * 4
-                            accion_msg = "x4 Rápidas"
-                            
-                        if self.fichas_perfectas_count < MAX_FICHAS_PERFECTAS:
-                            if tipos_generados and tipos_generados[0] != "perfecta":
-                                tipos_generados[0] = "perfecta" 
-                                accion_msg += f" + 1 {self.perfecta_emoji}"
+                        if aleatorio.random() < 0.5:
+                            rama = RAMA_HUMANA_X2
+                        else:
+                            rama = RAMA_HUMANA_X4
+
+                        # Con hueco bajo el límite, la primera generada es perfecta
+                        if self.fichas_perfectas_count < self.max_perfectas:
+                            rama = RAMA_HUMANA_X2_PERF if rama == RAMA_HUMANA_X2 else RAMA_HUMANA_X4_PERF
                     else:
-                        if random.random() < 0.6: 
-                            tipos_generados = ["pesada", "ligera", "ligera"] 
-                            accion_msg = "x3 (1F, 2R)"
-                        else: 
-                            tipos_generados = ["pesada"] * 3 
-                            accion_msg = "x3 Fuertes"
-
-                else: # ficha.tipo == "perfecta"
-                    if self.fichas_perfectas_count < MAX_FICHAS_PERFECTAS:
-                        tipos_generados = ["perfecta", "pesada", "ligera"]
-                        accion_msg = f"x1 {self.perfecta_emoji}, x1 Fuerte, x1 Rápida"
+                        if aleatorio.random() < 0.6:
+                            rama = RAMA_IA_MIXTA
+                        else:
+                            rama = RAMA_IA_X3
+
+                else: # tipo_ficha == PERFECTA
+                    if self.fichas_perfectas_count < self.max_perfectas:
+                        rama = RAMA_PERFECTA
                     else:
-                        tipos_generados = ["pesada"] * 2
-                        accion_msg = "x2 Fuertes"
-                
-                posiciones_disponibles = ficha.obtener_vecinos_libres(set(fichas_dict.keys()))
-                num_a_generar = len(tipos_generados)
-                
-                posiciones_generadas = random.sample(posiciones_disponibles, min(num_a_generar, len(posiciones_disponibles)))
-                
-                if posiciones_generadas: 
-                    ficha.realizo_accion = True 
-                    
-                    for i, pos in enumerate(posiciones_generadas):
-                        if i < len(tipos_generados): 
-                            r_new, c_new = pos
-                            nuevo_tipo = tipos_generados[i]
-                            
-                            if nuevo_tipo == "perfecta":
-                                self.fichas_perfectas_count += 1
-                            
-                            nueva_ficha = Ficha(ficha.color_base, r_new, c_new, tipo=nuevo_tipo)
-                            nueva_ficha.ha_actuado = True 
-                            nuevas_fichas.append(nueva_ficha)
-                            fichas_dict[pos] = nueva_ficha
-                    
-                    self.estadisticas[ficha.color_base]['multiplicaciones'] += 1 
-                    self.agregar_mensaje(f"➕ {nombre_propio} se multiplica ({ficha.tipo[0].upper()} -> {accion_msg}, {len(posiciones_generadas)} creadas)")
-            
-            elif accion == "mover" and ficha.puede_mover:
-                
-                r_new, c_new = ficha.fila, ficha.columna
-                
+                        rama = RAMA_HUMANA_X2
+
+                tipos_generados = TIPOS_RAMA[rama, :GENERADAS_RAMA[rama]].tolist()
+                if influencia is None:
+                    posiciones_generadas = aleatorio.sample(vecinos_libres, min(len(tipos_generados), len(vecinos_libres)))
+                else:
+                    posiciones_generadas = influencia.mejores(jugador, vecinos_libres, len(tipos_generados), aleatorio)
+
+                accion[i] = True
+
+                for pos, nuevo_tipo in zip(posiciones_generadas, tipos_generados):
+                    t.colocar(pos, jugador, nuevo_tipo, nueva=True)
+
+                self.estadisticas[color_propio]['multiplicaciones'] += 1
+                anotar(turno, MULTIPLICACION, jugador, a=tipo_ficha, b=rama, c=len(posiciones_generadas))
+
+            else: # mover
+
                 # **********************************************
                 # LÓGICA DE MOVIMIENTO TÁCTICO PARA PERFECTA HUMANA
                 # **********************************************
-                if ficha.tipo == "perfecta" and ficha.color_base == self.human_color_base:
-                    
+                if tipo_ficha == PERFECTA and jugador == humano:
+
                     # 1. Buscar posiciones libres adyacentes a un enemigo
-                    posiciones_brecha = [pos for pos in vecinos_libres if ficha.es_posicion_brecha(pos[0], pos[1], fichas_dict)]
-                    
+                    if influencia is None:
+                        posiciones_brecha = [v for v in vecinos_libres if t.es_posicion_brecha(v, jugador)]
+                    else:
+                        posiciones_brecha = influencia.brechas(jugador, vecinos_libres)
+
                     if posiciones_brecha:
                         # Prioridad 1: Mover a posición de brecha
-                        r_new, c_new = random.choice(posiciones_brecha)
-                        self.agregar_mensaje(f"➡️ {nombre_propio} PERFECTA Abre Brecha!")
+                        destino = elegir_destino(jugador, posiciones_brecha)
+                        anotar(turno, ABRE_BRECHA, jugador)
                     else:
                         # Prioridad 2: Movimiento aleatorio (expansión)
-                        r_new, c_new = random.choice(vecinos_libres) 
-                        self.agregar_mensaje(f"↗️ {nombre_propio} PERFECTA Avanza")
-                
-                else: 
+                        destino = elegir_destino(jugador, vecinos_libres)
+                        anotar(turno, AVANCE_PERFECTA, jugador)
+
+                else:
                     # Movimiento aleatorio para el resto de unidades móviles (Ligera y Perfecta IA)
-                    r_new, c_new = random.choice(vecinos_libres)
-                    self.agregar_mensaje(f"↗️ {nombre_propio} RÁPIDA/PERFECTA IA se mueve")
-
-                del fichas_dict[(ficha.fila, ficha.columna)]
-                ficha.mover(r_new, c_new)
-                fichas_dict[(r_new, c_new)] = ficha
-                self.estadisticas[ficha.color_base]['movimientos'] += 1 
-                ficha.realizo_accion = True 
-            
-            ficha.ha_actuado = True
-            ficha.es_actuando = False 
-        
-        
+                    destino = elegir_destino(jugador, vecinos_libres)
+                    anotar(turno, MOVIMIENTO, jugador)
+
+                t.mover(i, destino)
+                self.estadisticas[color_propio]['movimientos'] += 1
+                accion[destino] = True
+                i = destino
+
+            actuado[i] = True
+            if perf is not None:
+                perf.marcar(FASE_ACCION)
+
+
         # 4. PROCESAR INACTIVIDAD Y ASCENSO DE FICHAS HUMANAS
-        for ficha in self.fichas:
-            if ficha.color_base != self.human_color_base:
-                continue
-                
-            if ficha.realizo_accion: 
-                ficha.turnos_inactivos = 0 
+        if perf is not None:
+            perf.reanudar()
+        ascensos = self.procesar_inactividad()
+        if perf is not None:
+            perf.marcar(FASE_INACTIVIDAD, ascensos)
+
+        ganador = self.verificar_victoria()
+        if perf is not None:
+            perf.terminar_turno()
+        return self._registrar_turno(ganador)
+
+    def _registrar_turno(self, ganador):
+        """
+        Apunta en el diario y el historial (si los hay) el tablero del turno, vuelca
+        los eventos y reconstruye los territorios cuando toca.
+        """
+        self.eventos.volcar()
+        self.tablero.territorios.revisar(self.turno_actual)
+        if self.diario is not None:
+            self.diario.registrar_turno(self.turno_actual, self.tablero)
+        if self.historial is not None:
+            self.historial.registrar_turno(self.turno_actual, self.tablero)
+        return ganador
+
+    def procesar_inactividad(self, rng=None):
+        """
+        Inactividad y ascenso de las fichas humanas (fin de turno, común a ambos motores).
+        rng: generador de NumPy para el sorteo de ascensos (None = self.aleatorio).
+        Devuelve el número de fichas que ascienden.
+        """
+        t = self.tablero
+        humano = self.jugador_humano
+        if humano is None:
+            return 0
+
+        # (las fichas creadas en este turno no cuentan hasta el siguiente)
+        humanas = (t._prop == humano) & ~t._nueva
+        activas = humanas & t._accion
+        inactivas = humanas ^ activas
+        t._inact *= ~activas
+        t._inact += inactivas
+
+        # Candidatas: ligeras con 3 turnos inactivas o más y pesadas con 5 o más
+        candidatas = (inactivas & (t._inact >= 3)).nonzero()[0]
+        tipo_candidatas = t._tipo[candidatas]
+        ascensos_fuerte = candidatas[tipo_candidatas == LIGERA].tolist()
+        ascensos_perfecta = candidatas[(tipo_candidatas == PESADA) & (t._inact[candidatas] >= 5)]
+
+        # Si hay más candidatas que hueco bajo el límite, se sortean las que ascienden
+        cupo = max(0, self.max_perfectas - self.fichas_perfectas_count)
+        if cupo == 0:
+            ascensos_perfecta = []
+        elif len(ascensos_perfecta) > cupo:
+            if rng is None:
+                ascensos_perfecta = self.aleatorio.sample(ascensos_perfecta.tolist(), cupo)
             else:
-                ficha.turnos_inactivos += 1
-                
-                nombre_humano = self.obtener_nombre_jugador(self.human_color_base)
-                
-                if ficha.tipo == "ligera" and ficha.turnos_inactivos >= 3:
-                    ficha.tipo = "pesada"
-                    ficha.dados_combate = 5 
-                    ficha.puede_mover = False 
-                    ficha.turnos_inactivos = 0
-                    self.agregar_mensaje(f"⭐ {nombre_humano} Rápida ASCIENDE a Fuerte por inactividad!")
-                
-                elif ficha.tipo == "pesada" and ficha.turnos_inactivos >= 5:
-                    if self.fichas_perfectas_count < MAX_FICHAS_PERFECTAS:
-                        ficha.tipo = "perfecta"
-                        ficha.dados_combate = 5
-                        ficha.puede_mover = True 
-                        ficha.turnos_inactivos = 0
-                        self.fichas_perfectas_count += 1
-                        self.agregar_mensaje(f"{self.perfecta_emoji} {nombre_humano} Fuerte ASCIENDE a PERFECTA por inactividad!")
-                    else:
-                        pass 
+                ascensos_perfecta = rng.choice(ascensos_perfecta, cupo, replace=False).tolist()
+        else:
+            ascensos_perfecta = ascensos_perfecta.tolist()
 
-        self.fichas_perfectas_count = sum(1 for f in self.fichas if f.color_base == self.human_color_base and f.tipo == "perfecta")
-        
-        self.fichas.extend(nuevas_fichas)
-        self.fichas = [f for f in self.fichas if f.color_base in self.player_colors_base]
-        
-        return self.verificar_victoria()
+        for i in ascensos_fuerte:
+            t.cambiar_tipo(i, PESADA)
+            t._inact[i] = 0
+            self.eventos.anotar(self.turno_actual, ASCENSO_FUERTE, humano)
+
+        for i in ascensos_perfecta:
+            t.cambiar_tipo(i, PERFECTA)
+            t._inact[i] = 0
+            self.eventos.anotar(self.turno_actual, ASCENSO_PERFECTA, humano)
+
+        return len(ascensos_fuerte) + len(ascensos_perfecta)
 
 # --- 5. FUNCIONES DE DIBUJO ---
 
-def dibujar_cuadricula():
+# Dígitos de inactividad que se muestran por tipo (solo fichas humanas)
+DIGITOS_INACTIVIDAD = {LIGERA: 3, PESADA: 5}
+
+def color_ficha(color_base, tipo):
+    """Color de relleno de una ficha: el tono de su tipo, o la base oscurecida para las perfectas."""
+    if tipo in COLOR_TONOS[color_base]:
+        return COLOR_TONOS[color_base][tipo]
+    return oscurecer_color(color_base, 0.5)
+
+def dibujar_sprite_ficha(superficie, centro_x, centro_y, color_base, tipo, emoji, es_actuando, turnos_inactivos):
+    """Dibuja una ficha centrada en (centro_x, centro_y). Se usa para construir el atlas."""
+    radio = TAMANO_CELDA // 2 - 2 
+    color_real = color_ficha(color_base, tipo)
+
+    # 1. Dibujar el círculo principal
+    pygame.draw.circle(superficie, color_real, (centro_x, centro_y), radio)
+    
+    # 2. Indicador de Acción (Brillo alrededor)
+    if es_actuando:
+        pygame.draw.circle(superficie, AMARILLO_NEON, (centro_x, centro_y), radio + 3, 2)
+        
+    # 3. Indicador de Tipo de Ficha (Forma/Borde)
+    if tipo == "pesada":
+        # Cuadrado alrededor para 'Fuerte/Pesada'
+        rect_pesada = pygame.Rect(centro_x - radio + 1, centro_y - radio + 1, (radio - 1) * 2, (radio - 1) * 2)
+        pygame.draw.rect(superficie, oscurecer_color(color_real, 0.5), rect_pesada, 1)
+
+    elif tipo == "ligera":
+         # Círculo sencillo para 'Rápida/Ligera'
+         pygame.draw.circle(superficie, NEGRO, (centro_x, centro_y), radio, 1)
+
+    # 4. Indicador para Ficha Perfecta (Emoji)
+    if tipo == "perfecta":
+        text_surf = renderizar_texto(FUENTE_EMOJI, emoji, COLOR_PERFECTA_INDICATOR)
+        text_rect = text_surf.get_rect(center=(centro_x, centro_y))
+        superficie.blit(text_surf, text_rect)
+    
+    # 5. Indicador de inactividad (solo humano)
+    if turnos_inactivos > 0:
+        text = renderizar_texto(FUENTE_SMALL, f"{turnos_inactivos}", BLANCO)
+        superficie.blit(text, (centro_x + radio, centro_y - radio))
+    
+    # Borde final
+    pygame.draw.circle(superficie, NEGRO, (centro_x, centro_y), radio, 1)
+
+
+class AtlasFichas:
+    """
+    Sprites precalculados de todas las combinaciones de ficha:
+    color de la paleta x (ligera/pesada con dígito de inactividad, o perfecta con emoji)
+    x indicador de acción. El tablero se dibuja con una sola llamada a Surface.blits.
+    """
+    # Variantes por color: ligera 0-2, pesada 0-4 (dígito) y perfecta (un emoji por opción)
+    BASE_VARIANTE = {LIGERA: 0, PESADA: DIGITOS_INACTIVIDAD[LIGERA], PERFECTA: DIGITOS_INACTIVIDAD[LIGERA] + DIGITOS_INACTIVIDAD[PESADA]}
+    NUM_VARIANTES = BASE_VARIANTE[PERFECTA] + len(EMOJI_OPTIONS)
+
+    def __init__(self):
+        self.celda = TAMANO_CELDA
+        self._escalas = {TAMANO_CELDA: self}
+
+        # Cada sprite mide dos celdas para que el brillo y el dígito quepan fuera del círculo
+        self.lado = TAMANO_CELDA * 2
+        self.margen = TAMANO_CELDA // 2
+        centro = self.margen + TAMANO_CELDA // 2
+
+        # Cada sprite se recorta a su parte visible para copiar menos píxeles;
+        # desplazamientos guarda dónde queda el recorte respecto a la celda.
+        self.sprites = []
+        desplazamientos = []
+        for color_base in COLOR_PALETTE_BASE:
+            for variante in range(self.NUM_VARIANTES):
+                tipo, emoji, digito = self._describir_variante(variante)
+                for es_actuando in (False, True):
+                    sprite = pygame.Surface((self.lado, self.lado), pygame.SRCALPHA)
+                    dibujar_sprite_ficha(sprite, centro, centro, color_base, tipo, emoji, es_actuando, digito)
+                    visible = sprite.get_bounding_rect()
+                    self.sprites.append(sprite.subsurface(visible).convert_alpha())
+                    desplazamientos.append((visible.x - self.margen, visible.y - self.margen))
+        self.desplazamientos = np.array(desplazamientos)
+
+    def escalado(self, celda):
+        """Atlas con los mismos sprites para celdas de otro tamaño (zoom de la cámara); se crea una vez."""
+        if celda not in self._escalas:
+            atlas = copy.copy(self)
+            factor = celda / self.celda
+            atlas.celda = celda
+            atlas.sprites = [
+                pygame.transform.smoothscale(sprite, (max(1, round(sprite.get_width() * factor)), max(1, round(sprite.get_height() * factor))))
+                for sprite in self.sprites
+            ]
+            atlas.desplazamientos = np.round(self.desplazamientos * factor).astype(int)
+            self._escalas[celda] = atlas
+        return self._escalas[celda]
+
+    def _describir_variante(self, variante):
+        if variante >= self.BASE_VARIANTE[PERFECTA]:
+            return "perfecta", EMOJI_OPTIONS[variante - self.BASE_VARIANTE[PERFECTA]], 0
+        if variante >= self.BASE_VARIANTE[PESADA]:
+            return "pesada", None, variante - self.BASE_VARIANTE[PESADA]
+        return "ligera", None, variante
+
+    def sprite(self, color_base, tipo, emoji, es_actuando, turnos_inactivos):
+        """Devuelve (sprite, (dx, dy)): el recorte y su desplazamiento respecto a la celda."""
+        codigo_tipo = CODIGOS_TIPO[tipo]
+        if codigo_tipo == PERFECTA:
+            variante = self.BASE_VARIANTE[PERFECTA] + EMOJI_OPTIONS.index(emoji)
+        elif 0 < turnos_inactivos < DIGITOS_INACTIVIDAD[codigo_tipo]:
+            variante = self.BASE_VARIANTE[codigo_tipo] + turnos_inactivos
+        else:
+            variante = self.BASE_VARIANTE[codigo_tipo]
+        paleta = COLOR_PALETTE_BASE.index(color_base)
+        codigo = (paleta * self.NUM_VARIANTES + variante) * 2 + int(es_actuando)
+        return self.sprites[codigo], tuple(self.desplazamientos[codigo].tolist())
+
+    def codigos_tablero(self, gestor):
+        """Código de sprite de cada celda del tablero (índice plano), -1 si está vacía."""
+        t = gestor.tablero
+        return self.codigos_region(gestor, 0, t.filas, 0, t.columnas).reshape(-1)
+
+    def codigos_region(self, gestor, f0, f1, c0, c1):
+        """Códigos de sprite de las celdas [f0:f1, c0:c1] como matriz 2D, -1 si está vacía."""
+        t = gestor.tablero
+        prop = t.propietario[f0:f1, c0:c1]
+        codigos = np.full(prop.shape, -1, dtype=np.intp)
+        celdas = prop != VACIO
+        jugador = prop[celdas]
+        tipo = t.tipo[f0:f1, c0:c1][celdas]
+
+        # Color de la paleta de cada jugador y emoji de las perfectas
+        paleta_jugador = np.array([COLOR_PALETTE_BASE.index(c) for c in gestor.player_colors_base])
+        es_humano = jugador == gestor.jugador_humano
+        emoji_humano = EMOJI_OPTIONS.index(gestor.perfecta_emoji)
+        emoji = np.where(es_humano, emoji_humano, EMOJI_OPTIONS.index("👑"))
+
+        # Dígito de inactividad: humano, ligera < 3 o pesada < 5
+        inactividad = t.inactividad[f0:f1, c0:c1][celdas]
+        limite = np.where(tipo == LIGERA, DIGITOS_INACTIVIDAD[LIGERA], np.where(tipo == PESADA, DIGITOS_INACTIVIDAD[PESADA], 0))
+        digito = np.where(es_humano & (inactividad < limite), inactividad, 0)
+
+        base = np.array([0, self.BASE_VARIANTE[LIGERA], self.BASE_VARIANTE[PESADA], self.BASE_VARIANTE[PERFECTA]])
+        variante = base[tipo] + np.where(tipo == PERFECTA, emoji, digito)
+        codigos[celdas] = (paleta_jugador[jugador] * self.NUM_VARIANTES + variante) * 2
+        return codigos
+
+    def dibujar_tablero(self, pantalla, gestor, codigos=None):
+        """Dibuja todas las fichas del tablero con una sola llamada a blits."""
+        if codigos is None:
+            codigos = self.codigos_tablero(gestor)
+        celdas = np.flatnonzero(codigos >= 0)
+        codigos = codigos[celdas]
+
+        filas, columnas = np.divmod(celdas, gestor.tablero.columnas)
+        x = columnas * self.celda + self.desplazamientos[codigos, 0]
+        y = filas * self.celda + self.desplazamientos[codigos, 1]
+
+        sprites = self.sprites
+        pantalla.blits([(sprites[k], pos) for k, pos in zip(codigos.tolist(), zip(x.tolist(), y.tolist()))], doreturn=False)
+
+
+class MapaColores:
+    """
+    El tablero como imagen de un píxel por celda. El color de cada celda sale de una
+    tabla (propietario, tipo) -> RGB en un solo paso vectorial y se copia a una
+    superficie con pygame.surfarray.blit_array: el coste depende de las celdas que se
+    pintan, no de cuántas fichas haya vivas.
+    """
+    def __init__(self, gestor):
+        self.gestor = gestor
+        # Fila (propietario + 1) * 4 + tipo; la fila 0 (propietario VACIO) es el fondo
+        tabla = [VERDE_TABLERO] * 4
+        for color_base in gestor.player_colors_base:
+            tabla.append(VERDE_TABLERO)
+            tabla.extend(color_ficha(color_base, NOMBRES_TIPO[tipo]) for tipo in (LIGERA, PESADA, PERFECTA))
+        self.tabla = np.array(tabla, dtype=np.uint8)
+
+    def colores(self, f0, f1, c0, c1, paso=1):
+        """Colores de las celdas [f0:f1:paso, c0:c1:paso] como matriz (alto, ancho, 3)."""
+        t = self.gestor.tablero
+        prop = t.propietario[f0:f1:paso, c0:c1:paso]
+        tipo = t.tipo[f0:f1:paso, c0:c1:paso]
+        return self.tabla[(prop.astype(np.intp) + 1) * 4 + tipo]
+
+    def pintar(self, superficie, f0, f1, c0, c1, paso=1):
+        """Copia los colores de la región en una superficie del mismo tamaño (un píxel por celda)."""
+        pygame.surfarray.blit_array(superficie, self.colores(f0, f1, c0, c1, paso).swapaxes(0, 1))
+
+
+def dibujar_cuadricula(superficie=None):
     """Dibuja la cuadrícula solo en el área del tablero."""
+    if superficie is None:
+        superficie = PANTALLA
     for x in range(0, ANCHO_TABLERO + 1, TAMANO_CELDA):
-        pygame.draw.line(PANTALLA, GRIS_CUADRICULA, (x, 0), (x, ALTO_PANTALLA))
+        pygame.draw.line(superficie, GRIS_CUADRICULA, (x, 0), (x, ALTO_PANTALLA))
     for y in range(0, ALTO_PANTALLA + 1, TAMANO_CELDA):
-        pygame.draw.line(PANTALLA, GRIS_CUADRICULA, (0, y), (ANCHO_TABLERO, y))
+        pygame.draw.line(superficie, GRIS_CUADRICULA, (0, y), (ANCHO_TABLERO, y))
 
 def dibujar_resumen_final(gestor, resumen, boton_cerrar):
     """Dibuja la pantalla final con estilo mejorado."""
     PANTALLA.fill(NEGRO_FONDO) 
     
-    texto_titulo = FUENTE_GANADOR.render("FIN DE LA GUERRA", True, ROJO_ALERTA)
+    texto_titulo = renderizar_texto(FUENTE_GANADOR, "FIN DE LA GUERRA", ROJO_ALERTA)
     PANTALLA.blit(texto_titulo, (ANCHO_PANTALLA // 2 - texto_titulo.get_width() // 2, 20))
 
-    texto_ganador = FUENTE_TITULO_GRANDE.render(resumen['ganador_nombre'], True, AMARILLO_NEON)
+    texto_ganador = renderizar_texto(FUENTE_TITULO_GRANDE, resumen['ganador_nombre'], AMARILLO_NEON)
     PANTALLA.blit(texto_ganador, (ANCHO_PANTALLA // 2 - texto_ganador.get_width() // 2, 80))
     
     pygame.draw.line(PANTALLA, GRIS_CUADRICULA, (50, 150), (ANCHO_PANTALLA - 50, 150), 2)
@@ -833,39 +1419,44 @@ def dibujar_resumen_final(gestor, resumen, boton_cerrar):
         data = resumen['contadores'].get(color_base, {'total': 0, 'perfectas': 0})
         stats = resumen['estadisticas'].get(color_base, {})
         
-        fichas_rap = sum(1 for f in gestor.fichas if f.color_base == color_base and f.tipo == "ligera")
-        fichas_fue = sum(1 for f in gestor.fichas if f.color_base == color_base and f.tipo == "pesada")
+        fichas_rap = data.get('ligeras', 0)
+        fichas_fue = data.get('pesadas', 0)
         fichas_perf = data['perfectas'] 
 
         # Marco del jugador
         pygame.draw.rect(PANTALLA, oscurecer_color(color_base, 0.5), (x_pos - 5, y_pos - 5, col_width - 10, 230), border_radius=5)
         
-        texto_nombre = FUENTE_TITULO.render(f"JUGADOR: {nombre}", True, color_base) 
+        texto_nombre = renderizar_texto(FUENTE_TITULO, f"JUGADOR: {nombre}", color_base) 
         PANTALLA.blit(texto_nombre, (x_pos, y_pos))
 
-        texto_conteo = FUENTE_ESTADISTICAS.render(f"TOTAL Fichas: {data['total']}", True, BLANCO) 
+        texto_conteo = renderizar_texto(FUENTE_ESTADISTICAS, f"TOTAL Fichas: {data['total']}", BLANCO) 
         PANTALLA.blit(texto_conteo, (x_pos, y_pos + 40))
 
         # Tipos de ficha
-        texto_rapida = FUENTE_PRINCIPAL.render(f"  Rápidas (L): {fichas_rap}", True, BLANCO)
+        texto_rapida = renderizar_texto(FUENTE_PRINCIPAL, f"  Rápidas (L): {fichas_rap}", BLANCO)
         PANTALLA.blit(texto_rapida, (x_pos, y_pos + 70))
         
-        texto_fuerte = FUENTE_PRINCIPAL.render(f"  Fuertes (P): {fichas_fue}", True, BLANCO)
+        texto_fuerte = renderizar_texto(FUENTE_PRINCIPAL, f"  Fuertes (P): {fichas_fue}", BLANCO)
         PANTALLA.blit(texto_fuerte, (x_pos, y_pos + 95))
 
         if fichas_perf > 0:
             emoji_display = gestor.perfecta_emoji if color_base == gestor.human_color_base else "👑"
-            texto_perf = FUENTE_PRINCIPAL.render(f"  PERFECTAS ({emoji_display}): {fichas_perf}", True, COLOR_PERFECTA_INDICATOR)
+            texto_perf = renderizar_texto(FUENTE_PRINCIPAL, f"  PERFECTAS ({emoji_display}): {fichas_perf}", COLOR_PERFECTA_INDICATOR)
             PANTALLA.blit(texto_perf, (x_pos, y_pos + 120))
 
 
         y_offset = y_pos + 155
-        texto_combate = FUENTE_PRINCIPAL.render(f"Victorias Combate: {stats.get('victorias_combate', 0)}", True, BLANCO)
+        texto_combate = renderizar_texto(FUENTE_PRINCIPAL, f"Victorias Combate: {stats.get('victorias_combate', 0)}", BLANCO)
         PANTALLA.blit(texto_combate, (x_pos, y_offset))
         y_offset += 20
         
-        texto_mult = FUENTE_PRINCIPAL.render(f"Multiplicaciones: {stats.get('multiplicaciones', 0)}", True, BLANCO)
+        texto_mult = renderizar_texto(FUENTE_PRINCIPAL, f"Multiplicaciones: {stats.get('multiplicaciones', 0)}", BLANCO)
         PANTALLA.blit(texto_mult, (x_pos, y_offset))
+        y_offset += 20
+
+        territorio = resumen['territorios'].get(color_base, {'islas': 0, 'mayor': 0})
+        texto_islas = renderizar_texto(FUENTE_PRINCIPAL, f"Islas: {territorio['islas']} | Mayor: {territorio['mayor']}", BLANCO)
+        PANTALLA.blit(texto_islas, (x_pos, y_offset))
             
     # Dibujar el botón de cierre
     boton_cerrar.draw(PANTALLA)
@@ -873,18 +1464,8 @@ def dibujar_resumen_final(gestor, resumen, boton_cerrar):
     pygame.display.flip()
 
 
-def dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad):
-    """Dibuja la interfaz de juego con el panel lateral mejorado."""
-    PANTALLA.fill(VERDE_TABLERO)
-    
-    # 1. Dibujar el Tablero y Fichas
-    pygame.draw.rect(PANTALLA, VERDE_TABLERO, (0, 0, ANCHO_TABLERO, ALTO_PANTALLA))
-    dibujar_cuadricula()
-    
-    for ficha in gestor.fichas:
-        ficha.dibujar(PANTALLA)
-    
-    # 2. Dibujar el Panel Lateral (HUD)
+def dibujar_panel(gestor, velocidad_actual, es_pausado, botones_velocidad, camara=None, pixeles=False):
+    """Dibuja el panel lateral (HUD) con contadores, cronómetro y controles de velocidad."""
     panel_rect = pygame.Rect(ANCHO_TABLERO, 0, ANCHO_PANEL_DERECHO, ALTO_PANTALLA)
     pygame.draw.rect(PANTALLA, NEGRO_FONDO, panel_rect)
     pygame.draw.line(PANTALLA, AMARILLO_NEON, (ANCHO_TABLERO, 0), (ANCHO_TABLERO, ALTO_PANTALLA), 3)
@@ -892,11 +1473,11 @@ def dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad):
     contadores = gestor.contar_fichas()
     
     # Título del HUD
-    titulo_hud = FUENTE_TITULO.render("Estadísticas", True, AMARILLO_NEON)
+    titulo_hud = renderizar_texto(FUENTE_TITULO, "Estadísticas", AMARILLO_NEON)
     PANTALLA.blit(titulo_hud, (ANCHO_TABLERO + 10, 10))
     pygame.draw.line(PANTALLA, GRIS_CUADRICULA, (ANCHO_TABLERO + 10, 40), (ANCHO_PANTALLA - 10, 40), 1)
     
-    # 3. Contadores principales y Stats
+    # 1. Contadores principales y Stats
     y_count = 50
     for color_base in gestor.player_colors_base:
         if color_base not in contadores: continue
@@ -905,33 +1486,39 @@ def dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad):
         nombre = gestor.obtener_nombre_jugador(color_base)
         
         # Nombre y Total
-        texto_nombre_total = FUENTE_ESTADISTICAS.render(f"{nombre}: {data['total']}", True, color_base)
+        texto_nombre_total = renderizar_texto(FUENTE_ESTADISTICAS, f"{nombre}: {data['total']}", color_base)
         PANTALLA.blit(texto_nombre_total, (ANCHO_TABLERO + 10, y_count))
         y_count += 20
         
         # Tipos de ficha
-        fichas_rap = sum(1 for f in gestor.fichas if f.color_base == color_base and f.tipo == "ligera")
-        fichas_fue = sum(1 for f in gestor.fichas if f.color_base == color_base and f.tipo == "pesada")
+        fichas_rap = data['ligeras']
+        fichas_fue = data['pesadas']
         fichas_perf = data['perfectas']
         
-        texto_tipos = FUENTE_PRINCIPAL.render(f"  R:{fichas_rap} | F:{fichas_fue}", True, BLANCO)
+        texto_tipos = renderizar_texto(FUENTE_PRINCIPAL, f"  R:{fichas_rap} | F:{fichas_fue}", BLANCO)
         PANTALLA.blit(texto_tipos, (ANCHO_TABLERO + 10, y_count))
         
         if fichas_perf > 0:
             emoji_display = gestor.perfecta_emoji if color_base == gestor.human_color_base else "👑"
-            texto_perf = FUENTE_EMOJI.render(f"{emoji_display}:{fichas_perf}", True, COLOR_PERFECTA_INDICATOR)
+            texto_perf = renderizar_texto(FUENTE_EMOJI, f"{emoji_display}:{fichas_perf}", COLOR_PERFECTA_INDICATOR)
             PANTALLA.blit(texto_perf, (ANCHO_TABLERO + 150, y_count))
         
         y_count += 25 
         
         # Victorias de combate
         victorias = gestor.estadisticas.get(color_base, {}).get('victorias_combate', 0)
-        texto_vict = FUENTE_SMALL.render(f"Vict. Combate: {victorias}", True, BLANCO)
+        texto_vict = renderizar_texto(FUENTE_SMALL, f"Vict. Combate: {victorias}", BLANCO)
         PANTALLA.blit(texto_vict, (ANCHO_TABLERO + 10, y_count))
+
+        # Territorios (alineados a la derecha): islas separadas y tamaño de la mayor
+        jugador = gestor.player_colors_base.index(color_base)
+        territorios = gestor.tablero.territorios
+        texto_islas = renderizar_texto(FUENTE_SMALL, f"Islas {territorios.islas[jugador]} (máx {territorios.mayor[jugador]})", BLANCO)
+        PANTALLA.blit(texto_islas, (ANCHO_PANTALLA - 10 - texto_islas.get_width(), y_count))
         
         # Límite de Perfectas (solo humano)
         if color_base == gestor.human_color_base:
-             texto_limite = FUENTE_SMALL.render(f"Límite {gestor.perfecta_emoji}: {MAX_FICHAS_PERFECTAS - gestor.fichas_perfectas_count}", True, COLOR_PERFECTA_INDICATOR)
+             texto_limite = renderizar_texto(FUENTE_SMALL, f"Límite {gestor.perfecta_emoji}: {gestor.max_perfectas - gestor.fichas_perfectas_count}", COLOR_PERFECTA_INDICATOR)
              PANTALLA.blit(texto_limite, (ANCHO_TABLERO + 10, y_count + 15))
              y_count += 30 
         
@@ -939,37 +1526,412 @@ def dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad):
         pygame.draw.line(PANTALLA, GRIS_CUADRICULA, (ANCHO_TABLERO + 10, y_count), (ANCHO_PANTALLA - 10, y_count), 1)
         y_count += 10
 
-    # 4. Cronómetro y Turno
-    tiempo_restante = max(0, gestor.tiempo_limite - (time.time() - gestor.tiempo_inicio))
-    minutos = int(tiempo_restante // 60)
-    segundos = int(tiempo_restante % 60)
-    color_tiempo = ROJO_ALERTA if tiempo_restante < 60 and tiempo_restante > 0 else AMARILLO_NEON
+    # 2. Cronómetro y Turno
+    tiempo_restante = gestor.tiempo_restante()
+    if tiempo_restante is None:
+        texto_cronometro, color_tiempo = "--:--", AMARILLO_NEON
+    else:
+        minutos = int(tiempo_restante // 60)
+        segundos = int(tiempo_restante % 60)
+        texto_cronometro = f"{minutos:02}:{segundos:02}"
+        color_tiempo = ROJO_ALERTA if tiempo_restante < 60 and tiempo_restante > 0 else AMARILLO_NEON
     
-    texto_tiempo = FUENTE_CRONOMETRO.render(f"{minutos:02}:{segundos:02}", True, color_tiempo)
+    texto_tiempo = renderizar_texto(FUENTE_CRONOMETRO, texto_cronometro, color_tiempo)
     PANTALLA.blit(texto_tiempo, (ANCHO_TABLERO + 10, ALTO_PANTALLA - 150))
     
-    texto_turno = FUENTE_TITULO.render(f"Turno: {gestor.turno_actual:04d}", True, BLANCO)
+    texto_turno = renderizar_texto(FUENTE_TITULO, f"Turno: {gestor.turno_actual:04d}", BLANCO)
     PANTALLA.blit(texto_turno, (ANCHO_TABLERO + 10, ALTO_PANTALLA - 100))
     
-    # 5. Controles de Velocidad 
+    # 3. Controles de Velocidad 
     y_control = ALTO_PANTALLA - 50 
     
-    texto_velocidad = FUENTE_PRINCIPAL.render("VELOCIDAD:", True, BLANCO)
+    texto_velocidad = renderizar_texto(FUENTE_PRINCIPAL, "VELOCIDAD:", BLANCO)
     PANTALLA.blit(texto_velocidad, (ANCHO_TABLERO + 10, y_control - 20))
+
+    # Tamaño del tablero y zoom de la cámara
+    if camara is not None:
+        texto_camara = renderizar_texto(FUENTE_SMALL, f"{gestor.tablero.columnas}x{gestor.tablero.filas}  zoom {camara.celda}px{'  píxel' if pixeles else ''}", COLOR_BOTON_NORMAL)
+        PANTALLA.blit(texto_camara, (ANCHO_TABLERO + 120, y_control - 17))
     
     for btn in botones_velocidad:
         is_selected = (es_pausado and btn.text == "⏸") or \
                       (not es_pausado and btn.action == velocidad_actual and btn.text != "⏸")
         btn.draw(PANTALLA, is_selected=is_selected)
 
-    # 6. Mensajes del turno (en el lado izquierdo del tablero)
+
+def dibujar_mensajes(gestor):
+    """Dibuja los mensajes del turno (en el lado izquierdo del tablero). Devuelve sus rectángulos."""
+    rects = []
     y_offset = ALTO_PANTALLA - 20
-    for mensaje in gestor.mensajes:
-        texto_msg = FUENTE_PRINCIPAL.render(mensaje, True, BLANCO, (0,0,0,100)) # Fondo semitransparente para mejor lectura
-        PANTALLA.blit(texto_msg, (10, y_offset))
+    for mensaje in gestor.textos_mensajes():
+        texto_msg = renderizar_texto(FUENTE_PRINCIPAL, mensaje, BLANCO, (0,0,0,100)) # Fondo semitransparente para mejor lectura
+        rects.append(PANTALLA.blit(texto_msg, (10, y_offset)))
         y_offset -= 18
-    
-    pygame.display.flip()
+    return rects
+
+
+def dibujar_perfil(perfil):
+    """Dibuja el desglose medio por fases del perfilador en la esquina del tablero. Devuelve su rectángulo."""
+    total_ms, turnos = perfil[NUM_FASES]
+    lineas = [f"PERFIL (media de {int(turnos)} turnos): {total_ms:.2f} ms/turno"]
+    for nombre, (ms, elementos) in zip(NOMBRES_FASE, perfil[:NUM_FASES]):
+        porcentaje = 100 * ms / total_ms if total_ms else 0
+        lineas.append(f"{nombre:<12} {ms:7.2f} ms {porcentaje:5.1f}%  n={elementos:.0f}")
+    otros_ms = total_ms - perfil[:NUM_FASES, 0].sum()
+    lineas.append(f"{'otros':<12} {otros_ms:7.2f} ms")
+
+    textos = [renderizar_texto(FUENTE_PRINCIPAL, linea, AMARILLO_NEON if k == 0 else BLANCO) for k, linea in enumerate(lineas)]
+    ancho = max(texto.get_width() for texto in textos) + 20
+    fondo = pygame.Surface((ancho, 18 * len(textos) + 10), pygame.SRCALPHA)
+    fondo.fill((0, 0, 0, 190))
+    for k, texto in enumerate(textos):
+        fondo.blit(texto, (10, 5 + 18 * k))
+    return PANTALLA.blit(fondo, (10, 10))
+
+
+class RenderizadorInterfaz:
+    """
+    Dibujo incremental de la partida. El tablero se dibuja por trozos (ver
+    tablero.TAMANO_TROZO): cada trozo que ve la cámara tiene su superficie en caché
+    al zoom actual y en cada fotograma solo se repintan las celdas cuyo sprite
+    cambió. Los trozos se componen en la vista según la posición de la cámara, así
+    que el coste depende de lo que cabe en pantalla y no del tamaño del tablero.
+    En modo píxel (tecla V, y siempre por debajo de CELDA_MINIMA_SPRITES) la vista
+    se pinta desde MapaColores, una celda por píxel escalada al zoom: coste fijo por
+    fotograma. Si la cámara no muestra ni la mitad del tablero, un minimapa con el
+    mismo mapa de colores indica qué parte se ve (tecla M para ocultarlo).
+    El panel se redibuja solo cuando cambian sus valores. A la pantalla se envían
+    únicamente los rectángulos modificados con pygame.display.update(rects).
+    """
+    # Fracción de celdas de un trozo a repintar a partir de la cual sale más barato
+    # rehacerlo entero (medido con celdas sucias al azar: repintar el 20 % cuesta
+    # ~0.6 veces el trozo entero y el 30 %, casi lo mismo)
+    UMBRAL_TABLERO_COMPLETO = 0.25
+    # Tamaño mínimo de celda (px) con el que se dibuja la cuadrícula
+    CELDA_MINIMA_CUADRICULA = 10
+    # Por debajo de este tamaño de celda (px) los sprites no se distinguen: modo píxel
+    CELDA_MINIMA_SPRITES = 5
+    # Tamaño máximo del minimapa (px) y fracción visible del tablero por debajo de la cual aparece
+    TAMANO_MINIMAPA = (220, 140)
+    FRACCION_MINIMAPA = 0.5
+
+    def __init__(self, gestor, camara=None):
+        self.gestor = gestor
+        t = gestor.tablero
+        # Solo se ve la parte del tablero a la izquierda del panel (el borde del panel pisa el último píxel)
+        self.area_tablero = pygame.Rect(0, 0, ANCHO_TABLERO - 1, ALTO_PANTALLA)
+        self.camara = camara if camara is not None else Camara(ANCHO_TABLERO, ALTO_PANTALLA, t.filas, t.columnas, TAMANO_CELDA)
+        self.superficie = pygame.Surface((ANCHO_TABLERO, ALTO_PANTALLA)).convert() # vista compuesta
+        # Caché LRU de trozos: (fila, columna) de trozo -> (superficie, códigos con borde).
+        # Se conserva al invalidar: sus códigos dicen qué celdas hay que repintar.
+        self.trozos = OrderedDict()
+        self.fondo = None       # fondo de un trozo (verde y cuadrícula) al zoom actual
+        self.mapa = MapaColores(gestor)
+        self.pixeles = False    # modo píxel elegido con la tecla V
+        self.superficie_pixeles = None  # un píxel por celda visible (modo píxel)
+        self.mostrar_minimapa = True
+        self.rect_minimapa = None
+        self.invalidar()
+
+    def invalidar(self):
+        """Fuerza un redibujado completo en el próximo fotograma."""
+        self.vista = None       # estado de la cámara con el que se compuso la vista
+        self.turno = None
+        self.estado_panel = None
+        self.capas = None
+        self.rects_capas = []
+
+    def _crear_fondo(self, celda):
+        """Fondo de un trozo completo: se copia en lugar de pintar la cuadrícula línea a línea."""
+        lado = TAMANO_TROZO * celda
+        self.fondo = pygame.Surface((lado, lado)).convert()
+        self.fondo.fill(VERDE_TABLERO)
+        if celda >= self.CELDA_MINIMA_CUADRICULA:
+            for x in range(0, lado, celda):
+                pygame.draw.line(self.fondo, GRIS_CUADRICULA, (x, 0), (x, lado))
+                pygame.draw.line(self.fondo, GRIS_CUADRICULA, (0, x), (lado, x))
+
+    @property
+    def modo_pixeles(self):
+        return self.pixeles or self.camara.celda < self.CELDA_MINIMA_SPRITES
+
+    def _estado_vista(self):
+        """Cámara y modo de dibujo: si no cambian, la vista compuesta sigue valiendo."""
+        return self.camara.estado + (self.modo_pixeles,)
+
+    def _dibujar_trozo(self, superficie, codigos, atlas):
+        """Dibuja un trozo entero. codigos incluye un borde de una celda: sus sprites sobresalen dentro."""
+        superficie.blit(self.fondo, (0, 0))
+        filas, columnas = np.nonzero(codigos >= 0)
+        codigos = codigos[filas, columnas]
+        x = (columnas - 1) * atlas.celda + atlas.desplazamientos[codigos, 0]
+        y = (filas - 1) * atlas.celda + atlas.desplazamientos[codigos, 1]
+        sprites = atlas.sprites
+        superficie.blits([(sprites[k], pos) for k, pos in zip(codigos.tolist(), zip(x.tolist(), y.tolist()))], doreturn=False)
+
+    def _repintar_celdas(self, superficie, filas, columnas, codigos, atlas):
+        """
+        Repinta en un trozo las celdas indicadas (en orden por filas). Se agrupan en
+        rectángulos: tramos de celdas seguidas de una fila, unidos con los de las
+        filas siguientes si ocupan las mismas columnas. Los sprites sobresalen media
+        celda, así que cada rectángulo se recompone con el fondo y los sprites de su
+        contorno de una celda, recortando al rectángulo y en el mismo orden (por
+        filas) que el dibujo completo.
+        """
+        if filas.size == 0:
+            return []
+        celda = atlas.celda
+        sprites = atlas.sprites
+        nuevo_tramo = np.ones(filas.size, dtype=bool)
+        nuevo_tramo[1:] = (filas[1:] != filas[:-1]) | (columnas[1:] != columnas[:-1] + 1)
+        inicios = nuevo_tramo.nonzero()[0]
+        fines = np.append(inicios[1:], filas.size) - 1
+        rectangulos = []
+        for r, c0, c1 in zip(filas[inicios].tolist(), columnas[inicios].tolist(), (columnas[fines] + 1).tolist()):
+            anterior = rectangulos[-1] if rectangulos else None
+            if anterior is not None and anterior[1] == r and anterior[2] == c0 and anterior[3] == c1:
+                anterior[1] = r + 1
+            else:
+                rectangulos.append([r, r + 1, c0, c1])
+
+        # Listas de Python: indexar NumPy elemento a elemento es más lento que el propio blit
+        desplazamientos = atlas.desplazamientos.tolist()
+        codigos = codigos.tolist()
+        fondo = self.fondo
+        rects = []
+        for r0, r1, c0, c1 in rectangulos:
+            rect = pygame.Rect(c0 * celda, r0 * celda, (c1 - c0) * celda, (r1 - r0) * celda)
+            superficie.set_clip(rect)
+            superficie.blit(fondo, rect, rect)
+            # codigos tiene un borde de una celda: la fila r de codigos es la r - 1 del trozo
+            lista = []
+            for r in range(r0, r1 + 2):
+                fila = codigos[r]
+                y = (r - 1) * celda
+                for c in range(c0, c1 + 2):
+                    k = fila[c]
+                    if k >= 0:
+                        dx, dy = desplazamientos[k]
+                        lista.append((sprites[k], ((c - 1) * celda + dx, y + dy)))
+            superficie.blits(lista, doreturn=False)
+            rects.append(rect)
+        superficie.set_clip(None)
+        return rects
+
+    def _actualizar_trozo(self, clave, codigos, atlas):
+        """
+        Pone al día la superficie de un trozo. Devuelve (superficie, rectángulos
+        cambiados en coordenadas del trozo, o None si se dibujó entero).
+        """
+        alto, ancho = codigos.shape[0] - 2, codigos.shape[1] - 2
+        entrada = self.trozos.get(clave)
+        if entrada is None:
+            superficie = pygame.Surface((ancho * atlas.celda, alto * atlas.celda)).convert()
+            self._dibujar_trozo(superficie, codigos, atlas)
+            self.trozos[clave] = (superficie, codigos)
+            return superficie, None
+        superficie, anteriores = entrada
+        self.trozos[clave] = (superficie, codigos)
+        self.trozos.move_to_end(clave) # usado más recientemente
+
+        # Celdas cuyo sprite cambió y sus 8 vecinas (donde pueden sobresalir)
+        cambio = codigos != anteriores
+        sucias = np.zeros((alto, ancho), dtype=bool)
+        for dr in range(3):
+            for dc in range(3):
+                sucias |= cambio[dr:dr + alto, dc:dc + ancho]
+
+        filas, columnas = np.nonzero(sucias)
+        if len(filas) > self.UMBRAL_TABLERO_COMPLETO * sucias.size:
+            self._dibujar_trozo(superficie, codigos, atlas)
+            return superficie, None
+        return superficie, self._repintar_celdas(superficie, filas, columnas, codigos, atlas)
+
+    def _actualizar_pixeles(self):
+        """Modo píxel: las celdas visibles, un píxel cada una, se escalan al zoom sobre la vista."""
+        camara = self.camara
+        f0, f1, c0, c1 = camara.rango_celdas()
+        tamano = (c1 - c0, f1 - f0)
+        if self.superficie_pixeles is None or self.superficie_pixeles.get_size() != tamano:
+            self.superficie_pixeles = pygame.Surface(tamano)
+        self.mapa.pintar(self.superficie_pixeles, f0, f1, c0, c1)
+        escalada = pygame.transform.scale(self.superficie_pixeles, (tamano[0] * camara.celda, tamano[1] * camara.celda))
+        self.superficie.fill(NEGRO_FONDO)
+        self.superficie.blit(escalada, (c0 * camara.celda - camara.x, f0 * camara.celda - camara.y))
+
+    def _actualizar_tablero(self):
+        """Actualiza los trozos visibles y la vista. Devuelve los rectángulos cambiados o None si cambió entera."""
+        t = self.gestor.tablero
+        camara = self.camara
+        estado = self._estado_vista()
+        recomponer = self.vista != estado
+        self.vista = estado
+        if self.modo_pixeles:
+            self._actualizar_pixeles()
+            return None
+
+        atlas = atlas_fichas().escalado(camara.celda)
+        if self.fondo is None or self.fondo.get_width() != TAMANO_TROZO * camara.celda:
+            self.trozos.clear() # otro zoom: los trozos guardados tienen otra escala
+            self._crear_fondo(camara.celda)
+
+        # Códigos de la zona de los trozos visibles con un borde de una celda (-1 fuera del tablero)
+        visibles = camara.trozos_visibles()
+        f0, _, c0, _ = t.limites_trozo(*visibles[0])
+        _, f1, _, c1 = t.limites_trozo(*visibles[-1])
+        codigos = atlas.codigos_region(self.gestor, max(f0 - 1, 0), min(f1 + 1, t.filas), max(c0 - 1, 0), min(c1 + 1, t.columnas))
+        codigos = np.pad(codigos, ((int(f0 == 0), int(f1 == t.filas)), (int(c0 == 0), int(c1 == t.columnas))), constant_values=-1)
+
+        if recomponer:
+            self.superficie.fill(NEGRO_FONDO) # fuera del tablero, si el tablero no llena la vista
+        rects = []
+        for tf, tc in visibles:
+            r0, r1, k0, k1 = t.limites_trozo(tf, tc)
+            superficie, cambiados = self._actualizar_trozo((tf, tc), codigos[r0 - f0:r1 - f0 + 2, k0 - c0:k1 - c0 + 2], atlas)
+            origen = camara.origen_trozo(tf, tc)
+            if recomponer:
+                self.superficie.blit(superficie, origen)
+                continue
+            if cambiados is None:
+                cambiados = [superficie.get_rect()]
+            for rect in cambiados:
+                self.superficie.blit(superficie, rect.move(origen), rect)
+                rects.append(rect.move(origen))
+
+        # Memoria acotada por la pantalla: se descartan los trozos usados hace más tiempo
+        while len(self.trozos) > 2 * len(visibles):
+            self.trozos.popitem(last=False)
+        return None if recomponer else rects
+
+    def _minimapa_visible(self):
+        if not self.mostrar_minimapa:
+            return False
+        t = self.gestor.tablero
+        f0, f1, c0, c1 = self.camara.rango_celdas()
+        return (f1 - f0) * (c1 - c0) < self.FRACCION_MINIMAPA * t.filas * t.columnas
+
+    def _dibujar_minimapa(self):
+        """Dibuja el tablero entero (muestreado) y el recuadro de la cámara en la esquina superior derecha."""
+        t = self.gestor.tablero
+        ancho_max, alto_max = self.TAMANO_MINIMAPA
+        paso = max(1, -(-t.columnas // ancho_max), -(-t.filas // alto_max))
+        pequena = pygame.Surface((-(-t.columnas // paso), -(-t.filas // paso)))
+        self.mapa.pintar(pequena, 0, t.filas, 0, t.columnas, paso)
+        escala = min(ancho_max / pequena.get_width(), alto_max / pequena.get_height())
+        imagen = pygame.transform.scale(pequena, (max(1, int(pequena.get_width() * escala)), max(1, int(pequena.get_height() * escala))))
+        rect = PANTALLA.blit(imagen, imagen.get_rect(topright=(ANCHO_TABLERO - 10, 10)))
+
+        f0, f1, c0, c1 = self.camara.rango_celdas()
+        ex, ey = rect.width / t.columnas, rect.height / t.filas
+        vista = pygame.Rect(rect.x + int(c0 * ex), rect.y + int(f0 * ey), max(2, round((c1 - c0) * ex)), max(2, round((f1 - f0) * ey)))
+        pygame.draw.rect(PANTALLA, AMARILLO_NEON, vista.clip(rect), 1)
+        borde = rect.inflate(2, 2)
+        pygame.draw.rect(PANTALLA, BLANCO, borde, 1)
+        self.rect_minimapa = rect
+        return borde
+
+    def manejar_evento(self, evento):
+        """
+        Controles de la vista: los de la cámara (ver manejar_evento_camara), V (modo
+        píxel), M (minimapa) y clic o arrastre en el minimapa (centrar la cámara).
+        Devuelve True si el evento era suyo.
+        """
+        if evento.type == pygame.KEYDOWN and evento.key == pygame.K_v:
+            self.pixeles = not self.pixeles
+            return True
+        if evento.type == pygame.KEYDOWN and evento.key == pygame.K_m:
+            self.mostrar_minimapa = not self.mostrar_minimapa
+            return True
+        rect = self.rect_minimapa
+        if rect is not None and evento.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION) and rect.collidepoint(evento.pos):
+            if (evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1) or (evento.type == pygame.MOUSEMOTION and evento.buttons[0]):
+                t = self.gestor.tablero
+                self.camara.centrar_en((evento.pos[1] - rect.y) * t.filas // rect.height, (evento.pos[0] - rect.x) * t.columnas // rect.width)
+                return True
+        return manejar_evento_camara(evento, self.camara)
+
+    def _estado_panel(self, velocidad_actual, es_pausado, botones_velocidad):
+        """Valores que muestra el panel; si no cambian no hace falta redibujarlo."""
+        gestor = self.gestor
+        tiempo_restante = gestor.tiempo_restante()
+        raton = pygame.mouse.get_pos()
+        sobre_boton = next((i for i, btn in enumerate(botones_velocidad) if btn.rect.collidepoint(raton)), None)
+        return (
+            gestor.turno_actual,
+            tuple(tuple(conteo) for conteo in gestor.tablero.conteos),
+            tuple(datos.get('victorias_combate', 0) for datos in gestor.estadisticas.values()),
+            None if tiempo_restante is None else (int(tiempo_restante), tiempo_restante < 60),
+            velocidad_actual, es_pausado, sobre_boton, self.camara.celda, self.modo_pixeles,
+        )
+
+    def dibujar(self, velocidad_actual, es_pausado, botones_velocidad, perfil=None):
+        """
+        Dibuja un fotograma enviando a la pantalla solo lo que cambió.
+        perfil: desglose de PerfiladorTurnos.resumen() para superponer (None = oculto).
+        """
+        gestor = self.gestor
+        completo = self.vista is None
+        rects = []
+        rects_tablero = []
+
+        # 1. Tablero: solo si ha pasado algún turno o se ha movido la cámara desde el último fotograma
+        if gestor.turno_actual != self.turno or self.vista != self._estado_vista():
+            self.turno = gestor.turno_actual
+            rects_tablero = self._actualizar_tablero()
+            if rects_tablero is None:
+                rects_tablero = [self.area_tablero]
+            rects_tablero = [r.clip(self.area_tablero) for r in rects_tablero]
+            PANTALLA.blits([(self.superficie, r, r) for r in rects_tablero], doreturn=False)
+            rects.extend(rects_tablero)
+
+        # Mensajes, perfil y minimapa se pintan encima del tablero: se rehacen si cambian o si se han tapado
+        minimapa = (gestor.turno_actual, self.camara.estado) if self._minimapa_visible() else None
+        capas = (tuple(gestor.mensajes), None if perfil is None else perfil.round(2).tobytes(), minimapa)
+        if capas != self.capas or any(r.collidelist(self.rects_capas) >= 0 for r in rects_tablero):
+            self.capas = capas
+            PANTALLA.blits([(self.superficie, r, r) for r in self.rects_capas], doreturn=False)
+            rects.extend(self.rects_capas)
+            self.rects_capas = dibujar_mensajes(gestor)
+            if perfil is not None:
+                self.rects_capas.append(dibujar_perfil(perfil))
+            self.rect_minimapa = None
+            if minimapa is not None:
+                self.rects_capas.append(self._dibujar_minimapa())
+            rects.extend(self.rects_capas)
+
+        # 2. Panel lateral
+        estado = self._estado_panel(velocidad_actual, es_pausado, botones_velocidad)
+        if estado != self.estado_panel:
+            self.estado_panel = estado
+            dibujar_panel(gestor, velocidad_actual, es_pausado, botones_velocidad, self.camara, self.modo_pixeles)
+            rects.append(pygame.Rect(ANCHO_TABLERO - 1, 0, ANCHO_PANEL_DERECHO + 1, ALTO_PANTALLA))
+
+        if completo:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+
+def manejar_evento_camara(evento, camara):
+    """
+    Controles de la cámara: rueda del ratón (zoom hacia el cursor), arrastre con el
+    botón derecho o central (mover) y teclas +/- (zoom). Devuelve True si el evento era suyo.
+    """
+    if evento.type == pygame.MOUSEWHEEL:
+        raton = pygame.mouse.get_pos()
+        if raton[0] < ANCHO_TABLERO:
+            camara.acercar(evento.y, raton)
+            return True
+    elif evento.type == pygame.MOUSEMOTION and (evento.buttons[1] or evento.buttons[2]):
+        camara.desplazar(-evento.rel[0], -evento.rel[1])
+        return True
+    elif evento.type == pygame.KEYDOWN and evento.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+        camara.acercar(1)
+        return True
+    elif evento.type == pygame.KEYDOWN and evento.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+        camara.acercar(-1)
+        return True
+    return False
 
 
 # --- 6. MENÚ PRINCIPAL MEJORADO ESTÉTICAMENTE ---
@@ -991,10 +1953,10 @@ def menu_principal():
     color_active = (50, 50, 70)
 
     # TITULO
-    titulo = FUENTE_TITULO_GRANDE.render("GUERRA DE PÍXELES - CONFIGURACIÓN", True, AMARILLO_NEON)
+    titulo = renderizar_texto(FUENTE_TITULO_GRANDE, "GUERRA DE PÍXELES - CONFIGURACIÓN", AMARILLO_NEON)
     
     # 1. CONFIGURACIÓN DEL JUGADOR
-    subtitulo_jugador = FUENTE_TITULO.render("1. ELIGE TU UNIDAD COMANDANTE:", True, BLANCO)
+    subtitulo_jugador = renderizar_texto(FUENTE_TITULO, "1. ELIGE TU UNIDAD COMANDANTE:", BLANCO)
     
     buttons_colores = []
     btn_size = 40
@@ -1006,7 +1968,7 @@ def menu_principal():
         buttons_colores.append(btn)
         
     # 2. CONFIGURACIÓN DE OPONENTES Y EMOJI
-    subtitulo_oponentes = FUENTE_TITULO.render("2. NOMBRE, EMOJI y OPONENTES:", True, BLANCO)
+    subtitulo_oponentes = renderizar_texto(FUENTE_TITULO, "2. NOMBRE, EMOJI y OPONENTES:", BLANCO)
     
     # Dropdown para el Emoji
     dropdown_emoji = Dropdown(
@@ -1020,6 +1982,18 @@ def menu_principal():
         FUENTE_EMOJI
     )
     
+    # Dropdown para el tamaño del tablero (columnas x filas)
+    dropdown_tablero = Dropdown(
+        center_x - 200,
+        412,
+        400,
+        35,
+        "Tablero",
+        TAMANOS_TABLERO,
+        FUENTE_PRINCIPAL,
+        FUENTE_PRINCIPAL
+    )
+
     buttons_oponentes = []
     btn_width = 40
     btn_height = 35
@@ -1031,7 +2005,7 @@ def menu_principal():
         buttons_oponentes.append(btn)
         
     # 3. CONFIGURACIÓN DE AGRESIVIDAD
-    subtitulo_combate = FUENTE_TITULO.render("3. PROBABILIDAD DE COMBATE:", True, BLANCO)
+    subtitulo_combate = renderizar_texto(FUENTE_TITULO, "3. PROBABILIDAD DE COMBATE:", BLANCO)
     
     buttons_combate = []
     valores_combate = [0.3, 0.5, 0.7, 0.9]
@@ -1073,6 +2047,10 @@ def menu_principal():
                     input_active_name = False 
                     continue 
 
+                if not dropdown_emoji.is_open and dropdown_tablero.handle_event(event):
+                    input_active_name = False
+                    continue
+
                 if input_rect_name.collidepoint(event.pos):
                     input_active_name = True
                 else:
@@ -1110,14 +2088,15 @@ def menu_principal():
         pygame.draw.rect(PANTALLA, color_name, input_rect_name, 0, border_radius=5)
         
         # Texto de etiqueta
-        label_surf = FUENTE_PRINCIPAL.render("Nombre:", True, BLANCO)
+        label_surf = renderizar_texto(FUENTE_PRINCIPAL, "Nombre:", BLANCO)
         PANTALLA.blit(label_surf, (input_rect_name.x + 5, input_rect_name.y + 7))
 
         # Nombre del jugador
-        text_surface_name = FUENTE_PRINCIPAL.render(human_name, True, AMARILLO_NEON)
+        text_surface_name = renderizar_texto(FUENTE_PRINCIPAL, human_name, AMARILLO_NEON)
         PANTALLA.blit(text_surface_name, (input_rect_name.x + 90, input_rect_name.y + 7))
         
-        # Dibujar Dropdown
+        # Dibujar Dropdowns (el de emoji al final: su lista se despliega sobre el del tablero)
+        dropdown_tablero.draw(PANTALLA)
         dropdown_emoji.draw(PANTALLA)
 
         # Dibujar botones y resaltar el seleccionado
@@ -1138,43 +2117,21 @@ def menu_principal():
     oponent_colors = [c for c in COLOR_PALETTE_BASE if c != human_color_base][:num_oponentes]
     all_player_colors = [human_color_base] + oponent_colors
     
-    return all_player_colors, probabilidad_combate, human_color_base, human_name.strip()[:15], dropdown_emoji.selected_option
+    columnas, filas = (int(lado) for lado in dropdown_tablero.selected_option.split("x"))
+    
+    return all_player_colors, probabilidad_combate, human_color_base, human_name.strip()[:15], dropdown_emoji.selected_option, (filas, columnas)
 
 # --- 7. BUCLE PRINCIPAL (FINAL) ---
 
-def main():
-    all_player_colors, probabilidad_combate, human_color_base, human_name, perfecta_emoji = menu_principal()
+def dibujar_aviso_hasta_el_final():
+    """Aviso mientras se juega sin dibujar hasta el final de la partida."""
+    aviso = renderizar_texto(FUENTE_TITULO_GRANDE, "Calculando hasta el final...", AMARILLO_NEON, NEGRO_FONDO)
+    PANTALLA.blit(aviso, aviso.get_rect(center=(ANCHO_TABLERO // 2, ALTO_PANTALLA // 2)))
+    pygame.display.flip()
 
-    global gestor 
-    gestor = GestorJuego(all_player_colors, probabilidad_combate, human_color_base, human_name, perfecta_emoji) 
-    
-    # Generar posiciones iniciales dispersas para N jugadores
-    initial_positions = [
-        (0, 0), (FILAS - 1, COLUMNAS - 1), (FILAS - 1, 0), (0, COLUMNAS - 1),                          
-        (FILAS // 2, 0), (FILAS // 2, COLUMNAS - 1), (0, COLUMNAS // 2), (FILAS - 1, COLUMNAS // 2)                  
-    ]
-    
-    # Asignar fichas iniciales
-    for i, color_base in enumerate(all_player_colors):
-        r, c = initial_positions[i]
-        ficha_tipo_1 = "pesada" 
-        ficha_tipo_2 = "ligera" 
-        
-        gestor.agregar_ficha(Ficha(color_base, r, c, tipo=ficha_tipo_1))
-        
-        r2, c2 = r + 1, c
-        if 0 <= r2 < FILAS and 0 <= c2 < COLUMNAS and (r2, c2) != (r, c):
-             gestor.agregar_ficha(Ficha(color_base, r2, c2, tipo=ficha_tipo_2))
 
-    
-    ultimo_turno = pygame.time.get_ticks()
-    corriendo = True
-    ganador = None
-    
-    velocidad_actual = 1
-    es_pausado = False
-    
-    # Creamos los botones de velocidad/pausa
+def crear_botones_velocidad():
+    """Botones de velocidad/pausa del panel derecho."""
     velocidades = [
         ("⏸", 0, ROJO_ALERTA), 
         ("1x", 1, AZUL_CLARO), 
@@ -1185,9 +2142,11 @@ def main():
         ("32x", 32, AZUL_CLARO), 
         ("64x", 64, AZUL_CLARO), 
         ("128x", 128, AZUL_CLARO), 
-        ("256x", 256, AZUL_CLARO)
+        ("256x", 256, AZUL_CLARO),
+        ("MAX", VELOCIDAD_TURBO, COLOR_BOTON_SELECCION),
+        ("FIN", VELOCIDAD_HASTA_FIN, ROJO_ALERTA)
     ]
-    btn_width = 50
+    btn_width = 42
     btn_height = 25
     
     # Calcular posición para que quepan en el panel derecho
@@ -1198,62 +2157,130 @@ def main():
     y_pos = ALTO_PANTALLA - 50 
     
     for i, (text, speed, color) in enumerate(velocidades):
-        if i > 0 and i % 5 == 0: # 5 botones por fila
+        if i > 0 and i % 6 == 0: # 6 botones por fila
             current_x = start_x
             y_pos += btn_height + 5
             
         btn = Button(current_x, y_pos, btn_width, btn_height, text, color, action=speed)
         botones_velocidad.append(btn)
         current_x += btn_width + 5
+    return botones_velocidad
+
+def main(partida=None, historial=None, diario=None, semilla=None):
+    """
+    Partida con ventana. Con `partida` (ruta de una partida guardada) se sigue esa
+    partida sin pasar por el menú; con `historial`, se registra en esa ruta el
+    propietario de cada celda en cada turno, y con `diario`, la partida. Sin
+    `semilla`, la partida nueva usa una al azar.
+    """
+    inicializar_pygame()
+    global gestor 
+    if partida is not None:
+        argumentos = None
+        gestor = GestorJuego.cargar_partida(partida)
+    else:
+        all_player_colors, probabilidad_combate, human_color_base, human_name, perfecta_emoji, (filas, columnas) = menu_principal()
+
+        argumentos = dict(
+            player_colors_base=all_player_colors,
+            probabilidad_combate=probabilidad_combate,
+            human_color_base=human_color_base,
+            human_name=human_name,
+            perfecta_emoji=perfecta_emoji,
+            # Queda en el diario y en el TXT de resultados
+            semilla=random.randrange(2 ** 32) if semilla is None else semilla,
+            filas=filas,
+            columnas=columnas,
+            # El motor ficha a ficha no da turnos fluidos en tableros grandes
+            motor="lote" if filas * columnas > CELDAS_MOTOR_LOTE else "secuencial",
+        )
+        gestor = GestorJuego(**argumentos)
 
+    # La partida se juega en un proceso trabajador; aquí solo hay un gestor
+    # espejo que recibe sus instantáneas para dibujarlas
+    simulacion = SimulacionEnSegundoPlano(gestor, argumentos, partida, historial, diario)
+    
+    corriendo = True
+    ganador = None
+    
+    velocidad_actual = 1
+    es_pausado = False
+    
+    botones_velocidad = crear_botones_velocidad()
+
+    # El tablero y el panel se redibujan de forma incremental
+    renderizador = RenderizadorInterfaz(gestor)
+    aviso_mostrado = False
+    mostrar_perfil = False # Tecla P: desglose de tiempos por fase (y CSV)
 
     while corriendo:
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT:
                 corriendo = False
+
+            if renderizador.manejar_evento(evento):
+                continue
             
             for btn in botones_velocidad:
                 if btn.is_clicked(evento):
                     if btn.text == "⏸":
                         es_pausado = not es_pausado
+                        simulacion.enviar("pausa", es_pausado)
                     else:
                         es_pausado = False
                         velocidad_actual = btn.action
                         if velocidad_actual == 0:
                             velocidad_actual = 1 
+                        simulacion.enviar("velocidad", velocidad_actual)
 
             if evento.type == pygame.KEYDOWN:
                  if evento.key == pygame.K_SPACE:
                     if es_pausado:
-                        ganador = gestor.procesar_turno()
-                        if ganador:
-                            corriendo = False
+                        simulacion.enviar("paso")
+                 if evento.key == pygame.K_p:
+                    mostrar_perfil = not mostrar_perfil
+                    simulacion.enviar("perfilar", mostrar_perfil)
+                 if evento.key == pygame.K_g:
+                    simulacion.enviar("guardar", ARCHIVO_PARTIDA)
                  if evento.key == pygame.K_ESCAPE:
                     corriendo = False
+
+        # Flechas: mover la cámara mientras estén pulsadas
+        teclas = pygame.key.get_pressed()
+        dx = (teclas[pygame.K_RIGHT] - teclas[pygame.K_LEFT]) * PASO_CAMARA
+        dy = (teclas[pygame.K_DOWN] - teclas[pygame.K_UP]) * PASO_CAMARA
+        if dx or dy:
+            renderizador.camara.desplazar(dx, dy)
         
-        tiempo_actual = pygame.time.get_ticks()
-        
-        if not es_pausado and not ganador:
-            turn_delay = BASE_TIEMPO_ENTRE_TURNOS / velocidad_actual
-            
-            if (tiempo_actual - ultimo_turno >= turn_delay):
-                ganador = gestor.procesar_turno()
-                dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad) 
-                ultimo_turno = tiempo_actual
-                
-                if ganador:
-                    corriendo = False
-        
-        if corriendo and time.time() - gestor.tiempo_inicio >= gestor.tiempo_limite:
-            ganador = gestor.verificar_victoria()
+        # Última instantánea publicada por el trabajador
+        simulacion.actualizar()
+        if simulacion.terminada:
+            ganador = simulacion.ganador
             corriendo = False
-
-        if corriendo:
-            dibujar_interfaz(gestor, velocidad_actual, es_pausado, botones_velocidad)
-        else:
+            if simulacion.error:
+                print(simulacion.error, file=sys.stderr)
+            if velocidad_actual == VELOCIDAD_HASTA_FIN:
+                # Solo se muestra el tablero final antes del resumen
+                renderizador.invalidar()
+                renderizador.dibujar(velocidad_actual, es_pausado, botones_velocidad)
+                pygame.time.wait(PAUSA_TABLERO_FINAL_MS)
+
+        if not corriendo:
             break
         
+        if velocidad_actual == VELOCIDAD_HASTA_FIN and not es_pausado:
+            if not aviso_mostrado:
+                dibujar_aviso_hasta_el_final()
+                aviso_mostrado = True
+        else:
+            if aviso_mostrado:
+                renderizador.invalidar()
+                aviso_mostrado = False
+            renderizador.dibujar(velocidad_actual, es_pausado, botones_velocidad, simulacion.perfil)
+        
         RELOJ.tick(60)
+
+    simulacion.detener()
     
     # -------------------------------------------------------------
     # BUCLE PARA PANTALLA DE RESULTADOS
@@ -1261,6 +2288,7 @@ def main():
     if ganador:
         resumen_final = gestor.obtener_estadisticas_finales(ganador)
         gestor.guardar_resultados_txt(resumen_final)
+        gestor.registrar_resultado(ganador)
 
         mostrar_resumen = True
         
@@ -1289,5 +2317,375 @@ def main():
     
     pygame.quit()
 
+# --- 8. SIMULACIÓN SIN PANTALLA ---
+
+def simular_sin_pantalla(num_oponentes=1, probabilidad_combate=PROBABILIDAD_COMBATE_BASE, max_turnos=1000, human_color_base=COLOR_PALETTE_BASE[0], motor="secuencial", semilla=None, perfilador=None, diario=None, max_perfectas=MAX_FICHAS_PERFECTAS, filas=FILAS, columnas=COLUMNAS, eventos=None, partida=None, guardar=None, historial=None, ia="aleatoria"):
+    """
+    Ejecuta una partida completa sin ventana, fuentes ni bucle de eventos.
+    Termina al llegar al turno max_turnos o cuando verificar_victoria devuelve un ganador.
+    perfilador: PerfiladorTurnos opcional para medir las fases de cada turno.
+    diario: ruta opcional donde registrar la partida para repetirla después.
+    eventos: ruta opcional donde guardar todos los eventos de la partida para analizarlos.
+    partida: ruta opcional de una partida guardada que se sigue (ignora jugadores, motor, semilla, tablero e ia).
+    guardar: ruta opcional donde guardar la partida al terminar.
+    historial: ruta opcional donde registrar el propietario de cada celda en cada turno.
+    ia: "aleatoria" o "influencia" (ver IAS).
+    """
+    # Sin límite de tiempo real: la partida se acota por número de turnos
+    if partida is not None:
+        gestor = GestorJuego.cargar_partida(partida, tiempo_limite=None)
+    else:
+        oponent_colors = [c for c in COLOR_PALETTE_BASE if c != human_color_base][:num_oponentes]
+        all_player_colors = [human_color_base] + oponent_colors
+        gestor = GestorJuego(all_player_colors, probabilidad_combate, human_color_base, tiempo_limite=None, motor=motor, semilla=semilla, max_perfectas=max_perfectas, filas=filas, columnas=columnas, ia=ia)
+        gestor.colocar_fichas_iniciales()
+    gestor.perfilador = perfilador
+    if diario is not None:
+        gestor.iniciar_diario(diario)
+    if eventos is not None:
+        gestor.iniciar_eventos(eventos)
+    if historial is not None:
+        gestor.iniciar_historial(historial)
+
+    ganador = None
+    turno_inicial = gestor.turno_actual
+    inicio = time.perf_counter()
+    while gestor.turno_actual < max_turnos and not ganador:
+        ganador = gestor.procesar_turno()
+    segundos = time.perf_counter() - inicio
+    gestor.cerrar_diario()
+    gestor.cerrar_eventos()
+    gestor.cerrar_historial()
+    if guardar is not None:
+        gestor.guardar_partida(guardar)
+
+    return {
+        'gestor': gestor,
+        'ganador': ganador,
+        'turnos': gestor.turno_actual,
+        'segundos': segundos,
+        'turnos_por_segundo': (gestor.turno_actual - turno_inicial) / segundos if segundos > 0 else 0.0
+    }
+
+def crear_parser():
+    """Argumentos de la línea de órdenes, comunes a la ventana y al modo sin pantalla."""
+    parser = argparse.ArgumentParser(
+        description="Guerra de Píxeles",
+        epilog="Sin --headless ni --exportar se abre la ventana: la partida, o el visor de "
+               "--reproducir o --analizar. Con --headless todo se muestra por consola.")
+    parser.add_argument("--headless", action="store_true", help="Ejecuta el motor de turnos sin ventana")
+    parser.add_argument("--turnos", type=int, default=1000, help="Número máximo de turnos (contando los de la partida cargada)")
+    parser.add_argument("--oponentes", type=int, default=1, choices=range(1, 8), help="Número de oponentes IA")
+    parser.add_argument("--probabilidad", type=float, default=PROBABILIDAD_COMBATE_BASE, help="Probabilidad de combate base")
+    parser.add_argument("--motor", choices=MOTORES, default="secuencial", help="Motor de reglas")
+    parser.add_argument("--ia", choices=IAS, default="aleatoria", help="Elección de destinos de movimientos y fichas nuevas")
+    parser.add_argument("--filas", type=int, default=FILAS, help=f"Filas del tablero (hasta {MAX_LADO_TABLERO})")
+    parser.add_argument("--columnas", type=int, default=COLUMNAS, help=f"Columnas del tablero (hasta {MAX_LADO_TABLERO})")
+    parser.add_argument("--perfil", nargs="?", const=ARCHIVO_PERFIL_CSV, default=None, metavar="CSV",
+                        help=f"Mide cada fase del turno y guarda una fila por turno en CSV (por defecto {ARCHIVO_PERFIL_CSV})")
+    parser.add_argument("--semilla", type=int, default=None, help="Semilla de la partida (reproducible)")
+    parser.add_argument("--diario", nargs="?", const=ARCHIVO_DIARIO, default=None, metavar="RUTA",
+                        help=f"Registra la partida en un diario binario (por defecto {ARCHIVO_DIARIO})")
+    parser.add_argument("--eventos", nargs="?", const=ARCHIVO_EVENTOS, default=None, metavar="RUTA",
+                        help=f"Guarda todos los eventos de la partida en un archivo binario (por defecto {ARCHIVO_EVENTOS})")
+    parser.add_argument("--historial", nargs="?", const=ARCHIVO_HISTORIAL, default=None, metavar="RUTA",
+                        help=f"Registra el propietario de cada celda en cada turno (por defecto {ARCHIVO_HISTORIAL})")
+    parser.add_argument("--analizar", metavar="RUTA", default=None, help="Analiza un historial en lugar de jugar una partida")
+    parser.add_argument("--cargar", metavar="RUTA", default=None, help="Sigue una partida guardada (tecla G o --guardar)")
+    parser.add_argument("--guardar", nargs="?", const=ARCHIVO_PARTIDA, default=None, metavar="RUTA",
+                        help=f"Guarda la partida al terminar para seguirla después (por defecto {ARCHIVO_PARTIDA})")
+    parser.add_argument("--reproducir", metavar="RUTA", default=None, help="Lee un diario en lugar de jugar una partida")
+    parser.add_argument("--hasta-turno", type=int, default=None, help="Turno del diario que se muestra (por defecto el último; en el visor, el primero)")
+    parser.add_argument("--exportar", metavar="RUTA", default=None, help="Exporta un diario como animación en lugar de jugar una partida")
+    parser.add_argument("--salida", default=ARCHIVO_ANIMACION, metavar="RUTA",
+                        help=f"Animación de --exportar: .gif o directorio de PNG (por defecto {ARCHIVO_ANIMACION})")
+    parser.add_argument("--paso", type=int, default=1, help="Con --exportar, un fotograma cada PASO turnos")
+    parser.add_argument("--escala", type=int, default=ESCALA_ANIMACION, help="Con --exportar, píxeles por lado de cada celda")
+    parser.add_argument("--retardo", type=int, default=RETARDO_ANIMACION_MS, help="Con --exportar, milisegundos por fotograma del GIF")
+    return parser
+
+def main_sin_pantalla(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+
+    if args.reproducir:
+        resumir_diario(args.reproducir, args.hasta_turno)
+        return
+    if args.analizar:
+        resumir_historial(args.analizar)
+        return
+    if args.exportar:
+        if args.paso < 1 or args.escala < 1:
+            parser.error("--paso y --escala deben ser al menos 1")
+        exportar_diario(args.exportar, args.salida, args.paso, args.escala, args.retardo)
+        return
+
+    # La media del resumen final abarca toda la partida
+    perfilador = PerfiladorTurnos(args.perfil, turnos_media=args.turnos) if args.perfil else None
+    resultado = simular_sin_pantalla(args.oponentes, args.probabilidad, args.turnos, motor=args.motor,
+                                     semilla=args.semilla, perfilador=perfilador, diario=args.diario,
+                                     filas=args.filas, columnas=args.columnas, eventos=args.eventos,
+                                     partida=args.cargar, guardar=args.guardar, historial=args.historial,
+                                     ia=args.ia)
+    gestor = resultado['gestor']
+
+    if resultado['ganador']:
+        nombre_ganador = gestor.obtener_estadisticas_finales(resultado['ganador'])['ganador_nombre']
+    else:
+        nombre_ganador = "SIN GANADOR (límite de turnos)"
+
+    print(f"{nombre_ganador} | Turnos: {resultado['turnos']} | "
+          f"{resultado['segundos']:.2f} s | {resultado['turnos_por_segundo']:.1f} turnos/s")
+
+    if perfilador is not None:
+        perfilador.cerrar()
+        resumen = perfilador.resumen()
+        total_ms = resumen[NUM_FASES, 0]
+        for nombre, (ms, elementos) in zip(NOMBRES_FASE, resumen[:NUM_FASES]):
+            print(f"  {nombre:<12} {ms:8.3f} ms/turno ({100 * ms / total_ms if total_ms else 0:5.1f}%)  n={elementos:.1f}")
+        print(f"  {'total':<12} {total_ms:8.3f} ms/turno | filas en {args.perfil}")
+
+    if args.guardar:
+        print(f"  Partida guardada en {args.guardar}")
+    if args.historial:
+        print(f"  Historial en {args.historial} (--analizar para resumirlo)")
+
+    if args.eventos:
+        registrados = np.fromfile(args.eventos, dtype=EVENTO)
+        conteo = np.bincount(registrados['codigo'], minlength=len(NOMBRES_CODIGO))
+        print(f"  {registrados.size} eventos en {args.eventos}: " + ", ".join(f"{nombre}: {n}" for nombre, n in zip(NOMBRES_CODIGO, conteo.tolist()) if n))
+
+def resumir_diario(ruta, turno=None):
+    """Muestra por consola el estado de un diario en un turno, sin volver a aplicar las reglas."""
+    inicio = time.perf_counter()
+    reproduccion = ReproduccionPartida(ruta)
+    carga = time.perf_counter() - inicio
+
+    turno = reproduccion.ultimo_turno if turno is None else turno
+    gestor = GestorJuego.desde_configuracion(reproduccion.configuracion, tiempo_limite=None)
+    inicio = time.perf_counter()
+    reproduccion.cargar_en(gestor.tablero, turno)
+    salto = time.perf_counter() - inicio
+
+    configuracion = reproduccion.configuracion
+    print(f"Diario {ruta}: turnos {reproduccion.primer_turno}-{reproduccion.ultimo_turno} | "
+          f"semilla {configuracion['semilla']} | motor {configuracion['motor']}")
+    print(f"Cargado en {carga * 1000:.1f} ms | turno {turno} reconstruido en {salto * 1000:.2f} ms")
+    eventos = reproduccion.resumen_eventos(turno)
+    print("Eventos del turno: " + ", ".join(f"{nombre}={eventos[nombre]}" for nombre in NOMBRES_EVENTO))
+    for color, data in gestor.contar_fichas().items():
+        print(f"  {gestor.obtener_nombre_jugador(color):<12} total={data['total']} "
+              f"R={data['ligeras']} F={data['pesadas']} P={data['perfectas']}")
+
+def resumir_historial(ruta):
+    """Muestra por consola el análisis de un historial de propietarios."""
+    inicio = time.perf_counter()
+    analisis = AnalisisHistorial(ruta)
+    resultado = analisis.analizar()
+    segundos = time.perf_counter() - inicio
+
+    gestor = GestorJuego.desde_configuracion(analisis.configuracion, tiempo_limite=None)
+    turnos, frente, disputa = analisis.turnos, resultado['frente'], resultado['disputa']
+    print(f"Historial {ruta}: turnos {turnos[0]}-{turnos[-1]} | {analisis.filas}x{analisis.columnas} | "
+          f"analizado en {segundos * 1000:.1f} ms")
+    k = int(frente.argmax())
+    print(f"Frente: {frente[-1]} al final, máximo {frente[k]} en el turno {turnos[k]}")
+    fila, columna = np.unravel_index(disputa.argmax(), disputa.shape)
+    print(f"Celdas disputadas: {np.count_nonzero(disputa)} | la más disputada ({fila}, {columna}) "
+          f"cambió de dueño {disputa[fila, columna]} veces")
+    for color, celdas in zip(gestor.player_colors_base, resultado['territorio'].T):
+        k = int(celdas.argmax())
+        print(f"  {gestor.obtener_nombre_jugador(color):<12} final={celdas[-1]} máximo={celdas[k]} (turno {turnos[k]})")
+
+def exportar_diario(ruta, salida=ARCHIVO_ANIMACION, paso=1, escala=ESCALA_ANIMACION, retardo_ms=RETARDO_ANIMACION_MS):
+    """
+    Exporta un diario como GIF animado (salida .gif) o como secuencia PNG (directorio).
+    Recorre los turnos aplicando los cambios del diario y pasa cada fotograma
+    (un turno de cada `paso`) de códigos de celda a índices de paleta con los
+    colores del modo píxel, sin ventana ni bucle de dibujo.
+    """
+    inicio = time.perf_counter()
+    reproduccion = ReproduccionPartida(ruta)
+    gestor = GestorJuego.desde_configuracion(reproduccion.configuracion, tiempo_limite=None)
+    t = gestor.tablero
+
+    # El índice de paleta de cada celda es su código (propietario + 1) * 4 + tipo (ver MapaColores)
+    paleta = MapaColores(gestor).tabla
+    escritor = crear_escritor(salida, t.columnas * escala, t.filas * escala, paleta, retardo_ms)
+    codigos = np.empty((t.filas, t.columnas), dtype=np.uint8)
+    try:
+        for turno, prop, tipo in reproduccion.recorrer(paso):
+            np.add((prop + 1) * 4, tipo, out=codigos.reshape(-1), casting='unsafe')
+            escritor.agregar(escalar(codigos, escala))
+    finally:
+        escritor.cerrar()
+    segundos = time.perf_counter() - inicio
+
+    turnos = reproduccion.ultimo_turno - reproduccion.primer_turno
+    print(f"{escritor.fotogramas} fotogramas ({t.columnas * escala}x{t.filas * escala}) de los turnos "
+          f"{reproduccion.primer_turno}-{reproduccion.ultimo_turno} -> {salida}")
+    print(f"Exportado en {segundos:.2f} s | {turnos / segundos if segundos > 0 else 0:.0f} turnos/s "
+          f"(la partida en pantalla va a {1000 / BASE_TIEMPO_ENTRE_TURNOS:g} turnos/s a velocidad x1)")
+
+
+# --- 9. REPETICIÓN DE PARTIDAS ---
+
+TURNOS_SALTO_LARGO = 100
+
+def main_reproduccion(ruta, turno=None):
+    """
+    Visor de un diario de partida: se puede reproducir o saltar a cualquier turno.
+    Empieza en `turno` o, sin él, en el primero del diario.
+    """
+    inicializar_pygame()
+    reproduccion = ReproduccionPartida(ruta)
+
+    global gestor
+    gestor = GestorJuego.desde_configuracion(reproduccion.configuracion, tiempo_limite=None)
+    renderizador = RenderizadorInterfaz(gestor)
+
+    def ir_a(turno):
+        turno = min(max(turno, reproduccion.primer_turno), reproduccion.ultimo_turno)
+        reproduccion.cargar_en(gestor.tablero, turno)
+        gestor.tablero.territorios.reconstruir()
+        gestor.turno_actual = turno
+        eventos = reproduccion.resumen_eventos(turno)
+        gestor.mensajes.clear()
+        gestor.mensajes.append("Izq/Dcha: ±1 turno | RePág/AvPág: ±100 | Inicio/Fin | Espacio: reproducir | Rueda/arrastre: cámara | V: píxeles | M: minimapa | ESC: salir")
+        gestor.mensajes.append(f"REPETICIÓN turno {turno}/{reproduccion.ultimo_turno} | " + ", ".join(f"{nombre}: {n}" for nombre, n in eventos.items()))
+
+    ir_a(reproduccion.primer_turno if turno is None else turno)
+    reproduciendo = False
+    corriendo = True
+
+    while corriendo:
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                corriendo = False
+            if renderizador.manejar_evento(evento):
+                continue
+            if evento.type == pygame.KEYDOWN:
+                saltos = {
+                    pygame.K_RIGHT: 1, pygame.K_LEFT: -1,
+                    pygame.K_PAGEUP: TURNOS_SALTO_LARGO, pygame.K_PAGEDOWN: -TURNOS_SALTO_LARGO,
+                }
+                if evento.key in saltos:
+                    reproduciendo = False
+                    ir_a(gestor.turno_actual + saltos[evento.key])
+                elif evento.key == pygame.K_HOME:
+                    ir_a(reproduccion.primer_turno)
+                elif evento.key == pygame.K_END:
+                    ir_a(reproduccion.ultimo_turno)
+                elif evento.key == pygame.K_SPACE:
+                    reproduciendo = not reproduciendo
+                elif evento.key == pygame.K_ESCAPE:
+                    corriendo = False
+
+        # Reproducción: un turno por fotograma
+        if reproduciendo:
+            if gestor.turno_actual >= reproduccion.ultimo_turno:
+                reproduciendo = False
+            else:
+                ir_a(gestor.turno_actual + 1)
+
+        renderizador.dibujar(1, not reproduciendo, [])
+        RELOJ.tick(60)
+
+    pygame.quit()
+
+
+# --- 10. ANÁLISIS DEL HISTORIAL ---
+
+# Mapa de calor: sin disputas en el color de fondo, de rojo oscuro a amarillo cuanto más
+PARADAS_CALOR = ((0, NEGRO_FONDO), (1, (90, 0, 0)), (128, (255, 60, 0)), (255, (255, 255, 120)))
+
+def superficie_calor(valores):
+    """Superficie con un píxel por celda; la escala es logarítmica hasta el máximo de `valores`."""
+    posiciones = [posicion for posicion, _ in PARADAS_CALOR]
+    paleta = np.array([
+        np.interp(np.arange(256), posiciones, [color[canal] for _, color in PARADAS_CALOR])
+        for canal in range(3)
+    ], dtype=np.uint8).T
+    maximo = max(int(valores.max()), 1)
+    niveles = np.where(valores > 0, 1 + np.round(254 * np.log1p(valores) / np.log1p(maximo)), 0).astype(np.uint8)
+    return pygame.surfarray.make_surface(paleta[niveles].swapaxes(0, 1))
+
+
+def dibujar_grafica(rect, turnos, series, colores, titulo):
+    """Gráfica de líneas de `series` (turnos, líneas), con como mucho un punto por columna de píxeles."""
+    pygame.draw.rect(PANTALLA, GRIS_OSCURO_HUD, rect)
+    PANTALLA.blit(renderizar_texto(FUENTE_ESTADISTICAS, titulo, BLANCO), (rect.x + 10, rect.y + 5))
+    area = pygame.Rect(rect.x + 50, rect.y + 35, rect.width - 60, rect.height - 55)
+    pygame.draw.rect(PANTALLA, GRIS_CUADRICULA, area, 1)
+
+    maximo = max(int(series.max()), 1)
+    PANTALLA.blit(renderizar_texto(FUENTE_SMALL, str(maximo), BLANCO), (rect.x + 5, area.y))
+    PANTALLA.blit(renderizar_texto(FUENTE_SMALL, "0", BLANCO), (rect.x + 5, area.bottom - 12))
+    PANTALLA.blit(renderizar_texto(FUENTE_SMALL, f"turno {turnos[0]}", BLANCO), (area.x, area.bottom + 3))
+    fin = renderizar_texto(FUENTE_SMALL, f"turno {turnos[-1]}", BLANCO)
+    PANTALLA.blit(fin, (area.right - fin.get_width(), area.bottom + 3))
+
+    muestras = np.unique(np.linspace(0, len(turnos) - 1, min(len(turnos), area.width)).astype(int))
+    if len(muestras) < 2:
+        return
+    xs = area.x + (muestras - muestras[0]) * (area.width - 1) / (muestras[-1] - muestras[0])
+    for serie, color in zip(series.T, colores):
+        ys = area.bottom - 1 - serie[muestras] * (area.height - 1) / maximo
+        pygame.draw.lines(PANTALLA, color, False, list(zip(xs.tolist(), ys.tolist())), 2)
+
+
+def main_analisis(ruta):
+    """Vista de un historial de propietarios: celdas disputadas, territorio por jugador y longitud del frente."""
+    inicializar_pygame()
+    analisis = AnalisisHistorial(ruta)
+    resultado = analisis.analizar()
+    gestor = GestorJuego.desde_configuracion(analisis.configuracion, tiempo_limite=None)
+    turnos, disputa = analisis.turnos, resultado['disputa']
+
+    PANTALLA.fill(NEGRO_FONDO)
+    titulo = renderizar_texto(FUENTE_TITULO, f"ANÁLISIS DEL HISTORIAL - turnos {turnos[0]}-{turnos[-1]} (ESC: salir)", AMARILLO_NEON)
+    PANTALLA.blit(titulo, (20, 10))
+
+    # Mapa de celdas disputadas, escalado sin deformar para caber en la mitad izquierda
+    zona = pygame.Rect(20, 75, ANCHO_PANTALLA // 2 - 30, ALTO_PANTALLA - 95)
+    texto = f"Celdas disputadas: {np.count_nonzero(disputa)} (máximo {disputa.max()} cambios de dueño)"
+    PANTALLA.blit(renderizar_texto(FUENTE_ESTADISTICAS, texto, BLANCO), (zona.x, 45))
+    escala = min(zona.width / analisis.columnas, zona.height / analisis.filas)
+    tamano = (max(1, int(analisis.columnas * escala)), max(1, int(analisis.filas * escala)))
+    PANTALLA.blit(pygame.transform.scale(superficie_calor(disputa), tamano), zona.topleft)
+
+    # Territorio (con leyenda) y frente en la mitad derecha
+    derecha = pygame.Rect(ANCHO_PANTALLA // 2 + 10, 45, ANCHO_PANTALLA // 2 - 30, (ALTO_PANTALLA - 65) // 2)
+    dibujar_grafica(derecha, turnos, resultado['territorio'], gestor.player_colors_base, "Territorio por jugador")
+    x = derecha.x + 260
+    for color in gestor.player_colors_base:
+        nombre = renderizar_texto(FUENTE_PRINCIPAL, gestor.obtener_nombre_jugador(color), aclarar_color(color))
+        PANTALLA.blit(nombre, (x, derecha.y + 8))
+        x += nombre.get_width() + 12
+    frente = derecha.move(0, derecha.height + 10)
+    dibujar_grafica(frente, turnos, resultado['frente'][:, None], [AMARILLO_NEON], "Longitud del frente (pares de celdas vecinas enemigas)")
+    pygame.display.flip()
+
+    corriendo = True
+    while corriendo:
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT or (evento.type == pygame.KEYDOWN and evento.key == pygame.K_ESCAPE):
+                corriendo = False
+        RELOJ.tick(30)
+
+    pygame.quit()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Primero se validan los argumentos (--help, rutas que faltan...) y solo
+    # sin modo sin pantalla se abre la ventana
+    argumentos = crear_parser().parse_args()
+    # --exportar no abre ventana: va siempre por la línea de órdenes sin pantalla
+    if argumentos.headless or argumentos.exportar:
+        main_sin_pantalla()
+    elif argumentos.reproducir:
+        main_reproduccion(argumentos.reproducir, argumentos.hasta_turno)
+    elif argumentos.analizar:
+        main_analisis(argumentos.analizar)
+    else:
+        # --cargar RUTA: seguir una partida guardada; --historial [RUTA] y --diario [RUTA]: registrarla
+        main(argumentos.cargar, argumentos.historial, argumentos.diario, argumentos.semilla)
@@ -0,0 +1,504 @@
+# motor_lote.py
+# Motor de reglas "por lotes" para la Guerra de Píxeles.
+#
+# En lugar de recorrer las fichas una a una, cada fase del turno se resuelve
+# a la vez para todo el tablero con operaciones de matrices de NumPy:
+#   1. Propagación de perfección (perfectas humanas)
+#   2. Combates, por rondas hasta que ninguna ficha pendiente toca a un enemigo
+#   3. Reemplazo táctico y asalto de las perfectas humanas
+#   4. Movimientos y multiplicaciones
+#   5. Inactividad y ascensos (compartido con el motor secuencial)
+#
+# Los conflictos (dos fichas que quieren la misma celda o el mismo rival) se
+# resuelven de forma determinista con una prioridad aleatoria por celda
+# sacada al inicio del turno: gana siempre la prioridad más alta. La
+# prioridad hace de orden de turno del motor secuencial (más alta = actúa
+# antes). Con la misma semilla, la partida es reproducible.
+#
+# Combates como en el motor secuencial: cada ficha que aún no ha actuado y
+# toca a un enemigo ataca a uno al azar, aunque este ya haya combatido en el
+# turno, y una captura deja junto al enemigo a fichas que atacarán si su turno
+# no había pasado. Por rondas, cada celda entra en un solo combate: el de mayor
+# prioridad; las demás lo intentan en la ronda siguiente, hasta que no queda
+# ninguna pareja en contacto. El resultado se decide con la probabilidad
+# exacta de las tiradas de dados de cada pareja de tipos, con un solo número
+# al azar por combate (PROB_GANA y PROB_DECIDIDO).
+#
+# Diferencia que queda con el motor secuencial: movimientos y
+# multiplicaciones se resuelven en una sola ronda sobre la zona activa (la
+# frontera al inicio del turno). Una ficha que pierde la celda libre ante otra
+# de más prioridad no prueba con otra, y el hueco que deja una ficha al
+# moverse no lo ocupa nadie hasta el turno siguiente. Se multiplica hasta un
+# 20 % menos por turno mientras hay sitio libre, y con el tablero casi lleno
+# se mueve bastante menos (los huecos no se encadenan); combates y fichas de
+# cada jugador coinciden en media (tests/test_motores.py).
+#
+# Cada fase cuesta unas pocas decenas de operaciones de NumPy, casi todas de
+# coste fijo (~1 µs): se evitan las copias (take en lugar de vecinos[:, i], que
+# no es contigua) y los índices del tablero (frontera y perfectas) no se crean
+# en cada turno: se calculan de las matrices cuando hacen falta (ver
+# Tablero.reconstruir_indices). En tablero_saturado de benchmark.py da más de
+# 10 veces los turnos por segundo del motor secuencial.
+
+import numpy as np
+
+from tablero import (
+    VACIO, TIPO_VACIO, LIGERA, PESADA, PERFECTA, DADOS_COMBATE, PUEDE_MOVER
+)
+from eventos import SEPARADOR, INICIO_TURNO, PROPAGACION_LOTE, RESUMEN_LOTE
+from perfilador import FASE_PROPAGACION, FASE_COMBATE, FASE_REEMPLAZO, FASE_ACCION, FASE_INACTIVIDAD
+
+MOVIL_POR_TIPO = np.array(PUEDE_MOVER)
+# Tipos que la propagación y el reemplazo táctico pueden tomar de una aliada
+ALIADA_POR_TIPO = np.array([False, True, True, False])
+# Tipo con el que el ganador de un combate se queda la celda del perdedor
+TIPO_VENCEDOR = np.array([TIPO_VACIO, LIGERA, PESADA, PESADA], dtype=np.int8)
+
+
+def _distribucion_suma(num_dados):
+    """Probabilidad de cada suma de num_dados dados de 6 caras (índice = suma)."""
+    distribucion = np.ones(1)
+    for _ in range(num_dados):
+        distribucion = np.convolve(distribucion, np.r_[0.0, np.full(6, 1 / 6)])
+    return distribucion
+
+
+def _probabilidades_combate():
+    """
+    Probabilidad de que gane el atacante y de que gane el defensor por tipo de
+    atacante y de defensor, con las reglas del motor secuencial: una perfecta gana
+    siempre a quien no lo es y, si no, se tiran DADOS_COMBATE dados cada uno
+    (empate si sacan lo mismo).
+    """
+    gana = np.zeros((len(DADOS_COMBATE), len(DADOS_COMBATE)))
+    pierde = np.zeros_like(gana)
+    for tipo_a in (LIGERA, PESADA, PERFECTA):
+        for tipo_o in (LIGERA, PESADA, PERFECTA):
+            if (tipo_a == PERFECTA) != (tipo_o == PERFECTA):
+                gana[tipo_a, tipo_o] = tipo_a == PERFECTA
+                pierde[tipo_a, tipo_o] = tipo_o == PERFECTA
+                continue
+            # conjunta[x, y]: el atacante saca x y el defensor y
+            conjunta = np.outer(_distribucion_suma(DADOS_COMBATE[tipo_a]), _distribucion_suma(DADOS_COMBATE[tipo_o]))
+            gana[tipo_a, tipo_o] = np.tril(conjunta, -1).sum()
+            pierde[tipo_a, tipo_o] = np.triu(conjunta, 1).sum()
+    return gana, pierde
+
+
+PROB_GANA, PROB_PIERDE = _probabilidades_combate()
+# Probabilidad de que el combate no acabe en empate: con u al azar en [0, 1),
+# gana el atacante si u < PROB_GANA y el defensor si PROB_GANA <= u < PROB_DECIDIDO
+PROB_DECIDIDO = PROB_GANA + PROB_PIERDE
+
+# Ramas de multiplicación: tipos generados (0 = ninguno), igual que en el motor secuencial
+RAMA_LIGERA_X3 = 0        # x3 Rápidas
+RAMA_LIGERA_X1 = 1        # x1 Fuerte
+RAMA_HUMANA_X2 = 2        # x2 Fuertes (también perfecta al límite)
+RAMA_HUMANA_X4 = 3        # x4 Rápidas
+RAMA_HUMANA_X2_PERF = 4   # x2 Fuertes + 1 perfecta
+RAMA_HUMANA_X4_PERF = 5   # x4 Rápidas + 1 perfecta
+RAMA_IA_MIXTA = 6         # x3 (1F, 2R)
+RAMA_IA_X3 = 7            # x3 Fuertes
+RAMA_PERFECTA = 8         # x1 perfecta, x1 Fuerte, x1 Rápida
+
+TIPOS_RAMA = np.array([
+    [LIGERA, LIGERA, LIGERA, TIPO_VACIO],
+    [PESADA, TIPO_VACIO, TIPO_VACIO, TIPO_VACIO],
+    [PESADA, PESADA, TIPO_VACIO, TIPO_VACIO],
+    [LIGERA, LIGERA, LIGERA, LIGERA],
+    [PERFECTA, PESADA, TIPO_VACIO, TIPO_VACIO],
+    [PERFECTA, LIGERA, LIGERA, LIGERA],
+    [PESADA, LIGERA, LIGERA, TIPO_VACIO],
+    [PESADA, PESADA, PESADA, TIPO_VACIO],
+    [PERFECTA, PESADA, LIGERA, TIPO_VACIO],
+], dtype=np.int8)
+GENERADAS_RAMA = (TIPOS_RAMA != TIPO_VACIO).sum(axis=1)
+
+# Rama por categoría de la ficha (ligera, fuerte humana, fuerte IA, perfecta) y
+# por resultado del sorteo (u < umbral, u >= umbral); con o sin cupo de perfectas
+UMBRAL_CATEGORIA = np.array([0.5, 0.5, 0.6, 1.0])
+RAMAS_SIN_CUPO = np.array([
+    [RAMA_LIGERA_X3, RAMA_LIGERA_X1],
+    [RAMA_HUMANA_X2, RAMA_HUMANA_X4],
+    [RAMA_IA_MIXTA, RAMA_IA_X3],
+    [RAMA_HUMANA_X2, RAMA_HUMANA_X2],
+])
+RAMAS_CON_CUPO = np.array([
+    [RAMA_LIGERA_X3, RAMA_LIGERA_X1],
+    [RAMA_HUMANA_X2_PERF, RAMA_HUMANA_X4_PERF],
+    [RAMA_IA_MIXTA, RAMA_IA_X3],
+    [RAMA_PERFECTA, RAMA_PERFECTA],
+])
+
+# Con la IA "influencia", desempate al azar entre destinos de igual puntuación
+RUIDO_DESEMPATE = 1e-6
+
+
+class MotorLote:
+    def __init__(self, gestor, max_perfectas, semilla=None):
+        self.gestor = gestor
+        self.max_perfectas = max_perfectas
+        self.rng = np.random.default_rng(semilla)
+        # Mayor prioridad que reclama cada celda (ver _sin_conflictos) y última
+        # aparición de cada celda (ver _sin_repetir); solo se escriben las celdas que se usan
+        self._mejor = np.empty(gestor.tablero._prop.size + 1)
+        self._marca = np.empty(gestor.tablero._prop.size + 1, dtype=np.intp)
+
+    def procesar_turno(self):
+        g = self.gestor
+        t = g.tablero
+        g.turno_actual += 1
+        g.eventos.anotar(g.turno_actual, SEPARADOR)
+        g.eventos.anotar(g.turno_actual, INICIO_TURNO, a=t.total_fichas())
+
+        # Zona activa: la frontera al inicio del turno (fichas junto a un enemigo o
+        # a una celda vacía). Solo ahí hay combates, movimientos y multiplicaciones:
+        # las demás fases no vacían celdas, así que sigue valiendo toda la fase de acción.
+        self.zona = t.celdas_frontera()
+        t.iniciar_turno()
+        # Prioridad de cada celda para resolver conflictos en este turno; la celda
+        # de relleno (vecinas fuera del tablero) nunca tiene turno pendiente
+        self.prioridad = self.rng.random(t._prop.size + 1)
+        self.prioridad[-1] = 1.0
+        perf = g.perfilador
+        if perf is not None:
+            perf.iniciar_turno(g.turno_actual)
+
+        propagadas = self._propagar_perfeccion() if g.jugador_humano is not None else 0
+        if perf is not None:
+            perf.marcar(FASE_PROPAGACION, propagadas)
+        combates = self._resolver_combates()
+        if perf is not None:
+            perf.marcar(FASE_COMBATE, combates)
+        reemplazos = self._reemplazo_tactico() if g.jugador_humano is not None else 0
+        if perf is not None:
+            perf.marcar(FASE_REEMPLAZO, reemplazos)
+        multiplicaciones, movimientos = self._mover_y_multiplicar()
+        t.reconstruir_indices()
+        if perf is not None:
+            perf.marcar(FASE_ACCION, multiplicaciones + movimientos)
+
+        ascensos = g.procesar_inactividad(self.rng)
+        if perf is not None:
+            perf.marcar(FASE_INACTIVIDAD, ascensos)
+
+        g.eventos.anotar(g.turno_actual, RESUMEN_LOTE, a=combates, b=reemplazos, c=multiplicaciones, d=movimientos)
+        ganador = g.verificar_victoria()
+        if perf is not None:
+            perf.terminar_turno()
+        return ganador
+
+    # --- utilidades ---
+
+    def _claves_destino(self, candidatas, puntuacion=None):
+        """
+        Claves de orden de los destinos (4, M): al azar o, con la puntuación de
+        cada destino, de mejor a peor puntuación (los empates, al azar). Los
+        destinos que no son candidatos quedan los últimos.
+        """
+        claves = self.rng.random(candidatas.shape)
+        if puntuacion is not None:
+            claves = RUIDO_DESEMPATE * claves - puntuacion
+        return np.where(candidatas, claves, np.inf)
+
+    def _elegir_direccion(self, candidatas, puntuacion=None):
+        """Para cada columna de una máscara (4, M), elige una fila verdadera (ver _claves_destino)."""
+        return self._claves_destino(candidatas, puntuacion).argmin(axis=0)
+
+    def _puntuacion_destinos(self, jugadores, vecinos):
+        """Puntuación de influencia de las vecinas (4, M) para el dueño de cada columna, o None sin mapas."""
+        g = self.gestor
+        if g.influencia is None:
+            return None
+        vecinas = np.minimum(vecinos, g.tablero._prop.size - 1) # las de fuera nunca son candidatas
+        return g.influencia.puntuacion[jugadores, vecinas]
+
+    def _sin_conflictos(self, fuentes, objetivos):
+        """Máscara de pares (fuente, objetivo) que conservan su objetivo: por cada
+        objetivo repetido gana la fuente con mayor prioridad."""
+        p = self.prioridad[fuentes]
+        mejor = self._mejor
+        mejor[objetivos] = -1.0
+        np.maximum.at(mejor, objetivos, p)
+        return mejor[objetivos] == p
+
+    def _sin_repetir(self, celdas):
+        """Las celdas sin repeticiones (en el orden de su última aparición)."""
+        posiciones = np.arange(celdas.size)
+        self._marca[celdas] = posiciones
+        return celdas[self._marca[celdas] == posiciones]
+
+    def _cupo_perfectas(self):
+        """Perfectas humanas que aún caben bajo el límite. Se cuenta sobre las
+        matrices porque los contadores del tablero no se actualizan hasta el
+        final del turno."""
+        t = self.gestor.tablero
+        actuales = np.count_nonzero((t._prop == self.gestor.jugador_humano) & (t._tipo == PERFECTA))
+        return max(0, self.max_perfectas - actuales)
+
+    def _sumar_estadistica(self, clave, jugadores):
+        g = self.gestor
+        conteo = np.bincount(jugadores, minlength=len(g.player_colors_base))
+        for color, n in zip(g.player_colors_base, conteo.tolist()):
+            g.estadisticas[color][clave] += n
+
+    # --- fases ---
+
+    def _propagar_perfeccion(self):
+        g = self.gestor
+        t = g.tablero
+        humano = g.jugador_humano
+
+        fuentes = ((t._prop == humano) & (t._tipo == PERFECTA)).nonzero()[0]
+        self.perfectas_turno = fuentes
+        restante = self.max_perfectas - fuentes.size
+        if restante <= 0 or fuentes.size == 0:
+            return 0
+        vecinos = t.vecinos_matriz.take(fuentes, axis=1)
+        candidatas = (t._prop_r[vecinos] == humano) & ALIADA_POR_TIPO.take(t._tipo_r[vecinos])
+
+        tiene = candidatas.any(axis=0)
+        columnas = tiene.nonzero()[0]
+        fuentes = fuentes[columnas]
+        objetivos = vecinos[self._elegir_direccion(candidatas.take(columnas, axis=1)), columnas]
+
+        conserva = self._sin_conflictos(fuentes, objetivos)
+        fuentes, objetivos = fuentes[conserva], objetivos[conserva]
+        objetivos = objetivos[np.argsort(-self.prioridad[fuentes])][:restante]
+
+        t._tipo[objetivos] = PERFECTA
+        t._inact[objetivos] = 0
+        self.perfectas_turno = np.concatenate([self.perfectas_turno, objetivos])
+        if objetivos.size:
+            g.eventos.anotar(g.turno_actual, PROPAGACION_LOTE, humano, a=objetivos.size)
+        return objetivos.size
+
+    def _resolver_combates(self):
+        g = self.gestor
+        t = g.tablero
+        prop, tipo, actuado = t._prop, t._tipo, t._actuado
+        vm = t.vecinos_matriz
+        prioridad = self.prioridad
+        mejor = self._mejor
+
+        # Pendientes: fichas que atacarán si no han actuado y tocan a un enemigo.
+        # Empiezan siendo la zona activa: la propagación no cambia propietarios.
+        pendientes = self.zona
+        ganadores = []
+        combates = 0
+        while pendientes.size:
+            vecinos = vm.take(pendientes, axis=1)
+            vec_prop = t._prop_r[vecinos]
+            enemigos = vec_prop != prop[pendientes]
+            enemigos &= vec_prop >= 0
+            columnas = (enemigos.any(axis=0) & ~actuado[pendientes]).nonzero()[0]
+            if columnas.size == 0:
+                break
+            a = pendientes[columnas]
+            o = vecinos[self._elegir_direccion(enemigos)[columnas], columnas]
+
+            # Cada celda entra en un solo combate por ronda: el de mayor prioridad del
+            # atacante entre los que la tocan. Los demás atacantes siguen pendientes.
+            p = prioridad[a]
+            celdas = np.concatenate((a, o))
+            p_celdas = np.concatenate((p, p))
+            mejor[celdas] = -1.0
+            np.maximum.at(mejor, celdas, p_celdas)
+            libre = mejor[celdas] == p_celdas
+            conserva = libre[:a.size] & libre[a.size:]
+            esperan = a[~conserva]
+            a, o, p = a[conserva], o[conserva], p[conserva]
+            actuado[a] = True
+            actuado[o] = True
+            combates += a.size
+
+            # (los códigos de tipo son int8: take indexa las tablas sin convertirlos)
+            u = self.rng.random(a.size)
+            pareja = tipo[a] * len(DADOS_COMBATE) + tipo[o]
+            gana_a = u < PROB_GANA.take(pareja)
+            decidido = u < PROB_DECIDIDO.take(pareja)
+            ganador = np.where(gana_a, a, o)[decidido]
+            perdedor = np.where(gana_a, o, a)[decidido]
+            jugador_ganador = prop[ganador]
+            jugador_perdedor = prop[perdedor]
+            prop[perdedor] = jugador_ganador
+            tipo[perdedor] = TIPO_VENCEDOR.take(tipo[ganador])
+            t._accion[ganador] = True
+            t._accion[perdedor] = True
+            ganadores.append(jugador_ganador)
+
+            # Aliadas de la celda capturada: ahora tocan a un enemigo y atacan en otra
+            # ronda si su turno iba después del combate. Las demás vecinas que no han
+            # actuado ya estaban pendientes (la celda ya les era enemiga) o siguen sin
+            # enemigos; las que ya actuaron las descarta la ronda siguiente.
+            expuestas = vm.take(perdedor, axis=1)
+            expuestas = expuestas[(t._prop_r[expuestas] == jugador_perdedor) & (prioridad[expuestas] < p[decidido])]
+            pendientes = self._sin_repetir(np.concatenate((esperan, expuestas)))
+
+        if ganadores:
+            self._sumar_estadistica('victorias_combate', np.concatenate(ganadores))
+        return combates
+
+    def _reemplazo_tactico(self):
+        g = self.gestor
+        t = g.tablero
+        humano = g.jugador_humano
+        prop, tipo = t._prop, t._tipo
+        prioridad = self.prioridad
+
+        # Perfectas del inicio del turno y propagadas; los combates solo pueden quitar alguna
+        fuentes = self.perfectas_turno
+        fuentes = fuentes[(prop[fuentes] == humano) & (tipo[fuentes] == PERFECTA) & ~t._actuado[fuentes]]
+        if fuentes.size == 0:
+            return 0
+        # Aliadas que aún no han actuado y cuyo turno va después del de la perfecta
+        vecinos = t.vecinos_matriz.take(fuentes, axis=1)
+        candidatas = ((t._prop_r[vecinos] == humano) & ALIADA_POR_TIPO.take(t._tipo_r[vecinos])
+                      & ~t._actuado_r[vecinos] & (prioridad[vecinos] < prioridad[fuentes]))
+
+        columnas = candidatas.any(axis=0).nonzero()[0]
+        if columnas.size == 0:
+            return 0
+        fuentes = fuentes[columnas]
+        aliadas = vecinos[self._elegir_direccion(candidatas.take(columnas, axis=1)), columnas]
+        conserva = self._sin_conflictos(fuentes, aliadas)
+        fuentes, aliadas = fuentes[conserva], aliadas[conserva]
+
+        # Intercambio: la perfecta pasa a la celda de la aliada y viceversa. Las dos son
+        # del humano y ninguna ha actuado (ni es nueva), así que solo cambian tipo e inactividad.
+        tipo[fuentes] = tipo[aliadas]
+        tipo[aliadas] = PERFECTA
+        t._inact[fuentes], t._inact[aliadas] = t._inact[aliadas], t._inact[fuentes]
+        t._actuado[fuentes] = True
+        t._actuado[aliadas] = True
+        t._accion[aliadas] = True
+        g.estadisticas[g.player_colors_base[humano]]['movimientos'] += fuentes.size
+
+        # Asalto inmediato desde la nueva posición
+        vecinos = t.vecinos_matriz.take(aliadas, axis=1)
+        vec_prop = t._prop_r[vecinos]
+        enemigos = (vec_prop >= 0) & (vec_prop != humano)
+        columnas = enemigos.any(axis=0).nonzero()[0]
+        if columnas.size:
+            atacantes = aliadas[columnas]
+            rivales = vecinos[self._elegir_direccion(enemigos.take(columnas, axis=1)), columnas]
+            conserva = self._sin_conflictos(atacantes, rivales)
+            rivales = rivales[conserva]
+
+            # Contra no perfectas se gana siempre; PERF vs PERF se tira 5 contra 5
+            tipo_rival = tipo[rivales]
+            gana = self.rng.random(rivales.size) < PROB_GANA[PERFECTA].take(tipo_rival)
+            t._actuado[rivales[(tipo_rival != PERFECTA) | ~gana]] = True
+            capturadas = rivales[gana]
+            prop[capturadas] = humano
+            tipo[capturadas] = PESADA
+            g.estadisticas[g.player_colors_base[humano]]['victorias_combate'] += capturadas.size
+
+        return fuentes.size
+
+    def _mover_y_multiplicar(self):
+        g = self.gestor
+        t = g.tablero
+        humano = g.jugador_humano
+        prop, tipo = t._prop, t._tipo
+        n = prop.size
+        rng = self.rng
+
+        if g.influencia is not None:
+            g.influencia.actualizar()
+        # Solo las fichas de la zona activa pueden tener una vecina libre
+        zona = self.zona
+        vecinos = t.vecinos_matriz.take(zona, axis=1)
+        libres = t._prop_r[vecinos] == VACIO
+        activas = libres.any(axis=0) & ~t._actuado[zona]
+        ocupadas = prop >= 0
+        t._actuado |= ocupadas
+
+        # Probabilidad de mover: igual que en el motor secuencial, con los conteos al inicio de la fase
+        conteo = np.bincount(prop[ocupadas], minlength=len(g.player_colors_base))
+        prop_zona, tipo_zona = prop[zona], tipo[zona]
+        probabilidad = g.probabilidad_combate + conteo.take(prop_zona) / n
+        mueve = activas & MOVIL_POR_TIPO.take(tipo_zona) & (rng.random(zona.size) < probabilidad)
+        multiplica = activas & ~mueve
+
+        # --- Movimientos: una celda libre al azar o la mejor por influencia (las perfectas humanas prefieren brecha) ---
+        columnas_mov = mueve.nonzero()[0]
+        moviles = zona[columnas_mov]
+        vecinos_mov = vecinos.take(columnas_mov, axis=1)
+        candidatas = libres.take(columnas_mov, axis=1)
+        if humano is not None:
+            perf_humana = (prop_zona[columnas_mov] == humano) & (tipo_zona[columnas_mov] == PERFECTA)
+            if perf_humana.any():
+                # Brecha: celda libre junto a una ficha de otro jugador
+                columnas = perf_humana.nonzero()[0]
+                vecinas = vecinos_mov.take(columnas, axis=1)
+                if g.influencia is not None:
+                    junto_enemigo = np.append(g.influencia.enemigos[humano] > 0, False)[vecinas]
+                else:
+                    segundas = t._prop_r[t.vecinos_matriz.take(np.minimum(vecinas, n - 1), axis=1)]
+                    junto_enemigo = ((segundas >= 0) & (segundas != humano)).any(axis=0)
+                brecha = candidatas.take(columnas, axis=1) & junto_enemigo
+                tiene = brecha.any(axis=0)
+                candidatas[:, columnas[tiene]] = brecha[:, tiene]
+        d = self._elegir_direccion(candidatas, self._puntuacion_destinos(prop_zona[columnas_mov], vecinos_mov))
+        destinos_mov = vecinos_mov[d, np.arange(moviles.size)]
+
+        # --- Multiplicaciones: rama al azar y k posiciones libres distintas ---
+        columnas_mul = multiplica.nonzero()[0]
+        fuentes = zona[columnas_mul]
+        vecinos_mul = vecinos.take(columnas_mul, axis=1)
+        tipo_f = tipo_zona[columnas_mul]
+        humana = prop_zona[columnas_mul] == humano
+        u = rng.random(fuentes.size)
+        cupo = self._cupo_perfectas() if humano is not None else 0
+
+        categoria = np.where(tipo_f == LIGERA, 0, np.where(tipo_f == PESADA, 2 - humana, 3))
+        ramas = RAMAS_CON_CUPO if cupo > 0 else RAMAS_SIN_CUPO
+        rama = ramas[categoria, (u >= UMBRAL_CATEGORIA[categoria]).astype(np.intp)]
+
+        libres = libres.take(columnas_mul, axis=1)
+        claves = self._claves_destino(libres, self._puntuacion_destinos(prop_zona[columnas_mul], vecinos_mul))
+        rango = claves.argsort(axis=0).argsort(axis=0)
+        elegida = (rango < GENERADAS_RAMA[rama]) & libres
+        dir_gen, col_gen = np.nonzero(elegida)
+        fuentes_gen = fuentes[col_gen]
+        destinos_gen = vecinos_mul[dir_gen, col_gen]
+        tipos_gen = TIPOS_RAMA[rama[col_gen], rango[dir_gen, col_gen]]
+
+        # --- Resolución conjunta: cada celda libre la ocupa la reclamación de mayor prioridad ---
+        conserva = self._sin_conflictos(np.concatenate([moviles, fuentes_gen]), np.concatenate([destinos_mov, destinos_gen]))
+        mov_ok = conserva[:moviles.size]
+        gen_ok = conserva[moviles.size:]
+
+        fuentes_gen, destinos_gen, tipos_gen = fuentes_gen[gen_ok], destinos_gen[gen_ok], tipos_gen[gen_ok]
+
+        # Límite de perfectas: las que sobran nacen como Fuertes
+        nuevas_perf = (tipos_gen == PERFECTA).nonzero()[0]
+        if nuevas_perf.size > cupo:
+            orden = np.argsort(-self.prioridad[fuentes_gen[nuevas_perf]])
+            tipos_gen[nuevas_perf[orden[cupo:]]] = PESADA
+
+        prop[destinos_gen] = prop[fuentes_gen]
+        tipo[destinos_gen] = tipos_gen
+        t._inact[destinos_gen] = 0
+        t._actuado[destinos_gen] = True
+        t._accion[destinos_gen] = False
+        t._nueva[destinos_gen] = True
+        multiplicadoras = fuentes[np.bincount(col_gen[gen_ok], minlength=fuentes.size) > 0]
+        t._accion[multiplicadoras] = True
+
+        origenes, destinos = moviles[mov_ok], destinos_mov[mov_ok]
+        for plano in (prop, tipo, t._inact, t._nueva):
+            plano[destinos] = plano[origenes]
+        prop[origenes] = VACIO
+        tipo[origenes] = TIPO_VACIO
+        t._inact[origenes] = 0
+        t._nueva[origenes] = False
+        t._actuado[origenes] = False
+        t._accion[origenes] = False
+        t._actuado[destinos] = True
+        t._accion[destinos] = True
+
+        self._sumar_estadistica('multiplicaciones', prop[multiplicadoras])
+        self._sumar_estadistica('movimientos', prop[destinos])
+        return multiplicadoras.size, destinos.size
@@ -0,0 +1,94 @@
+# perfilador.py
+# Medición opcional del tiempo de cada fase de procesar_turno.
+#
+# Los motores de turnos solo llaman al perfilador si el gestor tiene uno
+# (gestor.perfilador); desactivado, el coste es una comprobación "is not None"
+# por fase (por ficha en el motor secuencial). Cada turno se guarda como una
+# fila con el tiempo y los elementos de cada fase: las últimas filas dan el
+# desglose medio que se muestra en pantalla y todas se pueden volcar a un CSV.
+
+import csv
+import time
+from collections import deque
+
+import numpy as np
+
+FASE_PROPAGACION = 0    # propagación de perfección
+FASE_COMBATE = 1        # combates
+FASE_REEMPLAZO = 2      # reemplazo táctico y asalto
+FASE_ACCION = 3         # mover o multiplicar
+FASE_INACTIVIDAD = 4    # inactividad y ascensos
+NOMBRES_FASE = ("propagacion", "combate", "reemplazo", "accion", "inactividad")
+NUM_FASES = len(NOMBRES_FASE)
+
+
+class PerfiladorTurnos:
+    def __init__(self, ruta_csv=None, turnos_media=60):
+        self.ruta_csv = ruta_csv
+        self.filas = deque(maxlen=turnos_media)   # (total, tiempos, elementos) de los últimos turnos
+        self.turno = 0
+        self.tiempos = [0.0] * NUM_FASES
+        self.elementos = [0] * NUM_FASES
+        self._inicio = 0.0
+        self._ultimo = 0.0
+        self._archivo = None
+        self._csv = None
+
+    def iniciar_turno(self, turno):
+        self.turno = turno
+        self.tiempos = [0.0] * NUM_FASES
+        self.elementos = [0] * NUM_FASES
+        self._inicio = self._ultimo = time.perf_counter()
+
+    def reanudar(self):
+        """Empieza a contar desde ahora (el tiempo desde la última marca no se asigna a ninguna fase)."""
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, fase, elementos=1):
+        """Asigna a la fase el tiempo desde la última marca y suma sus elementos."""
+        ahora = time.perf_counter()
+        self.tiempos[fase] += ahora - self._ultimo
+        self.elementos[fase] += elementos
+        self._ultimo = ahora
+
+    def terminar_turno(self):
+        total = time.perf_counter() - self._inicio
+        self.filas.append((total, self.tiempos, self.elementos))
+        if self.ruta_csv is not None:
+            self._escribir_fila(total)
+
+    def _escribir_fila(self, total):
+        if self._csv is None:
+            self._archivo = open(self.ruta_csv, "w", newline="")
+            self._csv = csv.writer(self._archivo)
+            self._csv.writerow(
+                ["turno", "total_ms"]
+                + [f"{nombre}_ms" for nombre in NOMBRES_FASE]
+                + [f"{nombre}_n" for nombre in NOMBRES_FASE]
+                + ["otros_ms"]
+            )
+        self._csv.writerow(
+            [self.turno, f"{total * 1000:.3f}"]
+            + [f"{s * 1000:.3f}" for s in self.tiempos]
+            + self.elementos
+            + [f"{(total - sum(self.tiempos)) * 1000:.3f}"]
+        )
+
+    def resumen(self):
+        """
+        Media de los últimos turnos: matriz (NUM_FASES + 1, 2) con los ms y los
+        elementos de cada fase; la última fila es el turno completo (ms, turnos medidos).
+        """
+        resumen = np.zeros((NUM_FASES + 1, 2))
+        if self.filas:
+            totales, tiempos, elementos = zip(*self.filas)
+            resumen[:NUM_FASES, 0] = np.mean(tiempos, axis=0) * 1000
+            resumen[:NUM_FASES, 1] = np.mean(elementos, axis=0)
+            resumen[NUM_FASES] = (np.mean(totales) * 1000, len(self.filas))
+        return resumen
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+            self._csv = None
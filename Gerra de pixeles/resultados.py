@@ -0,0 +1,63 @@
+# resultados.py
+# Registro acumulado de resultados de partidas de la Guerra de Píxeles.
+#
+# Cada partida es una fila plana (ver GestorJuego.resultado_partida): datos de la
+# partida y, por cada jugador, sus contadores finales y estadísticas con el
+# prefijo j1_, j2_... Las filas se añaden a un único archivo CSV (si la ruta
+# acaba en .csv) o JSONL (una fila JSON por línea), sin sobrescribir las
+# partidas anteriores.
+
+import csv
+import json
+import os
+
+CAMPOS_PARTIDA = (
+    "semilla", "motor", "oponentes", "probabilidad_combate", "max_perfectas",
+    "turnos", "segundos", "resultado", "ganador_jugador", "ganador_nombre",
+)
+CAMPOS_JUGADOR = (
+    "nombre", "total", "ligeras", "pesadas", "perfectas",
+    "multiplicaciones", "movimientos", "victorias_combate",
+)
+MAX_JUGADORES = 8   # tamaño de la paleta de colores
+
+# Valores de "resultado"
+VICTORIA = "victoria"
+EMPATE = "empate"
+SIN_GANADOR = "sin_ganador"     # se alcanzó el límite de turnos
+
+
+def campos(max_jugadores=MAX_JUGADORES):
+    """Columnas del CSV: las de la partida y las de cada hueco de jugador."""
+    return CAMPOS_PARTIDA + tuple(
+        f"j{k}_{campo}" for k in range(1, max_jugadores + 1) for campo in CAMPOS_JUGADOR
+    )
+
+
+class RegistroResultados:
+    def __init__(self, ruta, anexar=True):
+        self.ruta = ruta
+        self.formato = "csv" if ruta.lower().endswith(".csv") else "jsonl"
+        nuevo = not anexar or not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        self._archivo = open(ruta, "a" if anexar else "w", newline="", encoding="utf-8")
+        if self.formato == "csv":
+            self._csv = csv.DictWriter(self._archivo, fieldnames=campos(), restval="")
+            if nuevo:
+                self._csv.writeheader()
+
+    def escribir(self, fila):
+        if self.formato == "csv":
+            self._csv.writerow(fila)
+        else:
+            self._archivo.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        # Cada fila queda en disco al momento: un torneo interrumpido conserva lo jugado
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,281 @@
+# simulacion_paralela.py
+# Simulación de la Guerra de Píxeles en un proceso aparte.
+#
+# El proceso trabajador tiene el GestorJuego real y juega los turnos a la velocidad
+# pedida. Tras cada turno publica una instantánea compacta del tablero (propietario,
+# tipo e inactividad de cada celda, contadores, estadísticas, territorios, últimos
+# mensajes y, si se está perfilando, el desglose medio por fases) en memoria compartida con
+# doble búfer: escribe en la ranura trasera y después, con el cerrojo tomado, la
+# marca como publicada. La interfaz copia la última instantánea publicada en un
+# GestorJuego "espejo" que solo sirve para dibujar, así que la entrada del usuario
+# no espera nunca a que termine un turno.
+
+import multiprocessing
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from perfilador import PerfiladorTurnos, NUM_FASES
+
+# Claves de estadísticas que viajan en la instantánea (en este orden)
+CLAVES_ESTADISTICAS = ('multiplicaciones', 'movimientos', 'victorias_combate')
+BYTES_MENSAJES = 2048                 # mensajes del turno en UTF-8, separados por saltos de línea
+ESPERA_EN_PAUSA = 0.1                 # cada cuánto revisa el trabajador el tiempo límite en pausa
+
+
+class BuferInstantaneas:
+    """Dos ranuras de instantánea sobre un búfer de memoria compartida."""
+
+    def __init__(self, bufer, num_celdas, num_jugadores):
+        self.tipo = self.tipo_instantanea(num_celdas, num_jugadores)
+        # Cabecera: [ranura publicada, número de publicaciones]
+        self.cabecera = np.ndarray((2,), dtype=np.int64, buffer=bufer)
+        self.ranuras = np.ndarray((2,), dtype=self.tipo, buffer=bufer, offset=self.cabecera.nbytes)
+
+    @staticmethod
+    def tipo_instantanea(num_celdas, num_jugadores):
+        return np.dtype([
+            ('turno', np.int64),
+            ('tiempo_inicio', np.float64),
+            ('conteos', np.int64, (num_jugadores, 4)),
+            ('estadisticas', np.int64, (num_jugadores, len(CLAVES_ESTADISTICAS))),
+            ('territorios', np.int64, (num_jugadores, 2)),   # islas y tamaño de la mayor
+            ('propietario', np.int8, num_celdas),
+            ('tipo', np.int8, num_celdas),
+            ('inactividad', np.uint8, num_celdas),   # solo se dibujan dígitos pequeños
+            ('mensajes', f'S{BYTES_MENSAJES}'),
+            ('perfil_activo', np.bool_),
+            ('perfil', np.float64, (NUM_FASES + 1, 2)),   # PerfiladorTurnos.resumen()
+        ])
+
+    @classmethod
+    def tamano(cls, num_celdas, num_jugadores):
+        return 2 * np.dtype(np.int64).itemsize + 2 * cls.tipo_instantanea(num_celdas, num_jugadores).itemsize
+
+    @property
+    def secuencia(self):
+        return int(self.cabecera[1])
+
+    def publicar(self, gestor, cerrojo):
+        """Escribe el estado del gestor en la ranura trasera y la publica."""
+        t = gestor.tablero
+        trasera = 1 - int(self.cabecera[0])
+        ranura = self.ranuras[trasera]
+        ranura['turno'] = gestor.turno_actual
+        ranura['tiempo_inicio'] = gestor.tiempo_inicio
+        ranura['conteos'] = t.conteos
+        ranura['estadisticas'] = [[gestor.estadisticas[color][clave] for clave in CLAVES_ESTADISTICAS] for color in gestor.player_colors_base]
+        ranura['territorios'] = list(zip(t.territorios.islas, t.territorios.mayor))
+        ranura['propietario'] = t._prop
+        ranura['tipo'] = t._tipo
+        ranura['inactividad'] = np.minimum(t._inact, 255)
+        ranura['mensajes'] = "\n".join(gestor.textos_mensajes()).encode("utf-8")[:BYTES_MENSAJES]
+        ranura['perfil_activo'] = gestor.perfilador is not None
+        if gestor.perfilador is not None:
+            ranura['perfil'] = gestor.perfilador.resumen()
+        with cerrojo:
+            self.cabecera[0] = trasera
+            self.cabecera[1] += 1
+
+    def leer(self, gestor, cerrojo):
+        """
+        Copia la última instantánea publicada en el gestor espejo.
+        Devuelve el desglose del perfilador, o None si no se está perfilando.
+        """
+        with cerrojo:
+            ranura = self.ranuras[int(self.cabecera[0])].copy()
+        t = gestor.tablero
+        gestor.turno_actual = int(ranura['turno'])
+        gestor.tiempo_inicio = float(ranura['tiempo_inicio'])
+        t.conteos = ranura['conteos'].tolist()
+        for color, valores in zip(gestor.player_colors_base, ranura['estadisticas'].tolist()):
+            gestor.estadisticas[color].update(zip(CLAVES_ESTADISTICAS, valores))
+        t._prop[:] = ranura['propietario']
+        t._tipo[:] = ranura['tipo']
+        t._inact[:] = ranura['inactividad']
+        t.territorios.fijar(*ranura['territorios'].T.tolist())
+        gestor.mensajes.clear()
+        mensajes = ranura['mensajes'].decode("utf-8", errors="ignore")
+        if mensajes:
+            gestor.mensajes.extend(mensajes.split("\n"))
+        return ranura['perfil'] if ranura['perfil_activo'] else None
+
+
+def _ejecutar_trabajador(argumentos, partida, historial, diario, nombre_memoria, cerrojo, conexion):
+    """
+    Bucle del proceso trabajador: atiende órdenes de la interfaz y juega turnos.
+    Si se da la ruta de una partida guardada, la sigue en lugar de empezar una nueva;
+    con la ruta de un historial, registra en él el propietario de cada celda, y con
+    la de un diario, la partida. Un error se envía a la interfaz como ("error", traza).
+    """
+    # Import diferido: juego_fichas importa este módulo
+    import juego_fichas as jf
+
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    gestor = None
+    perfilador = None
+    try:
+        if partida is not None:
+            gestor = jf.GestorJuego.cargar_partida(partida)
+        else:
+            gestor = jf.GestorJuego(**argumentos)
+            gestor.colocar_fichas_iniciales()
+        if diario is not None:
+            gestor.iniciar_diario(diario)
+        if historial is not None:
+            gestor.iniciar_historial(historial)
+        t = gestor.tablero
+        bufer = BuferInstantaneas(memoria.buf, t.filas * t.columnas, t.num_jugadores)
+        bufer.publicar(gestor, cerrojo)
+
+        velocidad = 1
+        pausado = False
+        pasos = 0
+        ultimo_turno = time.perf_counter()
+        ganador = None
+        while ganador is None:
+            # Tiempo hasta el próximo turno según la velocidad
+            if pausado and not pasos:
+                espera = ESPERA_EN_PAUSA
+            elif pausado or velocidad in (jf.VELOCIDAD_TURBO, jf.VELOCIDAD_HASTA_FIN):
+                espera = 0
+            else:
+                intervalo = jf.BASE_TIEMPO_ENTRE_TURNOS / 1000 / velocidad
+                espera = max(0, ultimo_turno + intervalo - time.perf_counter())
+
+            if conexion.poll(espera):
+                orden, valor = conexion.recv()
+                if orden == "parar":
+                    return
+                elif orden == "velocidad":
+                    velocidad, pausado = valor, False
+                elif orden == "pausa":
+                    pausado = valor
+                elif orden == "paso" and pausado:
+                    pasos += 1
+                elif orden == "perfilar":
+                    if valor and perfilador is None:
+                        perfilador = PerfiladorTurnos(jf.ARCHIVO_PERFIL_CSV)
+                    gestor.perfilador = perfilador if valor else None
+                    bufer.publicar(gestor, cerrojo)
+                elif orden == "guardar":
+                    gestor.guardar_partida(valor)
+                    gestor.agregar_mensaje(f"💾 Partida guardada en {valor}")
+                    bufer.publicar(gestor, cerrojo)
+                continue
+
+            if gestor.tiempo_agotado():
+                ganador = gestor.verificar_victoria()
+                break
+            if pausado and not pasos:
+                continue
+            if pausado:
+                pasos -= 1
+
+            ultimo_turno = time.perf_counter()
+            ganador = gestor.procesar_turno()
+            # En modo "hasta el final" solo se publica el tablero final
+            if velocidad != jf.VELOCIDAD_HASTA_FIN:
+                bufer.publicar(gestor, cerrojo)
+
+        bufer.publicar(gestor, cerrojo)
+        conexion.send(("fin", ganador))
+        # Esperar a que la interfaz lea el final y pida parar
+        while conexion.recv()[0] != "parar":
+            pass
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass # La interfaz se cerró
+    except Exception:
+        try:
+            conexion.send(("error", traceback.format_exc()))
+        except (BrokenPipeError, OSError):
+            pass
+    finally:
+        if perfilador is not None:
+            perfilador.cerrar()
+        if gestor is not None:
+            gestor.cerrar_diario()
+            gestor.cerrar_historial()
+        memoria.close()
+
+
+class SimulacionEnSegundoPlano:
+    """
+    Lado de la interfaz: lanza el proceso trabajador, le envía órdenes y vuelca la
+    última instantánea publicada en el gestor espejo. Con `partida` (ruta de una
+    partida guardada) el trabajador la carga en lugar de crear una con `argumentos`;
+    con `historial`, registra en esa ruta el propietario de cada celda en cada turno,
+    y con `diario`, la partida para reproducirla después.
+    """
+
+    def __init__(self, gestor_espejo, argumentos, partida=None, historial=None, diario=None):
+        self.gestor = gestor_espejo
+        self.ganador = None
+        self.terminada = False
+        self.error = None           # traza del trabajador si terminó por un error
+        self.perfil = None          # desglose del perfilador de la última instantánea
+        self._secuencia = 0
+
+        t = gestor_espejo.tablero
+        num_celdas = t.filas * t.columnas
+        self._memoria = shared_memory.SharedMemory(create=True, size=BuferInstantaneas.tamano(num_celdas, t.num_jugadores))
+        self._bufer = BuferInstantaneas(self._memoria.buf, num_celdas, t.num_jugadores)
+        self._bufer.cabecera[:] = 0
+
+        # "spawn": el proceso hijo no hereda el estado de SDL/pygame de la interfaz
+        contexto = multiprocessing.get_context("spawn")
+        self._cerrojo = contexto.Lock()
+        self._conexion, conexion_trabajador = contexto.Pipe()
+        self._proceso = contexto.Process(
+            target=_ejecutar_trabajador,
+            args=(argumentos, partida, historial, diario, self._memoria.name, self._cerrojo, conexion_trabajador),
+            daemon=True,
+        )
+        self._proceso.start()
+        conexion_trabajador.close()
+
+    def enviar(self, orden, valor=None):
+        """Órdenes: ("velocidad", v), ("pausa", bool), ("paso",), ("perfilar", bool), ("guardar", ruta) y ("parar",)."""
+        try:
+            self._conexion.send((orden, valor))
+        except (BrokenPipeError, OSError):
+            pass
+
+    def actualizar(self):
+        """
+        Trae la última instantánea (si hay una nueva) y el aviso de fin o de error.
+        Devuelve True si hubo cambios.
+        """
+        if not self.terminada:
+            try:
+                if self._conexion.poll():
+                    orden, valor = self._conexion.recv()
+                    if orden == "fin":
+                        self.ganador = valor
+                    elif orden == "error":
+                        self.error = valor
+                    self.terminada = True
+            except EOFError:
+                # El trabajador murió sin avisar (p. ej. lo mató el sistema)
+                self.error = f"El proceso de la simulación terminó (código {self._proceso.exitcode})"
+                self.terminada = True
+
+        secuencia = self._bufer.secuencia
+        if secuencia == self._secuencia:
+            return False
+        self._secuencia = secuencia
+        self.perfil = self._bufer.leer(self.gestor, self._cerrojo)
+        return True
+
+    def detener(self):
+        self.enviar("parar")
+        self._proceso.join(timeout=2)
+        if self._proceso.is_alive():
+            self._proceso.terminate()
+        self._conexion.close()
+        # Las vistas de NumPy deben soltarse antes de cerrar la memoria compartida
+        del self._bufer
+        self._memoria.close()
+        self._memoria.unlink()
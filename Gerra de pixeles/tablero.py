@@ -0,0 +1,511 @@
+# tablero.py
+# Estado del tablero de la Guerra de Píxeles en matrices densas de NumPy.
+#
+# Cada celda se identifica por su índice plano (fila * columnas + columna).
+# Las matrices 2D (FILAS x COLUMNAS) tienen además vistas planas (prefijo _)
+# que el motor de turnos usa para indexar celdas y vecinos directamente.
+# Para recorrer tableros grandes por partes, el tablero se divide además en
+# trozos de TAMANO_TROZO x TAMANO_TROZO celdas (ver limites_trozo).
+
+from functools import cached_property
+
+import numpy as np
+
+# --- CÓDIGOS DE CELDA ---
+VACIO = -1          # propietario de una celda sin ficha
+FUERA = -2          # relleno para vecinos fuera del tablero (vista matricial)
+
+TIPO_VACIO = 0
+LIGERA = 1
+PESADA = 2
+PERFECTA = 3
+
+NOMBRES_TIPO = ("", "ligera", "pesada", "perfecta")
+CODIGOS_TIPO = {"ligera": LIGERA, "pesada": PESADA, "perfecta": PERFECTA}
+
+# Atributos derivados del tipo (indexados por código de tipo)
+DADOS_COMBATE = (0, 3, 5, 5)
+PUEDE_MOVER = (False, True, False, True)
+
+# Orden de vecinos del juego original: derecha, izquierda, abajo, arriba
+DIRECCIONES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+TAMANO_TROZO = 32   # lado en celdas de cada trozo del tablero
+
+PERIODO_TERRITORIOS = 10   # turnos entre reconstrucciones de los territorios aproximados
+
+
+class TerritoriosConexos:
+    """
+    Territorios (islas de fichas de un mismo jugador unidas por vecinos ortogonales)
+    con unión-búsqueda incremental: islas[j] es el número de islas de j y mayor[j]
+    el tamaño de la mayor.
+
+    Cada ficha que llega a una celda (colocar, mover, convertir) es un nodo nuevo
+    que se une a los de sus vecinas del mismo jugador. Una ficha que se va deja su
+    nodo en el bosque (sigue uniendo a las demás) y resta uno a la isla; si la isla
+    no queda vacía puede haberse partido, así que los valores pasan a ser
+    aproximados hasta la siguiente reconstrucción vectorial (revisar, cada
+    PERIODO_TERRITORIOS turnos). Las mutaciones en bloque (reconstruir_indices)
+    dejan los valores sin actualizar hasta entonces.
+    """
+
+    def __init__(self, tablero):
+        self.tablero = tablero
+        self.islas = [0] * tablero.num_jugadores
+        self.mayor = [0] * tablero.num_jugadores
+        self.aproximado = False   # una isla puede haberse partido
+        self.invalido = False     # el tablero cambió sin pasar por agregar/retirar
+        self._nodo = [-1] * (tablero.filas * tablero.columnas)   # nodo de la ficha de cada celda (-1 = vacía)
+        self._padre = []
+        self._vivas = []          # fichas de cada isla (válido en las raíces)
+        self._bosque = None       # bosque de la última reconstrucción, aún en NumPy
+
+    def _raiz(self, k):
+        padre = self._padre
+        while padre[k] != k:
+            padre[k] = padre[padre[k]]
+            k = padre[k]
+        return k
+
+    def agregar(self, i, jugador):
+        """La celda i pasa a tener una ficha del jugador."""
+        if self.invalido:
+            return
+        if self._bosque is not None:
+            self._desplegar()
+        padre, vivas, nodo, prop = self._padre, self._vivas, self._nodo, self.tablero._prop
+        raiz = nodo[i] = len(padre)
+        padre.append(raiz)
+        vivas.append(1)
+        self.islas[jugador] += 1
+        for v in self.tablero.vecinos[i]:
+            if prop[v] == jugador and nodo[v] >= 0:
+                otra = self._raiz(nodo[v])
+                if otra != raiz:
+                    # Unión por tamaño: la isla pequeña cuelga de la grande
+                    if vivas[otra] > vivas[raiz]:
+                        raiz, otra = otra, raiz
+                    padre[otra] = raiz
+                    vivas[raiz] += vivas[otra]
+                    self.islas[jugador] -= 1
+        if vivas[raiz] > self.mayor[jugador]:
+            self.mayor[jugador] = vivas[raiz]
+
+    def retirar(self, i, jugador):
+        """La ficha del jugador deja la celda i."""
+        if self.invalido:
+            return
+        if self._bosque is not None:
+            self._desplegar()
+        raiz = self._raiz(self._nodo[i])
+        self._nodo[i] = -1
+        self._vivas[raiz] -= 1
+        if self._vivas[raiz] == 0:
+            # Isla de una sola ficha: desaparece y la mayor solo cambia si era la última
+            self.islas[jugador] -= 1
+            if self.islas[jugador] == 0:
+                self.mayor[jugador] = 0
+        else:
+            self.aproximado = True
+
+    def invalidar(self):
+        self.invalido = True
+
+    def revisar(self, turno):
+        """Reconstrucción periódica (fin de turno) si los valores no son exactos."""
+        if (self.invalido or self.aproximado) and turno % PERIODO_TERRITORIOS == 0:
+            self.reconstruir()
+
+    @cached_property
+    def _pares(self):
+        """Todos los pares de celdas vecinas (derecha y abajo) del tablero."""
+        vecinos = self.tablero.vecinos_matriz
+        n = vecinos.shape[1]
+        a = np.concatenate([np.flatnonzero(vecinos[d] != n) for d in (0, 2)])
+        b = np.concatenate([vecinos[d][vecinos[d] != n] for d in (0, 2)])
+        return a, b
+
+    def reconstruir(self):
+        """Etiqueta las islas de todo el tablero con NumPy y reinicia el bosque."""
+        t = self.tablero
+        prop = t._prop
+        n = prop.size
+        ocupadas = prop != VACIO
+
+        # Pares de vecinas (derecha y abajo) del mismo jugador
+        a, b = self._pares
+        unidas = ocupadas[a] & (prop[a] == prop[b])
+        a, b = a[unidas], b[unidas]
+
+        # Enganche de raíces a la menor de cada par y compresión de caminos, hasta que todo par comparta raíz
+        padre = np.arange(n)
+        while True:
+            ra, rb = padre[a], padre[b]
+            distintas = ra != rb
+            if not distintas.any():
+                break
+            np.minimum.at(padre, np.maximum(ra, rb)[distintas], np.minimum(ra, rb)[distintas])
+            while True:
+                abuelo = padre[padre]
+                if (abuelo == padre).all():
+                    break
+                padre = abuelo
+
+        vivas = np.bincount(padre[ocupadas], minlength=n)
+        raices = np.flatnonzero(ocupadas & (padre == np.arange(n)))
+        duenos = prop[raices].astype(np.intp)
+        mayor = np.zeros(t.num_jugadores, dtype=np.int64)
+        np.maximum.at(mayor, duenos, vivas[raices])
+        self.islas = np.bincount(duenos, minlength=t.num_jugadores).tolist()
+        self.mayor = mayor.tolist()
+
+        # Las listas del bosque solo se crean si llega otra mutación antes de invalidar
+        self._bosque = (np.where(ocupadas, padre, -1), padre, vivas)
+        self.aproximado = False
+        self.invalido = False
+
+    def _desplegar(self):
+        """Pasa a listas el bosque de la última reconstrucción."""
+        nodo, padre, vivas = self._bosque
+        self._nodo, self._padre, self._vivas = nodo.tolist(), padre.tolist(), vivas.tolist()
+        self._bosque = None
+
+    def fijar(self, islas, mayor):
+        """Valores calculados fuera (instantánea del proceso trabajador para el gestor espejo)."""
+        self.islas = list(islas)
+        self.mayor = list(mayor)
+        self.aproximado = False
+        self.invalido = True      # el bosque no corresponde a este tablero
+
+
+class Tablero:
+    def __init__(self, filas, columnas, num_jugadores):
+        self.filas = filas
+        self.columnas = columnas
+        self.num_jugadores = num_jugadores
+        forma = (filas, columnas)
+        n = filas * columnas
+
+        # Propietario, tipo y ha_actuado tienen una celda más al final (índice N, la
+        # celda de relleno de vecinos_matriz) con el valor de una vecina fuera del
+        # tablero: el motor por lotes lee las vecinas de cualquier celda sin copias.
+        # Las matrices 2D y las vistas planas solo abarcan las N celdas del tablero.
+        self._prop_r = np.full(n + 1, VACIO, dtype=np.int8)
+        self._prop_r[n] = FUERA
+        self._tipo_r = np.zeros(n + 1, dtype=np.int8)
+        self._actuado_r = np.zeros(n + 1, dtype=bool)
+        self._actuado_r[n] = True
+
+        self.propietario = self._prop_r[:n].reshape(forma)        # índice de jugador
+        self.tipo = self._tipo_r[:n].reshape(forma)               # código de tipo
+        self.inactividad = np.zeros(forma, dtype=np.int32)        # turnos sin actuar
+        self.ha_actuado = self._actuado_r[:n].reshape(forma)
+        self.realizo_accion = np.zeros(forma, dtype=bool)
+        self.nueva = np.zeros(forma, dtype=bool)                  # creada en este turno
+
+        # Vistas planas (comparten memoria con las matrices 2D)
+        self._prop = self._prop_r[:n]
+        self._tipo = self._tipo_r[:n]
+        self._inact = self.inactividad.reshape(-1)
+        self._actuado = self._actuado_r[:n]
+        self._accion = self.realizo_accion.reshape(-1)
+        self._nueva = self.nueva.reshape(-1)
+
+        # Contadores incrementales por jugador: conteos[j][0] es el total y
+        # conteos[j][tipo] el número de fichas de ese tipo. Se actualizan en
+        # cada mutación, así que leerlos es O(1).
+        self.conteos = [[0, 0, 0, 0] for _ in range(num_jugadores)]
+
+        # Fichas creadas en este turno por jugador (nueva = True). Las reglas
+        # originales no contaban las fichas nuevas hasta el final del turno:
+        # conteos[j][0] - creadas[j] es el total que ven las decisiones del turno.
+        self.creadas = [0] * num_jugadores
+
+        # Perfectas por jugador: perfectas[j] es el conjunto de celdas con una
+        # perfecta de j. La propagación de perfección recorre solo estas celdas.
+        self._perfectas = [set() for _ in range(num_jugadores)]
+
+        # Frontera activa: celdas ocupadas con algún vecino vacío o enemigo.
+        # entradas_frontera registra las celdas que entran en la frontera para
+        # que el motor de turnos pueda programarlas a mitad de turno.
+        # Tras reconstruir_indices, perfectas y frontera quedan pendientes (None) y
+        # se crean desde las matrices la primera vez que se leen: el motor por
+        # lotes no las usa y se ahorra crear los conjuntos en cada turno.
+        self._frontera = set()
+        self.entradas_frontera = []
+
+        # Trozos por fila y por columna (los del borde pueden ser más pequeños)
+        self.trozos_filas = -(-filas // TAMANO_TROZO)
+        self.trozos_columnas = -(-columnas // TAMANO_TROZO)
+
+        # Tabla de vecinos de cada celda en forma (4, N) para los motores vectoriales:
+        # los vecinos fuera del tablero apuntan a N, la celda de relleno de vecindad()
+        indices = np.arange(n).reshape(forma)
+        vecinos = np.full((len(DIRECCIONES),) + forma, n, dtype=np.intp)
+        for d, (dr, dc) in enumerate(DIRECCIONES):
+            # Celdas con vecino en esa dirección <- índices desplazados (dr, dc)
+            vecinos[d, max(0, -dr):filas - max(0, dr), max(0, -dc):columnas - max(0, dc)] = \
+                indices[max(0, dr):filas + min(0, dr), max(0, dc):columnas + min(0, dc)]
+        self.vecinos_matriz = vecinos.reshape(len(DIRECCIONES), n)
+
+        # Islas de cada jugador (unión-búsqueda incremental, ver TerritoriosConexos)
+        self.territorios = TerritoriosConexos(self)
+
+    @cached_property
+    def vecinos(self):
+        """
+        Vecinos ortogonales de cada celda como tuplas, para el motor secuencial.
+        Se crea la primera vez que se usa: en tableros grandes ocupa mucha memoria
+        y el motor por lotes no la necesita.
+        """
+        n = self.filas * self.columnas
+        return [tuple(v for v in fila if v != n) for fila in self.vecinos_matriz.T.tolist()]
+
+    @property
+    def perfectas(self):
+        if self._perfectas is None:
+            perfectas = np.flatnonzero(self._tipo == PERFECTA)
+            duenos = self._prop[perfectas]
+            self._perfectas = [set(perfectas[duenos == j].tolist()) for j in range(self.num_jugadores)]
+        return self._perfectas
+
+    @property
+    def frontera(self):
+        if self._frontera is None:
+            self._frontera = set(self.celdas_frontera().tolist())
+        return self._frontera
+
+    # --- CONVERSIÓN DE COORDENADAS ---
+
+    def indice(self, fila, columna):
+        return fila * self.columnas + columna
+
+    def posicion(self, i):
+        return divmod(i, self.columnas)
+
+    def limites_trozo(self, tf, tc):
+        """Celdas del trozo (tf, tc): (fila inicial, fila final, columna inicial, columna final), finales excluidas."""
+        return (
+            tf * TAMANO_TROZO, min(self.filas, (tf + 1) * TAMANO_TROZO),
+            tc * TAMANO_TROZO, min(self.columnas, (tc + 1) * TAMANO_TROZO),
+        )
+
+    # --- CONSULTAS ---
+
+    def celdas_ocupadas(self):
+        """Lista de índices planos con ficha."""
+        return np.flatnonzero(self._prop != VACIO).tolist()
+
+    def total_fichas(self):
+        return sum(conteo[0] for conteo in self.conteos)
+
+    def vecinos_libres(self, i):
+        prop = self._prop
+        return [v for v in self.vecinos[i] if prop[v] == VACIO]
+
+    def oponentes_adyacentes(self, i):
+        prop = self._prop
+        jugador = prop[i]
+        return [v for v in self.vecinos[i] if prop[v] != VACIO and prop[v] != jugador]
+
+    def vecindad(self, plano, relleno):
+        """Valores de un plano en las 4 celdas vecinas de cada celda: matriz (4, N)."""
+        return np.append(plano, relleno)[self.vecinos_matriz]
+
+    def es_frontera(self, i):
+        """Una celda ocupada está en la frontera si algún vecino está vacío o es enemigo."""
+        prop = self._prop
+        jugador = prop[i]
+        if jugador == VACIO:
+            return False
+        for v in self.vecinos[i]:
+            if prop[v] != jugador:
+                return True
+        return False
+
+    def es_posicion_brecha(self, i, jugador):
+        """Comprueba si la celda i es adyacente a una ficha de otro jugador."""
+        prop = self._prop
+        for v in self.vecinos[i]:
+            if prop[v] != VACIO and prop[v] != jugador:
+                return True
+        return False
+
+    def celdas_frontera(self):
+        """Celdas de la frontera activa calculadas desde las matrices, en orden."""
+        # Vecino distinto dentro del tablero, comparando la matriz con sus desplazamientos
+        prop = self.propietario
+        distinto = np.zeros(prop.shape, dtype=bool)
+        vertical = prop[1:] != prop[:-1]
+        distinto[1:] |= vertical
+        distinto[:-1] |= vertical
+        horizontal = prop[:, 1:] != prop[:, :-1]
+        distinto[:, 1:] |= horizontal
+        distinto[:, :-1] |= horizontal
+        distinto &= prop != VACIO
+        return distinto.reshape(-1).nonzero()[0]
+
+    def reconstruir_indices(self):
+        """
+        Recalcula los contadores desde las matrices tras una mutación en bloque y
+        deja perfectas y frontera pendientes hasta que se lean.
+        """
+        # Clave (jugador + 1, tipo): las celdas vacías caen en la primera fila, que se descarta
+        tipos = len(NOMBRES_TIPO)
+        claves = (self._prop + 1) * tipos + self._tipo
+        conteo = np.bincount(claves, minlength=(self.num_jugadores + 1) * tipos)[tipos:].reshape(-1, tipos)
+        # La columna TIPO_VACIO siempre es 0: pasa a ser el total
+        conteo[:, 0] = conteo.sum(axis=1)
+        self.conteos = conteo.tolist()
+        # Las fichas nuevas siempre ocupan su celda
+        self.creadas = np.bincount(self._prop[self._nueva], minlength=self.num_jugadores).tolist()
+
+        self._perfectas = None
+        self._frontera = None
+        self.entradas_frontera.clear()
+        self.territorios.invalidar()
+
+    # --- MUTACIONES ---
+    # Todo cambio de propietario, tipo o posición pasa por estos métodos.
+    # Las perfectas y la frontera pendientes (None) no se actualizan: se crearán
+    # desde las matrices, ya con el cambio, cuando se lean.
+
+    def iniciar_turno(self):
+        self.ha_actuado[:] = False
+        self.realizo_accion[:] = False
+        self.nueva[:] = False
+        self.creadas = [0] * self.num_jugadores
+        self.entradas_frontera.clear()
+
+    def _actualizar_frontera(self, i):
+        """Recalcula la pertenencia a la frontera de la celda i y de sus vecinas."""
+        frontera = self._frontera
+        if frontera is None:
+            return
+        for c in (i,) + self.vecinos[i]:
+            if self.es_frontera(c):
+                if c not in frontera:
+                    frontera.add(c)
+                    self.entradas_frontera.append(c)
+            else:
+                frontera.discard(c)
+
+    def colocar(self, i, jugador, tipo, inactividad=0, nueva=False):
+        """Coloca una ficha en la celda vacía i."""
+        conteo = self.conteos[jugador]
+        conteo[0] += 1
+        conteo[tipo] += 1
+        if tipo == PERFECTA and self._perfectas is not None:
+            self._perfectas[jugador].add(i)
+        if nueva:
+            self.creadas[jugador] += 1
+
+        self._prop[i] = jugador
+        self._tipo[i] = tipo
+        self._inact[i] = inactividad
+        self._actuado[i] = nueva
+        self._accion[i] = False
+        self._nueva[i] = nueva
+        self._actualizar_frontera(i)
+        self.territorios.agregar(i, jugador)
+
+    def quitar(self, i):
+        jugador = self._prop[i]
+        if jugador != VACIO:
+            conteo = self.conteos[jugador]
+            conteo[0] -= 1
+            conteo[self._tipo[i]] -= 1
+            if self._perfectas is not None:
+                self._perfectas[jugador].discard(i)
+            if self._nueva[i]:
+                self.creadas[jugador] -= 1
+            self.territorios.retirar(i, jugador)
+
+        self._prop[i] = VACIO
+        self._tipo[i] = TIPO_VACIO
+        self._inact[i] = 0
+        self._actuado[i] = False
+        self._accion[i] = False
+        self._nueva[i] = False
+        self._actualizar_frontera(i)
+
+    def mover(self, origen, destino):
+        """Mueve la ficha de origen a la celda vacía destino."""
+        if self._tipo[origen] == PERFECTA and self._perfectas is not None:
+            perfectas = self._perfectas[self._prop[origen]]
+            perfectas.discard(origen)
+            perfectas.add(destino)
+        for plano in (self._prop, self._tipo, self._inact, self._actuado, self._accion, self._nueva):
+            plano[destino] = plano[origen]
+
+        self._prop[origen] = VACIO
+        self._tipo[origen] = TIPO_VACIO
+        self._inact[origen] = 0
+        self._actuado[origen] = False
+        self._accion[origen] = False
+        self._nueva[origen] = False
+        self._actualizar_frontera(origen)
+        self._actualizar_frontera(destino)
+        self.territorios.agregar(destino, self._prop[destino])
+        self.territorios.retirar(origen, self._prop[destino])
+
+    def intercambiar(self, a, b):
+        """Intercambia dos fichas (con todo su estado) entre sus celdas."""
+        mismo_propietario = self._prop[a] == self._prop[b]
+        perfectas = self._perfectas
+        perfecta_a, perfecta_b = self._tipo[a] == PERFECTA, self._tipo[b] == PERFECTA
+        if perfectas is not None:
+            if perfecta_a:
+                perfectas[self._prop[a]].discard(a)
+            if perfecta_b:
+                perfectas[self._prop[b]].discard(b)
+            if perfecta_a:
+                perfectas[self._prop[a]].add(b)
+            if perfecta_b:
+                perfectas[self._prop[b]].add(a)
+        for plano in (self._prop, self._tipo, self._inact, self._actuado, self._accion, self._nueva):
+            plano[a], plano[b] = plano[b], plano[a]
+        if not mismo_propietario:
+            self._actualizar_frontera(a)
+            self._actualizar_frontera(b)
+            self.territorios.retirar(a, self._prop[b])
+            self.territorios.retirar(b, self._prop[a])
+            self.territorios.agregar(a, self._prop[a])
+            self.territorios.agregar(b, self._prop[b])
+
+    def convertir(self, i, jugador, tipo):
+        """Cambia el propietario y el tipo de una ficha capturada."""
+        anterior = self.conteos[self._prop[i]]
+        anterior[0] -= 1
+        anterior[self._tipo[i]] -= 1
+        nuevo = self.conteos[jugador]
+        nuevo[0] += 1
+        nuevo[tipo] += 1
+        perfectas = self._perfectas
+        if perfectas is not None:
+            perfectas[self._prop[i]].discard(i)
+            if tipo == PERFECTA:
+                perfectas[jugador].add(i)
+        if self._nueva[i]:
+            self.creadas[self._prop[i]] -= 1
+            self.creadas[jugador] += 1
+
+        self.territorios.retirar(i, self._prop[i])
+        self._prop[i] = jugador
+        self._tipo[i] = tipo
+        self._actualizar_frontera(i)
+        self.territorios.agregar(i, jugador)
+
+    def cambiar_tipo(self, i, tipo):
+        conteo = self.conteos[self._prop[i]]
+        conteo[self._tipo[i]] -= 1
+        conteo[tipo] += 1
+        perfectas = self._perfectas
+        if perfectas is not None:
+            if tipo == PERFECTA:
+                perfectas[self._prop[i]].add(i)
+            else:
+                perfectas[self._prop[i]].discard(i)
+
+        self._tipo[i] = tipo
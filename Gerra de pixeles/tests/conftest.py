@@ -0,0 +1,12 @@
+# conftest.py
+# Las pruebas importan los módulos del juego como hermanos (igual que juego_fichas.py)
+# y nunca abren ventana.
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
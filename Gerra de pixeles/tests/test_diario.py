@@ -0,0 +1,35 @@
+# test_diario.py
+# Saltar a un turno de un diario da el mismo tablero que la partida en vivo,
+# también lejos de los fotogramas clave.
+
+import pytest
+
+import juego_fichas as jf
+from diario import ReproduccionPartida
+
+TURNOS = 150    # pasa por los fotogramas clave de los turnos 64 y 128
+SALTOS = (150, 0, 65, 63, 64, 1, 128, 127, 100, 129)   # en desorden, hacia delante y hacia atrás
+
+
+@pytest.mark.parametrize("motor", jf.MOTORES)
+def test_saltar_a_un_turno_da_el_tablero_en_vivo(tmp_path, motor):
+    ruta = str(tmp_path / "partida.gpxd")
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:4], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            motor=motor, semilla=5, filas=30, columnas=40)
+    gestor.colocar_fichas_iniciales()
+    gestor.iniciar_diario(ruta)
+    en_vivo = {0: (gestor.tablero.propietario.copy(), gestor.tablero.tipo.copy())}
+    while gestor.turno_actual < TURNOS and not gestor.procesar_turno():
+        en_vivo[gestor.turno_actual] = (gestor.tablero.propietario.copy(), gestor.tablero.tipo.copy())
+    gestor.cerrar_diario()
+    assert gestor.turno_actual == TURNOS, "la partida terminó antes de cruzar los fotogramas clave"
+
+    reproduccion = ReproduccionPartida(ruta)
+    assert reproduccion.ultimo_turno == TURNOS
+    espejo = jf.GestorJuego.desde_configuracion(reproduccion.configuracion, tiempo_limite=None)
+    for turno in SALTOS:
+        reproduccion.cargar_en(espejo.tablero, turno)
+        propietario, tipo = en_vivo[turno]
+        assert (espejo.tablero.propietario == propietario).all(), turno
+        assert (espejo.tablero.tipo == tipo).all(), turno
+        assert espejo.tablero.total_fichas() == int((propietario >= 0).sum())
@@ -0,0 +1,55 @@
+# test_eventos.py
+# El anillo de eventos guarda las últimas MAX_MENSAJES filas y solo se forma el
+# texto de las que se muestran; el archivo de eventos las guarda todas.
+
+import numpy as np
+import pytest
+
+import eventos
+import juego_fichas as jf
+from eventos import RegistroEventos, EVENTO, INICIO_TURNO
+
+
+def test_anillo_con_las_ultimas_filas():
+    registro = RegistroEventos(jf.MAX_MENSAJES)
+    for turno in range(1, 13):
+        registro.anotar(turno, INICIO_TURNO, a=10 * turno)
+    assert list(registro.recientes) == [(turno, INICIO_TURNO, -1, -1, 10 * turno, 0, 0, 0) for turno in range(8, 13)]
+
+
+@pytest.fixture
+def formateados(monkeypatch):
+    """Cuenta las plantillas de texto aplicadas, sin cambiar el texto."""
+    llamadas = []
+    for codigo, plantilla in eventos.PLANTILLAS.items():
+        def contada(*args, plantilla=plantilla):
+            llamadas.append(args)
+            return plantilla(*args)
+        monkeypatch.setitem(eventos.PLANTILLAS, codigo, contada)
+    return llamadas
+
+
+@pytest.mark.parametrize("motor", jf.MOTORES)
+def test_texto_solo_de_las_filas_mostradas(tmp_path, formateados, motor):
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:4], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            motor=motor, semilla=6, filas=30, columnas=40)
+    gestor.colocar_fichas_iniciales()
+    ruta = tmp_path / "eventos.gpxe"
+    gestor.iniciar_eventos(str(ruta))
+    for _ in range(20):
+        gestor.procesar_turno()
+    gestor.agregar_mensaje("texto libre")
+    gestor.cerrar_eventos()
+    assert formateados == []
+
+    todos = np.fromfile(ruta, dtype=EVENTO)
+    assert len(todos) > 10 * jf.MAX_MENSAJES
+    # El anillo tiene las últimas filas del archivo y, al final, el texto libre
+    recientes = list(gestor.mensajes)
+    assert len(recientes) == jf.MAX_MENSAJES
+    assert recientes[:-1] == [tuple(evento) for evento in todos[-(jf.MAX_MENSAJES - 1):].tolist()]
+    assert recientes[-1].endswith("texto libre")
+
+    textos = gestor.textos_mensajes()
+    assert len(formateados) == jf.MAX_MENSAJES - 1
+    assert len(textos) == jf.MAX_MENSAJES and all(isinstance(texto, str) for texto in textos)
@@ -0,0 +1,132 @@
+# test_exportar.py
+# Codificación de exportar.py comprobada con un decodificador de referencia
+# (LZW de GIF y PNG de paleta) escrito aparte, sin bibliotecas de imagen.
+
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from exportar import EscritorGif, EscritorPng, _lzw, _bits_paleta
+
+
+def lzw_inverso(datos, bits_minimos):
+    """Decodificador LZW de GIF: códigos de ancho variable, el menos significativo primero."""
+    bits = np.unpackbits(np.frombuffer(datos, dtype=np.uint8), bitorder='little')
+    limpiar = 1 << bits_minimos
+    fin = limpiar + 1
+    posicion = 0
+    ancho = bits_minimos + 1
+    tabla, anterior, salida = None, None, []
+    while True:
+        codigo = int(bits[posicion:posicion + ancho] @ (1 << np.arange(ancho)))
+        posicion += ancho
+        if codigo == limpiar:
+            tabla = [[i] for i in range(limpiar)] + [None, None]
+            ancho = bits_minimos + 1
+            anterior = None
+            continue
+        if codigo == fin:
+            return salida
+        if anterior is None:
+            entrada = tabla[codigo]
+        else:
+            # Código aún no definido: la secuencia anterior más su primer índice
+            entrada = tabla[codigo] if codigo < len(tabla) else anterior + [anterior[0]]
+            if len(tabla) < 4096:
+                tabla.append(anterior + [entrada[0]])
+            if len(tabla) == 1 << ancho and ancho < 12:
+                ancho += 1
+        salida.extend(entrada)
+        anterior = entrada
+
+
+def leer_gif(ruta):
+    """Paleta y fotogramas completos de un GIF sin entrelazar, aplicando los rectángulos en orden."""
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    assert datos[:6] == b"GIF89a"
+    ancho, alto, campos = struct.unpack_from("<HHB", datos, 6)
+    posicion = 13 + 3 * (2 << (campos & 7))
+    paleta = np.frombuffer(datos[13:posicion], dtype=np.uint8).reshape(-1, 3)
+    lienzo = np.zeros((alto, ancho), dtype=np.uint8)
+    fotogramas = []
+    while datos[posicion] != 0x3B:
+        if datos[posicion] == 0x21:
+            # Extensión: etiqueta y subbloques hasta el de longitud 0
+            posicion += 2
+            while datos[posicion]:
+                posicion += datos[posicion] + 1
+            posicion += 1
+            continue
+        assert datos[posicion] == 0x2C
+        x, y, w, h = struct.unpack_from("<HHHH", datos, posicion + 1)
+        bits_minimos = datos[posicion + 10]
+        posicion += 11
+        comprimido = bytearray()
+        while datos[posicion]:
+            comprimido += datos[posicion + 1:posicion + 1 + datos[posicion]]
+            posicion += datos[posicion] + 1
+        posicion += 1
+        lienzo[y:y + h, x:x + w] = np.array(lzw_inverso(bytes(comprimido), bits_minimos), dtype=np.uint8).reshape(h, w)
+        fotogramas.append(lienzo.copy())
+    return paleta, fotogramas
+
+
+@pytest.mark.parametrize("colores, tamano", [(2, 1), (4, 500), (16, 3000), (256, 20000)])
+def test_lzw_ida_y_vuelta(colores, tamano):
+    # 256 colores al azar llenan la tabla de 4096 códigos varias veces
+    indices = np.random.default_rng(colores).integers(0, colores, tamano).astype(np.uint8)
+    bits = _bits_paleta(colores)
+    assert lzw_inverso(_lzw(indices, bits), bits) == indices.tolist()
+
+
+def test_lzw_de_una_sola_racha():
+    indices = np.full(10000, 3, dtype=np.uint8)
+    assert lzw_inverso(_lzw(indices, 2), 2) == indices.tolist()
+
+
+def test_gif_reconstruye_los_fotogramas(tmp_path):
+    aleatorio = np.random.default_rng(0)
+    paleta = aleatorio.integers(0, 256, (12, 3)).astype(np.uint8)
+    fotograma = aleatorio.integers(0, 12, (30, 40)).astype(np.uint8)
+    esperados = []
+    escritor = EscritorGif(str(tmp_path / "a.gif"), 40, 30, paleta, 50)
+    for k in range(6):
+        if k % 3:   # un fotograma de cada tres se repite sin cambios
+            fotograma = fotograma.copy()
+            fotograma[5 + k:9 + k, 10:10 + 3 * k] = k
+        escritor.agregar(fotograma)
+        esperados.append(fotograma)
+    escritor.cerrar()
+
+    paleta_leida, fotogramas = leer_gif(tmp_path / "a.gif")
+    assert np.array_equal(paleta_leida[:len(paleta)], paleta)
+    assert len(fotogramas) == escritor.fotogramas == len(esperados)
+    for leido, esperado in zip(fotogramas, esperados):
+        assert np.array_equal(leido, esperado)
+
+
+def test_png_de_paleta(tmp_path):
+    paleta = np.array([[0, 0, 0], [255, 0, 0], [0, 255, 0]], dtype=np.uint8)
+    fotograma = np.random.default_rng(1).integers(0, 3, (7, 9)).astype(np.uint8)
+    escritor = EscritorPng(str(tmp_path / "pngs"), 9, 7, paleta)
+    escritor.agregar(fotograma)
+    escritor.cerrar()
+
+    with open(tmp_path / "pngs" / "fotograma_00000.png", "rb") as f:
+        datos = f.read()
+    assert datos[:8] == b"\x89PNG\r\n\x1a\n"
+    fragmentos, posicion = {}, 8
+    while posicion < len(datos):
+        longitud, tipo = struct.unpack_from(">I4s", datos, posicion)
+        contenido = datos[posicion + 8:posicion + 8 + longitud]
+        assert struct.unpack_from(">I", datos, posicion + 8 + longitud)[0] == zlib.crc32(tipo + contenido)
+        fragmentos[tipo] = contenido
+        posicion += 12 + longitud
+    assert struct.unpack(">IIBBBBB", fragmentos[b"IHDR"]) == (9, 7, 8, 3, 0, 0, 0)
+    assert fragmentos[b"PLTE"] == paleta.tobytes()
+    filas = np.frombuffer(zlib.decompress(fragmentos[b"IDAT"]), dtype=np.uint8).reshape(7, 10)
+    assert not filas[:, 0].any()    # filtro 0 en cada fila
+    assert np.array_equal(filas[:, 1:], fotograma)
@@ -0,0 +1,63 @@
+# test_historial.py
+# AnalisisHistorial frente a un recorrido turno a turno y celda a celda, con
+# bloques pequeños para que los cambios de dueño crucen de un bloque a otro.
+
+import numpy as np
+import pytest
+
+import historial
+import juego_fichas as jf
+from historial import AnalisisHistorial
+
+FILAS, COLUMNAS, JUGADORES = 12, 15, 4
+TURNOS = 60
+
+
+@pytest.fixture(scope="module")
+def partida(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("historial") / "partida.gpxh")
+    r = jf.simular_sin_pantalla(JUGADORES - 1, max_turnos=TURNOS, motor="lote", semilla=4,
+                                filas=FILAS, columnas=COLUMNAS, historial=ruta)
+    return ruta, r['gestor']
+
+
+def analisis_ingenuo(cuadriculas):
+    """territorio, disputa y frente de una lista de cuadrículas (propietario + 1, 0 = vacía)."""
+    territorio = [[int((c == j + 1).sum()) for j in range(JUGADORES)] for c in cuadriculas]
+    disputa = np.zeros((FILAS, COLUMNAS), dtype=int)
+    for previa, actual in zip(cuadriculas, cuadriculas[1:]):
+        for f in range(FILAS):
+            for c in range(COLUMNAS):
+                if previa[f, c] and actual[f, c] and previa[f, c] != actual[f, c]:
+                    disputa[f, c] += 1
+    frente = []
+    for cuadricula in cuadriculas:
+        pares = 0
+        for f in range(FILAS):
+            for c in range(COLUMNAS):
+                for vecina in ((f, c + 1), (f + 1, c)):
+                    if vecina[0] < FILAS and vecina[1] < COLUMNAS:
+                        a, b = cuadricula[f, c], cuadricula[vecina]
+                        pares += bool(a and b and a != b)
+        frente.append(pares)
+    return territorio, disputa, frente
+
+
+@pytest.mark.parametrize("turnos_por_bloque", [1, 7, None])
+def test_analizar_como_el_recorrido_ingenuo(partida, monkeypatch, turnos_por_bloque):
+    ruta, gestor = partida
+    registro = historial.tipo_registro(FILAS * COLUMNAS).itemsize
+    if turnos_por_bloque is not None:
+        monkeypatch.setattr(historial, "BYTES_BLOQUE", turnos_por_bloque * registro)
+    analisis = AnalisisHistorial(ruta)
+    assert analisis.turnos.tolist() == list(range(analisis.turnos[0], gestor.turno_actual + 1))
+    cuadriculas = [np.array(p).reshape(FILAS, COLUMNAS) for p in analisis.registros['propietario']]
+    # El último registro es el tablero al terminar la partida
+    assert (cuadriculas[-1] == gestor.tablero.propietario + 1).all()
+
+    resultado = analisis.analizar()
+    territorio, disputa, frente = analisis_ingenuo(cuadriculas)
+    assert resultado['territorio'].tolist() == territorio
+    assert (resultado['disputa'] == disputa).all()
+    assert resultado['frente'].tolist() == frente
+    assert disputa.sum() > 0
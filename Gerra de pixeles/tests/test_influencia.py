@@ -0,0 +1,99 @@
+# test_influencia.py
+# Mapas de influencia en tableros pequeños frente a su cálculo celda a celda:
+# distancias por búsqueda en anchura y sumas de ventana recorriendo cada ventana.
+
+import math
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from influencia import (
+    MapaInfluencia, _distancia, _sumar_ventana, _sumar_vecinos,
+    DISTANCIA_MAXIMA, RADIO_FUERZA, PESO_DISTANCIA, DADOS_POR_TIPO,
+)
+from tablero import Tablero, LIGERA, PESADA, PERFECTA
+
+VECINDAD = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+def distancia_bfs(origenes):
+    """Pasos hasta el origen más cercano por búsqueda en anchura (DISTANCIA_MAXIMA si no se llega antes)."""
+    filas, columnas = origenes.shape
+    distancia = np.full(origenes.shape, DISTANCIA_MAXIMA)
+    cola = deque()
+    for celda in zip(*origenes.nonzero()):
+        distancia[celda] = 0
+        cola.append(celda)
+    while cola:
+        f, c = cola.popleft()
+        for df, dc in VECINDAD:
+            vecina = (f + df, c + dc)
+            if 0 <= vecina[0] < filas and 0 <= vecina[1] < columnas and distancia[vecina] > distancia[f, c] + 1:
+                distancia[vecina] = distancia[f, c] + 1
+                cola.append(vecina)
+    return distancia
+
+
+def suma_ventana(valores, f, c, radio):
+    return valores[max(f - radio, 0):f + radio + 1, max(c - radio, 0):c + radio + 1].sum()
+
+
+def pila_al_azar(aleatorio, k, filas, columnas, densidad):
+    return aleatorio.random((k, filas, columnas)) < densidad
+
+
+@pytest.mark.parametrize("densidad", [0.0, 0.01, 0.05, 0.3, 1.0])
+def test_distancia_como_busqueda_en_anchura(densidad):
+    origenes = pila_al_azar(np.random.default_rng(7), 3, 13, 21, densidad)
+    distancia = _distancia(origenes)
+    for k in range(3):
+        assert (distancia[k] == distancia_bfs(origenes[k])).all()
+
+
+@pytest.mark.parametrize("radio", [0, 1, 2, 5])
+@pytest.mark.parametrize("forma", [(1, 1), (4, 9), (11, 7)])
+def test_sumar_ventana_recortada_en_los_bordes(radio, forma):
+    valores = np.random.default_rng(radio).integers(0, 6, (2,) + forma)
+    suma = _sumar_ventana(valores, radio)
+    for k in range(2):
+        for f in range(forma[0]):
+            for c in range(forma[1]):
+                assert suma[k, f, c] == suma_ventana(valores[k], f, c, radio)
+
+
+def test_sumar_vecinos():
+    mascara = pila_al_azar(np.random.default_rng(3), 2, 6, 8, 0.4)
+    suma = _sumar_vecinos(mascara)
+    for k, f, c in np.ndindex(mascara.shape):
+        esperado = sum(mascara[k, f + df, c + dc] for df, dc in VECINDAD if 0 <= f + df < 6 and 0 <= c + dc < 8)
+        assert suma[k, f, c] == esperado
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_mapas_celda_a_celda(semilla):
+    filas, columnas, jugadores = 9, 12, 3
+    tablero = Tablero(filas, columnas, jugadores)
+    aleatorio = random.Random(semilla)
+    for i in range(filas * columnas):
+        if aleatorio.random() < 0.5:
+            tablero.colocar(i, aleatorio.randrange(jugadores), aleatorio.choice((LIGERA, PESADA, PERFECTA)))
+    mapa = MapaInfluencia(tablero)
+    mapa.actualizar()
+
+    prop, dados = tablero.propietario, DADOS_POR_TIPO[tablero.tipo]
+    for j in range(jugadores):
+        enemigas = (prop >= 0) & (prop != j)
+        distancia = distancia_bfs(enemigas)
+        propios = np.where(prop == j, dados, 0)
+        ajenos = np.where(enemigas, dados, 0)
+        for f in range(filas):
+            for c in range(columnas):
+                i = f * columnas + c
+                fuerza = (suma_ventana(propios, f, c, RADIO_FUERZA) + 1) / (suma_ventana(ajenos, f, c, RADIO_FUERZA) + 1)
+                assert mapa.distancia[j, i] == distancia[f, c]
+                assert mapa.fuerza[j, i] == pytest.approx(fuerza)
+                assert mapa.puntuacion[j, i] == pytest.approx(math.log(fuerza) - PESO_DISTANCIA * distancia[f, c])
+                assert mapa.enemigos[j, i] == sum(
+                    enemigas[f + df, c + dc] for df, dc in VECINDAD if 0 <= f + df < filas and 0 <= c + dc < columnas)
@@ -0,0 +1,75 @@
+# test_motores.py
+# El motor por lotes frente al secuencial: probabilidades de combate por
+# enumeración de las tiradas y resultados de un turno en media sobre semillas fijas.
+
+import itertools
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import juego_fichas as jf
+from motor_lote import PROB_GANA, PROB_PIERDE
+from tablero import LIGERA, PESADA, PERFECTA, DADOS_COMBATE
+
+COLORES = jf.COLOR_PALETTE_BASE[:4]
+FILAS, COLUMNAS = 20, 30
+SEMILLAS = range(40)
+
+
+def sumas_posibles(num_dados):
+    """Suma de cada tirada de num_dados dados, una por tirada (todas igual de probables)."""
+    return [sum(tirada) for tirada in itertools.product(range(1, 7), repeat=num_dados)]
+
+
+def test_probabilidades_de_combate_por_enumeracion():
+    for tipo_a, tipo_o in itertools.product((LIGERA, PESADA, PERFECTA), repeat=2):
+        if (tipo_a == PERFECTA) != (tipo_o == PERFECTA):
+            gana, pierde = float(tipo_a == PERFECTA), float(tipo_o == PERFECTA)
+        else:
+            propias = Counter(sumas_posibles(DADOS_COMBATE[tipo_a]))
+            rivales = Counter(sumas_posibles(DADOS_COMBATE[tipo_o]))
+            total = sum(propias.values()) * sum(rivales.values())
+            gana = sum(a * b for x, a in propias.items() for y, b in rivales.items() if x > y) / total
+            pierde = sum(a * b for x, a in propias.items() for y, b in rivales.items() if y > x) / total
+        assert PROB_GANA[tipo_a, tipo_o] == pytest.approx(gana)
+        assert PROB_PIERDE[tipo_a, tipo_o] == pytest.approx(pierde)
+
+
+def estado_tras(turnos):
+    """Matrices del tablero tras unos turnos del motor secuencial."""
+    gestor = jf.GestorJuego(COLORES, 0.5, COLORES[0], tiempo_limite=None, semilla=11, filas=FILAS, columnas=COLUMNAS)
+    gestor.colocar_fichas_iniciales()
+    for _ in range(turnos):
+        gestor.procesar_turno()
+    t = gestor.tablero
+    return t._prop.copy(), t._tipo.copy(), t._inact.copy()
+
+
+def resultado_de_un_turno(estado, motor, semilla):
+    """Combates ganados, multiplicaciones y fichas de cada jugador tras un turno desde el estado."""
+    gestor = jf.GestorJuego(COLORES, 0.5, COLORES[0], tiempo_limite=None, motor=motor, semilla=semilla,
+                            filas=FILAS, columnas=COLUMNAS)
+    t = gestor.tablero
+    t._prop[:], t._tipo[:], t._inact[:] = estado
+    t.reconstruir_indices()
+    gestor.procesar_turno()
+    e = gestor.estadisticas
+    return ([sum(e[color]['victorias_combate'] for color in COLORES),
+             sum(e[color]['multiplicaciones'] for color in COLORES)]
+            + [t.conteos[j][0] for j in range(len(COLORES))])
+
+
+@pytest.mark.parametrize("turnos", [5, 15, 30])
+def test_un_turno_da_lo_mismo_en_media(turnos):
+    # Los movimientos no se comparan y las multiplicaciones salen algo más bajas
+    # con el motor por lotes (ver la cabecera de motor_lote.py)
+    estado = estado_tras(turnos)
+    medias, errores = {}, {}
+    for motor in jf.MOTORES:
+        muestras = np.array([resultado_de_un_turno(estado, motor, s) for s in SEMILLAS], dtype=float)
+        medias[motor] = muestras.mean(axis=0)
+        errores[motor] = muestras.std(axis=0) / np.sqrt(len(SEMILLAS))
+    # Cuatro errores típicos de la diferencia, un 10 % y una ficha de margen
+    margen = 4 * np.hypot(errores["secuencial"], errores["lote"]) + 0.1 * medias["secuencial"] + 1
+    assert (np.abs(medias["secuencial"] - medias["lote"]) <= margen).all(), (medias, margen)
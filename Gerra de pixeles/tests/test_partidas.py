@@ -0,0 +1,36 @@
+# test_partidas.py
+# Una partida guardada y seguida después termina igual que la jugada de una vez.
+
+import pytest
+
+import juego_fichas as jf
+
+TURNOS_TOTALES = 50
+TURNO_GUARDADO = 20
+
+
+def huella(gestor):
+    """Estado comparable de una partida: matrices del tablero, contadores y estadísticas."""
+    t = gestor.tablero
+    return (
+        gestor.turno_actual,
+        t.propietario.tobytes(), t.tipo.tobytes(), t.inactividad.tobytes(),
+        t.conteos,
+        sorted(t.perfectas[0]),
+        [sorted(gestor.estadisticas[color].items()) for color in gestor.player_colors_base],
+    )
+
+
+@pytest.mark.parametrize("ia", jf.IAS)
+@pytest.mark.parametrize("motor", jf.MOTORES)
+def test_guardar_y_seguir_es_la_misma_partida(tmp_path, motor, ia):
+    opciones = dict(num_oponentes=3, motor=motor, semilla=7, filas=20, columnas=30, ia=ia)
+    de_una_vez = jf.simular_sin_pantalla(max_turnos=TURNOS_TOTALES, **opciones)
+
+    ruta = str(tmp_path / "partida.npz")
+    jf.simular_sin_pantalla(max_turnos=TURNO_GUARDADO, guardar=ruta, **opciones)
+    seguida = jf.simular_sin_pantalla(max_turnos=TURNOS_TOTALES, partida=ruta)
+
+    assert seguida['gestor'].ia == ia
+    assert seguida['ganador'] == de_una_vez['ganador']
+    assert huella(seguida['gestor']) == huella(de_una_vez['gestor'])
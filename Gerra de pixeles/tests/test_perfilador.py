@@ -0,0 +1,98 @@
+# test_perfilador.py
+# Los elementos que el perfilador cuenta en cada fase son el trabajo del turno
+# según los eventos, con los dos motores.
+
+import csv
+
+import numpy as np
+import pytest
+
+import juego_fichas as jf
+from eventos import (
+    EVENTO, PROPAGACION, PROPAGACION_LOTE, COMBATE_EMPATE, COMBATE_VICTORIA, REEMPLAZO,
+    MULTIPLICACION, ABRE_BRECHA, AVANCE_PERFECTA, MOVIMIENTO, ASCENSO_FUERTE, ASCENSO_PERFECTA, RESUMEN_LOTE,
+)
+from perfilador import PerfiladorTurnos, NOMBRES_FASE, FASE_INACTIVIDAD
+from tablero import LIGERA, PESADA
+
+TURNOS = 40
+
+
+def perfilar(tmp_path, motor):
+    """Filas del CSV del perfilador y eventos de la partida."""
+    ruta_csv, ruta_eventos = tmp_path / "perfil.csv", tmp_path / "eventos.gpxe"
+    perfilador = PerfiladorTurnos(str(ruta_csv))
+    jf.simular_sin_pantalla(3, max_turnos=TURNOS, motor=motor, semilla=9, filas=25, columnas=30,
+                            perfilador=perfilador, eventos=str(ruta_eventos))
+    perfilador.cerrar()
+    with open(ruta_csv, newline="") as f:
+        filas = list(csv.DictReader(f))
+    return filas, np.fromfile(ruta_eventos, dtype=EVENTO)
+
+
+def contar(eventos, turno, *codigos):
+    return int(np.count_nonzero((eventos['turno'] == turno) & np.isin(eventos['codigo'], codigos)))
+
+
+def comprobar_partida(filas):
+    assert len(filas) == TURNOS
+    # La partida tiene trabajo en las fases que se comparan (los ascensos
+    # tardan en llegar: los cuenta test_ascensos_por_inactividad)
+    for nombre in NOMBRES_FASE[:-1]:
+        assert sum(int(fila[f"{nombre}_n"]) for fila in filas) > 0, nombre
+
+
+def comprobar_tiempos(fila):
+    fases = sum(float(fila[f"{nombre}_ms"]) for nombre in NOMBRES_FASE)
+    assert fases + float(fila["otros_ms"]) == pytest.approx(float(fila["total_ms"]), abs=0.01)
+    assert fases <= float(fila["total_ms"]) + 0.01
+
+
+def test_secuencial(tmp_path):
+    filas, eventos = perfilar(tmp_path, "secuencial")
+    comprobar_partida(filas)
+    for fila in filas:
+        turno = int(fila["turno"])
+        comprobar_tiempos(fila)
+        assert int(fila["propagacion_n"]) == contar(eventos, turno, PROPAGACION)
+        assert int(fila["combate_n"]) == contar(eventos, turno, COMBATE_EMPATE, COMBATE_VICTORIA)
+        assert int(fila["reemplazo_n"]) == contar(eventos, turno, REEMPLAZO)
+        # Cuenta cada ficha que llega a la acción estándar, aunque no tenga sitio libre
+        assert int(fila["accion_n"]) >= contar(eventos, turno, MULTIPLICACION, ABRE_BRECHA, AVANCE_PERFECTA, MOVIMIENTO)
+        assert int(fila["inactividad_n"]) == contar(eventos, turno, ASCENSO_FUERTE, ASCENSO_PERFECTA)
+
+
+def test_lote(tmp_path):
+    filas, eventos = perfilar(tmp_path, "lote")
+    comprobar_partida(filas)
+    for fila in filas:
+        turno = int(fila["turno"])
+        comprobar_tiempos(fila)
+        resumen = eventos[(eventos['turno'] == turno) & (eventos['codigo'] == RESUMEN_LOTE)]
+        propagacion = eventos[(eventos['turno'] == turno) & (eventos['codigo'] == PROPAGACION_LOTE)]
+        assert len(resumen) == 1
+        combates, reemplazos, multiplicaciones, movimientos = (int(resumen[0][k]) for k in "abcd")
+        assert int(fila["propagacion_n"]) == int(propagacion['a'].sum())
+        assert int(fila["combate_n"]) == combates
+        assert int(fila["reemplazo_n"]) == reemplazos
+        assert int(fila["accion_n"]) == multiplicaciones + movimientos
+        assert int(fila["inactividad_n"]) == contar(eventos, turno, ASCENSO_FUERTE, ASCENSO_PERFECTA)
+
+
+@pytest.mark.parametrize("motor", jf.MOTORES)
+def test_ascensos_por_inactividad(tmp_path, motor):
+    # Tablero lleno de fichas humanas inactivas y una rival en una esquina
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:2], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            motor=motor, semilla=1, filas=6, columnas=8)
+    t = gestor.tablero
+    for i in range(6 * 8):
+        t.colocar(i, 1 if i == 0 else 0, PESADA if i % 3 == 0 else LIGERA)
+    t._inact[:] = 4
+    gestor.perfilador = PerfiladorTurnos()
+    gestor.iniciar_eventos(str(tmp_path / "eventos.gpxe"))
+    gestor.procesar_turno()
+    gestor.cerrar_eventos()
+    ascensos = contar(np.fromfile(tmp_path / "eventos.gpxe", dtype=EVENTO), 1, ASCENSO_FUERTE, ASCENSO_PERFECTA)
+    _, _, elementos = gestor.perfilador.filas[-1]
+    assert elementos[FASE_INACTIVIDAD] > 0
+    assert elementos[FASE_INACTIVIDAD] == ascensos
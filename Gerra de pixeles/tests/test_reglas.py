@@ -0,0 +1,39 @@
+# test_reglas.py
+# Reglas del motor secuencial que deben coincidir con las del juego original.
+
+import juego_fichas as jf
+from eventos import REEMPLAZO
+from tablero import LIGERA, PERFECTA
+
+
+def reemplazos_primer_turno(semilla):
+    """Tablero 7x7 lleno de ligeras humanas con una perfecta en el centro."""
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:2], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            semilla=semilla, filas=7, columnas=7)
+    for i in range(49):
+        gestor.tablero.colocar(i, 0, PERFECTA if i == 24 else LIGERA)
+    gestor.procesar_turno()
+    return sum(1 for evento in gestor.eventos.recientes if not isinstance(evento, str) and evento[1] == REEMPLAZO)
+
+
+def test_perfecta_propagada_hace_reemplazo_en_el_mismo_turno():
+    # Solo hay una perfecta al empezar: dos reemplazos en el turno 1 implican que
+    # la perfecta creada por la propagación también actuó
+    assert max(reemplazos_primer_turno(semilla) for semilla in range(40)) == 2
+
+
+def test_fichas_creadas_no_cuentan_hasta_el_turno_siguiente():
+    # La probabilidad de multiplicar usa conteos[j][0] - creadas[j]: las fichas
+    # que ya estaban al empezar el turno, aunque hayan cambiado de dueño
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:3], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            semilla=5, filas=20, columnas=30)
+    gestor.colocar_fichas_iniciales()
+    t = gestor.tablero
+    creadas = 0
+    for _ in range(40):
+        gestor.procesar_turno()
+        for j in range(t.num_jugadores):
+            assert t.conteos[j][0] - t.creadas[j] == int(((t.propietario == j) & ~t.nueva).sum())
+        assert sum(t.creadas) == int(t.nueva.sum())
+        creadas += sum(t.creadas)
+    assert creadas > 0
@@ -0,0 +1,58 @@
+# test_renderizado.py
+# El repintado incremental de los trozos del tablero deja los mismos píxeles
+# que dibujarlos enteros, y la caché de fuentes solo guarda fuentes encontradas.
+
+import json
+import os
+
+import pygame
+import pytest
+
+import juego_fichas as jf
+
+
+@pytest.fixture
+def renderizador():
+    jf.inicializar_pygame()
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:4], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            motor="lote", semilla=2, filas=40, columnas=50)
+    gestor.colocar_fichas_iniciales()
+    yield jf.RenderizadorInterfaz(gestor)
+    pygame.quit()
+
+
+@pytest.mark.parametrize("umbral", [1.0, jf.RenderizadorInterfaz.UMBRAL_TABLERO_COMPLETO])
+def test_repintado_igual_que_el_trozo_entero(renderizador, monkeypatch, umbral):
+    # Con umbral 1 todos los trozos con cambios se repintan por rectángulos
+    monkeypatch.setattr(jf.RenderizadorInterfaz, "UMBRAL_TABLERO_COMPLETO", umbral)
+    renderizador._actualizar_tablero()
+    atlas = jf.atlas_fichas().escalado(renderizador.camara.celda)
+    repintados = 0
+    for _ in range(25):
+        renderizador.gestor.procesar_turno()
+        rects = renderizador._actualizar_tablero()
+        repintados += len(rects)
+        for superficie, codigos in renderizador.trozos.values():
+            entero = superficie.copy()
+            renderizador._dibujar_trozo(entero, codigos, atlas)
+            assert pygame.image.tobytes(superficie, "RGB") == pygame.image.tobytes(entero, "RGB")
+    assert repintados > 0
+    # Sin turno de por medio no hay nada que repintar
+    assert renderizador._actualizar_tablero() == []
+
+
+def test_cache_de_fuentes_sin_las_de_repuesto(tmp_path, monkeypatch):
+    ruta_fuente = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    # Solo Consolas está instalada; Segoe UI Symbol cae en la fuente de pygame
+    monkeypatch.setattr(jf, "_resolver_fuente",
+                        lambda nombre, negrita: (ruta_fuente if nombre == "Consolas" else None, negrita))
+    ruta_cache = tmp_path / "cache" / "fuentes.json"
+    ruta_cache.parent.mkdir()
+    # Entrada de repuesto guardada por una versión anterior: se descarta
+    ruta_cache.write_text(json.dumps({"Segoe UI Symbol|normal": [None, False]}), encoding="utf-8")
+    pygame.font.init()
+    fuentes = jf.cargar_fuentes(str(ruta_cache))
+
+    assert set(fuentes) == set(jf.FUENTES)
+    guardadas = json.loads(ruta_cache.read_text(encoding="utf-8"))
+    assert guardadas == {"Consolas|negrita": [ruta_fuente, True], "Consolas|normal": [ruta_fuente, False]}
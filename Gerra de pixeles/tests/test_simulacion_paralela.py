@@ -0,0 +1,64 @@
+# test_simulacion_paralela.py
+# Proceso trabajador: diario solo si se pide, y errores y cierres inesperados
+# que llegan a la interfaz en lugar de dejarla esperando.
+
+import time
+
+import juego_fichas as jf
+from simulacion_paralela import SimulacionEnSegundoPlano
+
+ESPERA_MAXIMA = 30   # segundos (el trabajador arranca con "spawn" e importa pygame)
+ARGUMENTOS = dict(player_colors_base=jf.COLOR_PALETTE_BASE[:2], probabilidad_combate=0.5,
+                  human_color_base=jf.COLOR_PALETTE_BASE[0], semilla=3, filas=12, columnas=16)
+
+
+def esperar(simulacion, condicion):
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while not condicion():
+        assert time.monotonic() < limite, "el trabajador no respondió a tiempo"
+        simulacion.actualizar()
+        time.sleep(0.01)
+
+
+def jugar_unos_turnos(diario):
+    simulacion = SimulacionEnSegundoPlano(jf.GestorJuego(**ARGUMENTOS), ARGUMENTOS, diario=diario)
+    try:
+        simulacion.enviar("velocidad", jf.VELOCIDAD_TURBO)
+        esperar(simulacion, lambda: simulacion.gestor.turno_actual >= 5 or simulacion.terminada)
+    finally:
+        simulacion.detener()
+    assert simulacion.error is None
+
+
+def test_diario_solo_si_se_pide(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jugar_unos_turnos(None)
+    assert list(tmp_path.iterdir()) == []
+
+    ruta = tmp_path / "partida.gpxd"
+    jugar_unos_turnos(str(ruta))
+    assert jf.ReproduccionPartida(str(ruta)).ultimo_turno >= 1
+
+
+def test_error_del_trabajador_llega_con_su_traza(tmp_path):
+    gestor = jf.GestorJuego(**ARGUMENTOS)
+    simulacion = SimulacionEnSegundoPlano(gestor, None, partida=str(tmp_path / "no_existe.npz"))
+    try:
+        esperar(simulacion, lambda: simulacion.terminada)
+    finally:
+        simulacion.detener()
+    assert simulacion.ganador is None
+    assert "FileNotFoundError" in simulacion.error
+
+
+def test_trabajador_muerto_termina_la_simulacion():
+    simulacion = SimulacionEnSegundoPlano(jf.GestorJuego(**ARGUMENTOS), ARGUMENTOS)
+    try:
+        esperar(simulacion, lambda: simulacion._secuencia > 0)
+        simulacion._proceso.kill()
+        simulacion._proceso.join()
+        esperar(simulacion, lambda: simulacion.terminada)
+    finally:
+        simulacion.detener()
+    assert simulacion.ganador is None
+    assert simulacion.error
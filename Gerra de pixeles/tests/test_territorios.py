@@ -0,0 +1,95 @@
+# test_territorios.py
+# Islas de TerritoriosConexos frente a un relleno por inundación celda a celda.
+
+import random
+
+import pytest
+
+import juego_fichas as jf
+from tablero import Tablero, VACIO, LIGERA, PESADA, PERIODO_TERRITORIOS
+
+
+def islas_por_relleno(tablero):
+    """(islas, mayor) de cada jugador recorriendo cada isla con una pila."""
+    prop = tablero.propietario
+    filas, columnas = prop.shape
+    vista = set()
+    islas = [0] * tablero.num_jugadores
+    mayor = [0] * tablero.num_jugadores
+    for inicio in zip(*(prop != VACIO).nonzero()):
+        if inicio in vista:
+            continue
+        jugador = prop[inicio]
+        pila, tamano = [inicio], 0
+        vista.add(inicio)
+        while pila:
+            f, c = pila.pop()
+            tamano += 1
+            for df, dc in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+                vecina = (f + df, c + dc)
+                if 0 <= vecina[0] < filas and 0 <= vecina[1] < columnas \
+                        and vecina not in vista and prop[vecina] == jugador:
+                    vista.add(vecina)
+                    pila.append(vecina)
+        islas[jugador] += 1
+        mayor[jugador] = max(mayor[jugador], tamano)
+    return islas, mayor
+
+
+def mutar_al_azar(tablero, aleatorio):
+    """Una mutación cualquiera del tablero por sus métodos (colocar, convertir, mover, quitar, intercambiar)."""
+    n = tablero.filas * tablero.columnas
+    i, j = aleatorio.randrange(n), aleatorio.randrange(n)
+    jugador = aleatorio.randrange(tablero.num_jugadores)
+    ocupada_i, ocupada_j = tablero._prop[i] != VACIO, tablero._prop[j] != VACIO
+    accion = aleatorio.random()
+    if not ocupada_i:
+        tablero.colocar(i, jugador, LIGERA)
+    elif accion < 0.3:
+        tablero.convertir(i, jugador, PESADA)
+    elif accion < 0.5 and not ocupada_j:
+        tablero.mover(i, j)
+    elif accion < 0.6 and ocupada_j and i != j:
+        tablero.intercambiar(i, j)
+    elif accion < 0.7:
+        tablero.quitar(i)
+
+
+def test_uniones_exactas_mientras_no_se_parte_ninguna_isla():
+    tablero = Tablero(25, 30, 3)
+    territorios = tablero.territorios
+    aleatorio = random.Random(1)
+    comprobadas = 0
+    for _ in range(800):
+        i = aleatorio.randrange(25 * 30)
+        if tablero._prop[i] == VACIO:
+            tablero.colocar(i, aleatorio.randrange(3), LIGERA)
+        else:
+            tablero.convertir(i, aleatorio.randrange(3), LIGERA)
+        if not territorios.aproximado:
+            assert (territorios.islas, territorios.mayor) == islas_por_relleno(tablero)
+            comprobadas += 1
+    assert comprobadas > 50
+
+
+@pytest.mark.parametrize("semilla", range(4))
+def test_reconstruir_tras_mutaciones_al_azar(semilla):
+    tablero = Tablero(20, 35, 4)
+    aleatorio = random.Random(semilla)
+    for paso in range(1, 1501):
+        mutar_al_azar(tablero, aleatorio)
+        if paso % 100 == 0:
+            tablero.territorios.reconstruir()
+            assert (tablero.territorios.islas, tablero.territorios.mayor) == islas_por_relleno(tablero)
+
+
+@pytest.mark.parametrize("motor", jf.MOTORES)
+def test_territorios_exactos_en_cada_revision(motor):
+    gestor = jf.GestorJuego(jf.COLOR_PALETTE_BASE[:4], 0.5, jf.COLOR_PALETTE_BASE[0], tiempo_limite=None,
+                            motor=motor, semilla=3, filas=30, columnas=40)
+    gestor.colocar_fichas_iniciales()
+    territorios = gestor.tablero.territorios
+    for _ in range(6 * PERIODO_TERRITORIOS):
+        gestor.procesar_turno()
+        if gestor.turno_actual % PERIODO_TERRITORIOS == 0 or not (territorios.aproximado or territorios.invalido):
+            assert (territorios.islas, territorios.mayor) == islas_por_relleno(gestor.tablero)
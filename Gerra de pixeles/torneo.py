@@ -0,0 +1,99 @@
+# torneo.py
+# Torneo de partidas sin pantalla para estudiar el equilibrio del juego.
+#
+# Reparte las partidas entre todos los núcleos con un pool de procesos (una
+# semilla por partida, así cualquier partida se puede repetir con --semilla) y
+# va añadiendo cada resultado como una fila de un único archivo CSV o JSONL
+# (ver resultados.py) a medida que terminan. Al final muestra, por cada
+# combinación de parámetros, las victorias del jugador 1, los empates y la
+# duración media.
+#
+# Uso:
+#   python torneo.py --partidas 1000 --oponentes 1 3 7 --probabilidad 0.3 0.5 0.7 --motor lote --salida torneo.csv
+
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+import time
+from collections import defaultdict
+
+import juego_fichas as jf
+from resultados import RegistroResultados, VICTORIA, EMPATE
+
+ARCHIVO_TORNEO = "torneo_guerra_pixeles.csv"
+INTERVALO_PROGRESO = 1.0    # segundos entre líneas de progreso
+
+
+def jugar_partida(parametros):
+    """Juega una partida sin pantalla y devuelve su fila de resultados (en un proceso del pool)."""
+    semilla, oponentes, probabilidad, max_perfectas, motor, max_turnos = parametros
+    r = jf.simular_sin_pantalla(
+        oponentes, probabilidad, max_turnos,
+        motor=motor, semilla=semilla, max_perfectas=max_perfectas,
+    )
+    return r['gestor'].resultado_partida(r['ganador'], r['segundos'])
+
+
+def generar_partidas(args):
+    """Parámetros de cada partida: las combinaciones se alternan y cada partida tiene su semilla."""
+    combinaciones = list(itertools.product(args.oponentes, args.probabilidad, args.max_perfectas))
+    for k in range(args.partidas * len(combinaciones)):
+        oponentes, probabilidad, max_perfectas = combinaciones[k % len(combinaciones)]
+        yield (args.semilla_base + k, oponentes, probabilidad, max_perfectas, args.motor, args.turnos)
+
+
+def imprimir_resumen(resumen):
+    print(f"\n{'Oponentes':>9} {'Prob.':>6} {'Máx.perf':>8} {'Partidas':>8} {'Gana J1':>8} {'Empates':>8} {'Sin fin':>8} {'Turnos':>8}")
+    for (oponentes, probabilidad, max_perfectas), filas in sorted(resumen.items()):
+        n = len(filas)
+        victorias_j1 = sum(1 for f in filas if f['resultado'] == VICTORIA and f['ganador_jugador'] == 1)
+        empates = sum(1 for f in filas if f['resultado'] == EMPATE)
+        sin_fin = n - empates - sum(1 for f in filas if f['resultado'] == VICTORIA)
+        turnos = sum(f['turnos'] for f in filas) / n
+        print(f"{oponentes:>9} {probabilidad:>6.2f} {max_perfectas:>8} {n:>8} "
+              f"{victorias_j1 / n:>8.1%} {empates / n:>8.1%} {sin_fin / n:>8.1%} {turnos:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo de partidas sin pantalla de la Guerra de Píxeles.")
+    parser.add_argument("--partidas", type=int, default=100, help="partidas por cada combinación de parámetros")
+    parser.add_argument("--oponentes", type=int, nargs="+", default=[1], choices=range(1, len(jf.COLOR_PALETTE_BASE)))
+    parser.add_argument("--probabilidad", type=float, nargs="+", default=[jf.PROBABILIDAD_COMBATE_BASE])
+    parser.add_argument("--max-perfectas", type=int, nargs="+", default=[jf.MAX_FICHAS_PERFECTAS])
+    parser.add_argument("--motor", choices=jf.MOTORES, default="secuencial",
+                        help="motor de reglas (el secuencial es el de referencia; lote, más rápido)")
+    parser.add_argument("--turnos", type=int, default=1000, help="límite de turnos por partida")
+    parser.add_argument("--salida", default=ARCHIVO_TORNEO, help="archivo .csv o .jsonl (se añaden filas)")
+    parser.add_argument("--sobrescribir", action="store_true", help="vaciar el archivo de salida antes de empezar")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool (por defecto, todos los núcleos)")
+    parser.add_argument("--semilla-base", type=int, default=0, help="semilla de la primera partida (las demás, consecutivas)")
+    args = parser.parse_args(argv)
+
+    total = args.partidas * len(args.oponentes) * len(args.probabilidad) * len(args.max_perfectas)
+    procesos = args.procesos or os.cpu_count() or 1
+    resumen = defaultdict(list)
+    inicio = ultimo_progreso = time.perf_counter()
+
+    with RegistroResultados(args.salida, anexar=not args.sobrescribir) as registro, \
+            multiprocessing.Pool(procesos) as pool:
+        print(f"Torneo: {total} partidas en {procesos} procesos -> {args.salida}")
+        # Partidas cortas: varias por envío para no pagar la comunicación en cada una
+        lote = max(1, min(16, total // (procesos * 8)))
+        for k, fila in enumerate(pool.imap_unordered(jugar_partida, generar_partidas(args), chunksize=lote), 1):
+            registro.escribir(fila)
+            resumen[(fila['oponentes'], fila['probabilidad_combate'], fila['max_perfectas'])].append(fila)
+            ahora = time.perf_counter()
+            if ahora - ultimo_progreso >= INTERVALO_PROGRESO or k == total:
+                ultimo_progreso = ahora
+                print(f"  {k}/{total} partidas ({k / (ahora - inicio):.1f} partidas/s)", file=sys.stderr)
+
+    print(f"Tiempo total: {time.perf_counter() - inicio:.1f} s")
+    imprimir_resumen(resumen)
+
+
+if __name__ == "__main__":
+    main()